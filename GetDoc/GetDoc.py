@@ -1,8 +1,10 @@
-import array
 import os
 import sys
 import zlib
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'SearchEngine')))
+from RetrievalMethods.utils.column_utils import DOCNOS_FILE
+from RetrievalMethods.utils.docstore_utils import DocStore
 
 def main():
     """
@@ -18,7 +20,8 @@ def main():
         Usage: python GetDoc.py <store_path> <lookup_type> <lookup_value>
 
         Arguments:
-          store_path     Path to the directory containing docs.bin, offsets.bin, and metadata.bin
+          store_path     Path to the directory containing docs.bin, offsets.bin, and metadata.bin,
+                         whose appended segments are read too
           lookup_type    Either "id" or "docno" to specify the type of lookup
           lookup_value   Either an internal integer ID or a DOCNO string
           
@@ -54,10 +57,13 @@ def main():
     # Check if required files exist
     docs_file = os.path.join(store_path, "docs.bin")
     offsets_file = os.path.join(store_path, "offsets.bin")
-    docnos_text = os.path.join(store_path, "docnos.txt")
+    docnos_file = os.path.join(store_path, DOCNOS_FILE)
+    # Indexes built before the binary columns have docnos.txt instead
+    if not os.path.exists(docnos_file) and os.path.exists(os.path.join(store_path, "docnos.txt")):
+        docnos_file = os.path.join(store_path, "docnos.txt")
     
     missing_files = []
-    for file_path, file_name in [(docs_file, "docs.bin"), (offsets_file, "offsets.bin"), (docnos_text, "docnos.txt")]:
+    for file_path, file_name in [(docs_file, "docs.bin"), (offsets_file, "offsets.bin"), (docnos_file, DOCNOS_FILE)]:
         if not os.path.exists(file_path):
             missing_files.append(file_name)
     
@@ -66,28 +72,23 @@ def main():
         Error: Required files are missing from store directory '{store_path}':
         {', '.join(missing_files)}
         
-        The store directory must contain: docs.bin, offsets.bin, metadata.bin
+        The store directory must contain: docs.bin, offsets.bin, {DOCNOS_FILE}
         ''')
         sys.exit(1)
     
     try:
-        with open(docnos_text, "r") as f:
-            docnos_content = f.read()
-            docnos = docnos_content.strip().split('\n')
+        doc_store = DocStore.open(store_path)
+        docnos = doc_store.docnos
 
-        if not docnos[0].strip():
+        if not docnos or not docnos[0].strip():
             print(f'''
-            Error: No DOCNOs found in {docnos_text}.
+            Error: No DOCNOs found in {docnos_file}.
             
-            The docnos.txt file must contain at least one DOCNO.
+            The docnos file must contain at least one DOCNO.
             ''')
             sys.exit(1)
-        
-        with open(offsets_file, 'rb') as f:
-            offsets = array.array('I')
-            offsets.frombytes(f.read())
 
-        if not offsets:
+        if not doc_store.offsets[0]:
             print(f'''
             Error: No offsets found in {offsets_file}.
             
@@ -99,15 +100,6 @@ def main():
         if lookup_type == "id":
             try:
                 doc_index = int(docno)
-                docno = docnos[doc_index]
-                if doc_index < 0 or doc_index >= len(offsets):
-                    print(f'''
-                    Error: Internal ID {doc_index} does not exist.
-                    
-                    Valid internal IDs range from 0 to {len(offsets)-1}.
-                    Total documents in store: {len(offsets)}
-                    ''')
-                    sys.exit(1)
             except ValueError:
                 print(f'''
                 Error: Invalid internal ID '{docno}'.
@@ -115,19 +107,18 @@ def main():
                 When using lookup_type "id", the lookup_value must be a valid integer.
                 ''')
                 sys.exit(1)
-            except IndexError:
+            if doc_index < 0 or doc_index >= len(doc_store):
                 print(f'''
                 Error: Internal ID {doc_index} does not exist.
                 
-                Valid internal IDs range from 0 to {len(docnos)-1}.
-                Total documents in store: {len(docnos)}
+                Valid internal IDs range from 0 to {len(doc_store)-1}.
+                Total documents in store: {len(doc_store)}
                 ''')
                 sys.exit(1)
         
         elif lookup_type == "docno":
-            try:
-                doc_index = docnos.index(docno)
-            except ValueError:
+            doc_index = doc_store.doc_id(docno)
+            if doc_index is None:
                 print(f'''
                 Error: DOCNO '{docno}' does not exist.
                 
@@ -137,16 +128,13 @@ def main():
                 sys.exit(1)
         
         # Read only needed document
-        with open(docs_file, 'rb') as f:
-            f.seek(offsets[doc_index])
-            data_size = offsets[doc_index + 1] - offsets[doc_index]
-            compressed_data = f.read(data_size)
-            document_content = zlib.decompress(compressed_data).decode('utf-8')
-            
-            print(document_content)
-            return document_content
+        document_content = doc_store.get(doc_index)
+        doc_store.close()
+
+        print(document_content)
+        return document_content
     
-    except (OSError, IOError) as e:
+    except (OSError, IOError, ValueError) as e:
         print(f"Error reading store files: {e}")
         sys.exit(1)
     except zlib.error as e:
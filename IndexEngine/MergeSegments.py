@@ -0,0 +1,56 @@
+import os
+import sys
+try:
+    from utils.index_utils import merge_segments
+    from utils.option_utils import parse_options, parse_positive_int
+    from utils.segment_utils import SEGMENTS_FILE, MERGE_FACTOR
+except ImportError:
+    from .utils.index_utils import merge_segments
+    from .utils.option_utils import parse_options, parse_positive_int
+    from .utils.segment_utils import SEGMENTS_FILE, MERGE_FACTOR
+
+def main():
+    """
+    Main function for MergeSegments.
+
+    Takes in 1 parameter: the path to an index with appended segments, followed by optional flags.
+    Started in the background after an append, but can also be run by hand.
+    """
+    usage = f'''
+        Usage: python MergeSegments.py <index_path> [--merge-factor <N>]
+
+        Arguments:
+          index_path       Path to an index that segments have been appended to
+
+        Options:
+          --merge-factor   Number of same-sized segments merged into one (default: {MERGE_FACTOR})
+
+        Examples:
+          python MergeSegments.py ./output/
+        '''
+    if len(sys.argv) < 2:
+        print(f'''
+        This program takes at least one argument. You have provided {len(sys.argv)-1} arguments.
+        {usage}''')
+        sys.exit(1)
+
+    index_path = sys.argv[1]
+    try:
+        options = parse_options(sys.argv[2:], {"--merge-factor": True})
+        merge_factor = parse_positive_int(options, "--merge-factor") or MERGE_FACTOR
+    except ValueError as e:
+        print(f"Error: {e}\n{usage}")
+        sys.exit(1)
+
+    if merge_factor < 2:
+        print(f"Error: --merge-factor must be at least 2.\n{usage}")
+        sys.exit(1)
+
+    if not os.path.isfile(os.path.join(index_path, SEGMENTS_FILE)):
+        print(f"Error: '{index_path}' has no appended segments.\nPlease provide the path of an index created with --append.")
+        sys.exit(1)
+
+    merge_segments(index_path, merge_factor)
+
+if __name__ == "__main__":
+    main()
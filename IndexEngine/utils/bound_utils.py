@@ -0,0 +1,30 @@
+# BM25 parameters, as used by SearchEngine/RetrievalMethods/utils/score_utils.py
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Per-term BM25 upper bounds, by term id
+TERM_BOUNDS_FILE = "term_bounds.bin"
+
+
+def bm25_term_bound(posting: list[int], doc_lengths, average_doc_length: float) -> float:
+    """
+    Gets the largest BM25 term frequency component, tf / (k + tf), of a postings list.
+
+    Multiplied by the term's idf this bounds the score the term can add to any document,
+    which lets the search engine skip documents that cannot reach the top k.
+
+    Args:
+        posting: A [doc id, count, doc id, count, ...] postings list.
+        doc_lengths: The length of each document, by doc id.
+        average_doc_length: The average document length the component is computed with.
+    """
+    if not average_doc_length:
+        return 1.0
+
+    best = 0.0
+    for doc_id, term_frequency in zip(posting[0::2], posting[1::2]):
+        k = BM25_K1 * ((1-BM25_B) + BM25_B * (doc_lengths[doc_id] / average_doc_length))
+        component = term_frequency / (k + term_frequency)
+        if component > best:
+            best = component
+
+    return best
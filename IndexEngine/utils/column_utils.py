@@ -0,0 +1,52 @@
+import array
+
+# Per-document columns, indexed by doc id. Docnos are one UTF-8 blob with the offset of
+# each docno in it (plus the end offset), so none of them need a Python object per
+# document when they are loaded (see SearchEngine/RetrievalMethods/utils/column_utils.py).
+DOCNOS_FILE = "docnos.bin"
+DOCNO_OFFSETS_FILE = "docno_offsets.bin"
+DOC_LENGTHS_FILE = "doc_lengths.bin"
+DOC_MAGNITUDES_FILE = "doc_magnitudes.bin"
+# Result metadata, so search results are shown without reading their documents: the date
+# of each document as a YYYYMMDD integer (0 if its docno has no date), and the headlines
+# laid out like the docnos
+DATES_FILE = "dates.bin"
+HEADLINES_FILE = "headlines.bin"
+HEADLINE_OFFSETS_FILE = "headline_offsets.bin"
+
+
+def write_strings(blob_path: str, offsets_path: str, values: list[str]) -> None:
+    """
+    Writes a column of strings as a UTF-8 blob and the offsets of each string in it.
+    """
+    blob = bytearray()
+    offsets = array.array('I', [0])
+    for value in values:
+        blob += value.encode('utf-8')
+        offsets.append(len(blob))
+
+    with open(blob_path, "wb") as blobbin:
+        blobbin.write(blob)
+    with open(offsets_path, "wb") as offsetsbin:
+        offsets.tofile(offsetsbin)
+
+def write_docnos(output_path: str, docnos: list[str]) -> None:
+    """
+    Writes the docnos as a UTF-8 blob and the offsets of each docno in it.
+    """
+    write_strings(f"{output_path}/{DOCNOS_FILE}", f"{output_path}/{DOCNO_OFFSETS_FILE}", docnos)
+
+def write_column(column_path: str, typecode: str, values) -> None:
+    """
+    Writes a column of fixed width values.
+    """
+    with open(column_path, "wb") as columnbin:
+        array.array(typecode, values).tofile(columnbin)
+
+def write_text_column(column_path: str, values) -> None:
+    """
+    Writes a column as a text file with one value per line.
+    """
+    with open(column_path, "w") as columntxt:
+        for value in values:
+            columntxt.write(f"{value}\n")
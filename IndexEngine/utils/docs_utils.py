@@ -0,0 +1,177 @@
+import array
+import os
+import zlib
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads compressing documents while the parser keeps reading (zlib releases the GIL)
+COMPRESS_WORKERS = 4
+# Preset dictionary every document of a docs.bin v2 is compressed with. Each document is
+# still its own zlib stream at its offset in offsets.bin, so it is read on its own. Indexes
+# without the dictionary have docs.bin v1, each document compressed without one.
+DOCS_DICTIONARY_FILE = "docs_dictionary.bin"
+# zlib only looks 32 KB back, so a longer dictionary would never be used
+DICTIONARY_BYTES = 32 * 1024
+# Documents the dictionary is trained on, the first ones of the corpus
+DICTIONARY_SAMPLE_DOCUMENTS = 1000
+
+
+def train_dictionary(samples: list[bytes], size: int = DICTIONARY_BYTES) -> bytes:
+    """
+    Builds a preset zlib dictionary from sample documents.
+
+    Lines (markup, section and page names) and words found in more than one sample are
+    scored by the number of samples holding them times their length, and the best fill
+    the dictionary. zlib matches are cheapest close to the data, so the best go last.
+
+    Args:
+        samples: The encoded sample documents.
+        size: The most bytes in the dictionary.
+
+    Returns:
+        The dictionary, empty if no line or word repeats across the samples.
+    """
+    fragment_counts = Counter()
+    for sample in samples:
+        fragment_counts.update({line + b"\n" for line in sample.split(b"\n")})
+        fragment_counts.update({b" " + word for word in sample.split()})
+
+    fragments = sorted(((count * len(fragment), fragment) for fragment, count in fragment_counts.items() if count > 1), reverse=True)
+    dictionary = []
+    dictionary_bytes = 0
+    for _, fragment in fragments:
+        if dictionary_bytes + len(fragment) <= size:
+            dictionary.append(fragment)
+            dictionary_bytes += len(fragment)
+
+    return b"".join(reversed(dictionary))
+
+def compress_document(document: str, compressor=None) -> bytes:
+    """
+    Compresses a single document for docs.bin.
+
+    Args:
+        document: The document.
+        compressor: A zlib compressor primed with the preset dictionary, or None for docs.bin v1.
+    """
+    if compressor is None:
+        return zlib.compress(document.encode('utf-8'))
+
+    compressor = compressor.copy()
+    return compressor.compress(document.encode('utf-8')) + compressor.flush()
+
+def decompress_document(data, dictionary: bytes | None = None) -> str:
+    """
+    Decompresses a single document read from docs.bin, with the preset dictionary of a docs.bin v2.
+    """
+    if dictionary is None:
+        return zlib.decompress(data).decode('utf-8')
+
+    return zlib.decompressobj(zdict=dictionary).decompress(data).decode('utf-8')
+
+def read_dictionary(store_path: str) -> bytes | None:
+    """
+    Reads the preset dictionary of a store's docs.bin, or None for docs.bin v1.
+    """
+    dictionary_path = os.path.join(store_path, DOCS_DICTIONARY_FILE)
+    if not os.path.exists(dictionary_path):
+        return None
+
+    with open(dictionary_path, "rb") as f:
+        return f.read()
+
+class DocsWriter:
+    """
+    Writes documents to docs.bin as they are parsed.
+
+    Documents are compressed in a thread pool and written in the order they were added,
+    with their offsets recorded as they are written. With a dictionary path, the first
+    documents are held back until a preset dictionary is trained on them and written
+    there, and every document is compressed with it (docs.bin v2).
+    """
+
+    def __init__(self, docs_path: str, workers: int = COMPRESS_WORKERS, dictionary_path: str | None = None):
+        """
+        Opens docs.bin for writing.
+
+        Args:
+            docs_path: The path of the docs.bin file to create.
+            workers: The number of compression threads.
+            dictionary_path: The path of the docs_dictionary.bin file to create, or None for docs.bin v1.
+        """
+        self.docbin = open(docs_path, "wb")
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.max_pending = workers * 4
+        self.pending = deque()
+        self.offsets = array.array('I')
+        self.offset = 0
+        self.dictionary_path = dictionary_path
+        self.samples = [] if dictionary_path is not None else None
+        self.compressor = None
+
+    def add(self, document: str) -> None:
+        """
+        Queues a document for compression and writes any finished documents in order.
+        """
+        if self.samples is not None:
+            self.samples.append(document)
+            if len(self.samples) >= DICTIONARY_SAMPLE_DOCUMENTS:
+                self._train_dictionary()
+            return
+
+        self.pending.append(self.executor.submit(compress_document, document, self.compressor))
+        while len(self.pending) > self.max_pending:
+            self._write_next()
+
+    def _train_dictionary(self) -> None:
+        """
+        Trains and writes the preset dictionary on the documents held back, then queues them.
+        """
+        samples, self.samples = self.samples, None
+        dictionary = train_dictionary([sample.encode('utf-8') for sample in samples])
+        # Documents with nothing in common are left as docs.bin v1
+        if dictionary:
+            with open(self.dictionary_path, "wb") as dictionarybin:
+                dictionarybin.write(dictionary)
+            self.compressor = zlib.compressobj(zdict=dictionary)
+
+        for sample in samples:
+            self.add(sample)
+
+    def _write_next(self) -> None:
+        """
+        Writes the oldest queued document once it has been compressed.
+        """
+        zipped_doc = self.pending.popleft().result()
+        self.offsets.append(self.offset)
+        self.docbin.write(zipped_doc)
+        self.offset += len(zipped_doc)
+
+    def close(self) -> array.array:
+        """
+        Writes the remaining documents, closes docs.bin and returns the document offsets.
+        """
+        try:
+            if self.samples:
+                self._train_dictionary()
+            while self.pending:
+                self._write_next()
+            self.offsets.append(self.offset)
+        finally:
+            self.executor.shutdown()
+            self.docbin.close()
+
+        return self.offsets
+
+def read_documents(store_path: str):
+    """
+    Yields every document in a store's docs.bin (v1 or v2) in doc id order.
+    """
+    dictionary = read_dictionary(store_path)
+    offsets = array.array('I')
+    with open(os.path.join(store_path, "offsets.bin"), "rb") as offsetbin:
+        offsets.frombytes(offsetbin.read())
+
+    with open(os.path.join(store_path, "docs.bin"), "rb") as docbin:
+        for i in range(len(offsets) - 1):
+            yield decompress_document(docbin.read(offsets[i + 1] - offsets[i]), dictionary)
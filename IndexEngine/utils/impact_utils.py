@@ -0,0 +1,65 @@
+import array
+import math
+import zlib
+try:
+    from utils.bound_utils import BM25_K1, BM25_B
+    from utils.postings_utils import smallest_typecode
+except ImportError:
+    from .bound_utils import BM25_K1, BM25_B
+    from .postings_utils import smallest_typecode
+
+# Impact-ordered postings, by term id, and the offset of each term's impacts
+IMPACTS_FILE = "impacts.bin"
+IMPACT_OFFSETS_FILE = "impact_offsets.bin"
+# First byte of an impact list
+IMPACTS_VERSION = 1
+# BM25 contributions are quantised to 8 bits over a fixed range, so impacts of every
+# segment add up on the same scale. 16 covers the idf of collections of ~13M documents.
+MAX_IMPACT = 255
+MAX_IMPACT_SCORE = 16.0
+IMPACT_SCALE = MAX_IMPACT / MAX_IMPACT_SCORE
+
+
+def encode_impacts(posting: list[int], doc_lengths, average_doc_length: float) -> bytes:
+    """
+    Encodes a postings list as quantised BM25 impacts, grouped from the highest impact down.
+
+    Each posting's BM25 contribution is computed with the statistics of the index it is
+    written in and its magnitude rounded to an 8 bit impact. Terms in over half of the
+    documents have a negative idf, so their contributions lower scores and the list is
+    flagged as negative. Postings whose impact rounds to 0 are left out.
+
+    Layout: version byte, gap typecode, sign byte (1 if the impacts are negative), then
+    zlib of the number of groups (uint32), the
+    impact of each group (uint8), the number of doc ids in each group (uint32) and the doc
+    id gaps within each group, each packed as fixed width native integers.
+
+    Args:
+        posting: A [doc id, count, doc id, count, ...] postings list.
+        doc_lengths: The length of each document, by doc id.
+        average_doc_length: The average document length of the index.
+    """
+    document_frequency = len(posting) // 2
+    num_docs = len(doc_lengths)
+    idf = math.log((num_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    groups = {}
+    for doc_id, term_frequency in zip(posting[0::2], posting[1::2]):
+        k = BM25_K1 * ((1-BM25_B) + BM25_B * (doc_lengths[doc_id] / average_doc_length))
+        impact = min(MAX_IMPACT, round((term_frequency / (k + term_frequency)) * abs(idf) * IMPACT_SCALE))
+        if impact > 0:
+            groups.setdefault(impact, []).append(doc_id)
+
+    impacts = array.array('B', sorted(groups, reverse=True))
+    counts = array.array('I', [len(groups[impact]) for impact in impacts])
+    gaps = array.array('I')
+    for impact in impacts:
+        previous = 0
+        for doc_id in groups[impact]:
+            gaps.append(doc_id - previous)
+            previous = doc_id
+
+    gap_type = smallest_typecode(gaps)
+    packed = array.array('I', [len(impacts)]).tobytes() + impacts.tobytes() + counts.tobytes() + array.array(gap_type, gaps).tobytes()
+
+    return bytes([IMPACTS_VERSION, ord(gap_type), int(idf < 0)]) + zlib.compress(packed)
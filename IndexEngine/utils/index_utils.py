@@ -0,0 +1,579 @@
+import array
+import gzip
+import os
+import shutil
+import subprocess
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from itertools import repeat
+try:
+    from utils.tokenize_utils import convert_counts_to_ids, add_to_postings, tokenize, calculate_magnitude, TOKENIZER_FILE, TOKENIZERS
+    from utils.postings_utils import encode_postings
+    from utils.lexicon_utils import write_lexicon
+    from utils.bound_utils import TERM_BOUNDS_FILE, bm25_term_bound
+    from utils.impact_utils import IMPACTS_FILE, IMPACT_OFFSETS_FILE, encode_impacts
+    from utils.snippet_utils import SNIPPETS_FILE, SNIPPET_OFFSETS_FILE, add_snippets
+    from utils.position_utils import POSITIONS_FILE, POSITION_OFFSETS_FILE, POSITION_BYTES, add_to_positions, add_to_position_block, encode_positions
+    from utils.stats_utils import COLLECTION_STATS_FILE, COLLECTION_FREQUENCIES_FILE, write_collection_stats
+    from utils.column_utils import DOC_LENGTHS_FILE, DOC_MAGNITUDES_FILE, DATES_FILE, HEADLINES_FILE, HEADLINE_OFFSETS_FILE, write_docnos, write_strings, write_column, write_text_column
+    from utils.spimi_utils import POSTING_PAIR_BYTES, add_to_block, flush_block, merge_blocks, remove_blocks
+    from utils.option_utils import parse_options, parse_positive_int
+    from utils.parallel_utils import split_documents, parse_in_parallel
+    from utils.docs_utils import DOCS_DICTIONARY_FILE, DocsWriter
+    from utils.parse_utils import parse_documents, parse_chunk, SCHEMA_FILE, SCHEMAS
+    from utils.segment_utils import INDEX_LOCK_FILE, MERGE_LOCK_FILE, MERGE_FACTOR, acquire_lock, release_lock, read_manifest, write_manifest, segment_doc_base, select_merge, read_segment_lines
+except ImportError:
+    from .tokenize_utils import convert_counts_to_ids, add_to_postings, tokenize, calculate_magnitude, TOKENIZER_FILE, TOKENIZERS
+    from .postings_utils import encode_postings
+    from .lexicon_utils import write_lexicon
+    from .bound_utils import TERM_BOUNDS_FILE, bm25_term_bound
+    from .impact_utils import IMPACTS_FILE, IMPACT_OFFSETS_FILE, encode_impacts
+    from .snippet_utils import SNIPPETS_FILE, SNIPPET_OFFSETS_FILE, add_snippets
+    from .position_utils import POSITIONS_FILE, POSITION_OFFSETS_FILE, POSITION_BYTES, add_to_positions, add_to_position_block, encode_positions
+    from .stats_utils import COLLECTION_STATS_FILE, COLLECTION_FREQUENCIES_FILE, write_collection_stats
+    from .column_utils import DOC_LENGTHS_FILE, DOC_MAGNITUDES_FILE, DATES_FILE, HEADLINES_FILE, HEADLINE_OFFSETS_FILE, write_docnos, write_strings, write_column, write_text_column
+    from .spimi_utils import POSTING_PAIR_BYTES, add_to_block, flush_block, merge_blocks, remove_blocks
+    from .option_utils import parse_options, parse_positive_int
+    from .parallel_utils import split_documents, parse_in_parallel
+    from .docs_utils import DOCS_DICTIONARY_FILE, DocsWriter
+    from .parse_utils import parse_documents, parse_chunk, SCHEMA_FILE, SCHEMAS
+    from .segment_utils import INDEX_LOCK_FILE, MERGE_LOCK_FILE, MERGE_FACTOR, acquire_lock, release_lock, read_manifest, write_manifest, segment_doc_base, select_merge, read_segment_lines
+
+
+def run_index_engine(program: str, schema: dict, tokenize_function=tokenize) -> None:
+    """
+    Runs an index engine from the command line.
+
+    Takes in 2 parameters: the path to documents and path to output, followed by optional flags
+
+    Args:
+        program: The name of the script, shown in the usage message.
+        schema: The corpus schema used to parse the documents.
+        tokenize_function: The function used to turn text into index terms.
+    """
+    usage = f'''
+        Usage: python {program} <documents_file> <output_path> [--memory-budget <MB>] [--workers <N>] [--append] [--text-files] [--impacts] [--snippets] [--positions]
+
+        Arguments:
+        documents_file  Path to the gzip file containing documents to index
+        output_path     Path where the index and metadata will be stored
+
+        Options:
+        --memory-budget  Flush sorted partial postings blocks to disk whenever they reach
+                         this many megabytes, then merge them into the final index
+        --workers        Tokenize and count documents in this many worker processes
+        --append         Add the documents to the existing index at output_path as a new segment
+        --text-files     Also export docnos.txt, doc_lengths.txt and doc_magnitudes.txt
+        --impacts        Also write quantised BM25 impacts for impact-ordered search
+        --snippets       Also store each document's sentences, split and tokenized, for summaries
+        --positions      Also write the positions of every term, for phrase and proximity queries
+        '''
+
+    # Check number of arguments
+    if len(sys.argv) < 3:
+        print(f'''
+        This program takes in at least two arguments. You have provided {len(sys.argv)-1} arguments.
+        {usage}''')
+        
+        sys.exit(1)
+    
+    documents_file = sys.argv[1]
+    output_path = sys.argv[2]
+
+    try:
+        options = parse_options(sys.argv[3:], {"--memory-budget": True, "--workers": True, "--append": False, "--text-files": False, "--impacts": False, "--snippets": False, "--positions": False})
+        memory_budget = parse_positive_int(options, "--memory-budget")
+        workers = parse_positive_int(options, "--workers")
+        text_files = "--text-files" in options
+        impacts = "--impacts" in options
+        snippets = "--snippets" in options
+        positions = "--positions" in options
+    except ValueError as e:
+        print(f'''
+        Error: {e}.
+        {usage}''')
+        sys.exit(1)
+    
+    # Check argument validity
+    if not os.path.exists(documents_file):
+        print(f"Error: Documents file '{documents_file}' does not exist.\nPlease provide a valid documents file.")
+        sys.exit(1)
+    
+    if not os.path.isfile(documents_file):
+        print(f"Error: '{documents_file}' is not a file.\nPlease provide a valid documents file.")
+        sys.exit(1)
+    
+    if "--append" in options:
+        if not os.path.isfile(os.path.join(output_path, "offsets.bin")):
+            print(f"Error: '{output_path}' is not an existing index.\nPlease provide the path of an index to append to.")
+            sys.exit(1)
+
+        append_segment(documents_file, output_path, schema, tokenize_function, memory_budget, workers, text_files, impacts, snippets, positions)
+        return
+
+    if os.path.exists(output_path):
+        print(f'''
+        Error: Output directory '{output_path}' already exists.
+
+        This program will not overwrite existing directories to prevent data loss.
+        Please choose a different output path, remove the existing directory,
+        or use --append to add the documents to it as a new segment.
+        ''')
+        sys.exit(1)
+    
+    build_index(documents_file, output_path, schema, tokenize_function, memory_budget, workers, text_files=text_files, impacts=impacts, snippets=snippets, positions=positions)
+
+def build_index(documents_file: str, output_path: str, schema: dict, tokenize_function=tokenize, memory_budget: int | None = None, workers: int | None = None, doc_base: int = 0, lines=None, text_files: bool = False, impacts: bool = False, snippets: bool = False, positions: bool = False) -> int:
+    """
+    Builds an index for a gzip corpus in a new output directory.
+
+    Args:
+        documents_file: Path to the gzip file containing documents to index.
+        output_path: Path where the index and metadata will be stored.
+        schema: The corpus schema used to parse the documents.
+        tokenize_function: The function used to turn text into index terms.
+        memory_budget: Megabytes of postings to hold in memory before flushing a block, or None to build in memory.
+        workers: Number of worker processes used to parse documents, or None to parse in this process.
+        doc_base: Global id of the first document, for segments appended to an existing index.
+        lines: Lines to parse instead of reading documents_file, which is then only used in messages.
+        text_files: Whether to also export the per-document columns as text files.
+        impacts: Whether to also write quantised BM25 impacts of every posting.
+        snippets: Whether to also write the sentences of every document for query-biased summaries.
+        positions: Whether to also write the positions of every posting for phrase and proximity queries.
+
+    Returns:
+        The number of documents indexed.
+    """
+    # Create output directory
+    try:
+        os.makedirs(output_path, exist_ok=False)
+        print(f"Created output directory: {output_path}")
+    except OSError as e:
+        print(f"Error creating output directory '{output_path}': {e}\nPlease provide a valid output path.")
+        sys.exit(1)
+    
+    print(f"Indexing documents from: {documents_file}")
+    print(f"Output will be stored in: {output_path}")
+
+    docnos = []
+    dates = array.array('I')
+    headlines = []
+    lexicon = {}
+    inverted_index = []
+    doc_lengths = array.array('I')
+    block = {}
+    block_pairs = 0
+    block_paths = []
+    blocks_path = os.path.join(output_path, "blocks")
+    doc_magnitudes = []
+    positions_index = []
+    position_block = {}
+    block_positions = 0
+    position_block_paths = []
+    position_blocks_path = os.path.join(blocks_path, "positions")
+
+    try:
+        docs_writer = DocsWriter(f"{output_path}/docs.bin", dictionary_path=f"{output_path}/{DOCS_DICTIONARY_FILE}")
+    except (OSError, IOError) as e:
+        print(f"Error writing to docs.bin: {e}")
+        sys.exit(1)
+
+    # Snippet records are written as they are parsed, after the schema name
+    snippet_offsets = array.array('I')
+    if snippets:
+        try:
+            snippetsbin = open(f"{output_path}/{SNIPPETS_FILE}", "wb")
+            snippet_header = f"{schema['name']}\n".encode('utf-8')
+            snippetsbin.write(snippet_header)
+            snippet_offset = len(snippet_header)
+        except (OSError, IOError) as e:
+            print(f"Error writing to {SNIPPETS_FILE}: {e}")
+            sys.exit(1)
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers else None
+
+    # Decode and append documents
+    try:
+        with gzip.open(documents_file, 'rt', encoding='utf-8') if lines is None else nullcontext(lines) as f:
+            if workers:
+                chunks = split_documents(f, schema["document"][0])
+                parse_schema_chunk = partial(parse_chunk, schema=schema, tokenize_function=tokenize_function, snippets=snippets, positions=positions)
+                parsed_documents = parse_in_parallel(executor, parse_schema_chunk, chunks, workers * 2)
+            else:
+                parsed_documents = parse_documents(f, schema, tokenize_function, positions)
+                if snippets:
+                    parsed_documents = add_snippets(parsed_documents, schema, tokenize_function)
+
+            index = 0
+            for docno, date, headline, raw_document, term_counts, doc_length, *snippet_record in parsed_documents:
+                # Term positions come before the snippet record
+                if positions:
+                    term_positions, *snippet_record = snippet_record
+                metadata_string = f"docno: {docno}\ninternal id: {doc_base + index}\ndate: {date}\nheadline: {headline}\nraw document:\n"
+                docnos.append(docno)
+                dates.append(schema["date_number"](docno))
+                headlines.append(headline.strip())
+                try:
+                    docs_writer.add(metadata_string + raw_document)
+                except (OSError, IOError) as e:
+                    print(f"Error writing to docs.bin: {e}")
+                    sys.exit(1)
+                if snippets:
+                    try:
+                        snippet_offsets.append(snippet_offset)
+                        snippetsbin.write(snippet_record[0])
+                        snippet_offset += len(snippet_record[0])
+                    except (OSError, IOError) as e:
+                        print(f"Error writing to {SNIPPETS_FILE}: {e}")
+                        sys.exit(1)
+                word_counts = {}
+                convert_counts_to_ids(term_counts, lexicon, word_counts)
+                if memory_budget:
+                    block_pairs += add_to_block(word_counts, index, block)
+                    if positions:
+                        block_positions += add_to_position_block(term_positions, lexicon, position_block)
+                    if block_pairs * POSTING_PAIR_BYTES + block_positions * POSITION_BYTES >= memory_budget * 1024 * 1024:
+                        try:
+                            flush_block(block, blocks_path, block_paths)
+                            if positions:
+                                flush_block(position_block, position_blocks_path, position_block_paths)
+                        except (OSError, IOError) as e:
+                            print(f"Error writing postings block: {e}")
+                            sys.exit(1)
+                        block = {}
+                        block_pairs = 0
+                        position_block = {}
+                        block_positions = 0
+                else:
+                    add_to_postings(word_counts, index, inverted_index)
+                    if positions:
+                        add_to_positions(term_positions, lexicon, positions_index)
+                doc_lengths.append(doc_length)
+                doc_magnitude = calculate_magnitude(word_counts)
+                doc_magnitudes.append(doc_magnitude)
+                index += 1
+    except (OSError, IOError, gzip.BadGzipFile, zlib.error) as e:
+        print(f"Error reading gzip file '{documents_file}': {e}")
+        sys.exit(1)
+    except UnicodeDecodeError as e:
+        print(f"Error decoding file '{documents_file}': {e}")
+        sys.exit(1)
+    finally:
+        if executor:
+            executor.shutdown()
+        if snippets:
+            snippetsbin.close()
+    
+    try:
+        offsets = docs_writer.close()
+    except (OSError, IOError) as e:
+        print(f"Error writing to docs.bin: {e}")
+        sys.exit(1)
+
+    if not docnos:
+        print(f"Warning: No documents found in '{documents_file}'")
+    
+    print(f"Found {len(docnos)} documents to index")
+
+    # Flush the last partial block
+    if memory_budget and block:
+        try:
+            flush_block(block, blocks_path, block_paths)
+            if positions:
+                flush_block(position_block, position_blocks_path, position_block_paths)
+        except (OSError, IOError) as e:
+            print(f"Error writing postings block: {e}")
+            sys.exit(1)
+
+    if memory_budget:
+        print(f"Merging {len(block_paths)} postings blocks")
+        postings = merge_blocks(block_paths)
+        position_lists = merge_blocks(position_block_paths)
+    else:
+        postings = inverted_index
+        position_lists = positions_index
+    if not positions:
+        position_lists = repeat(None)
+    
+    index_offsets = array.array('I')
+    document_frequencies = array.array('I')
+    collection_frequencies = array.array('Q')
+    term_bounds = array.array('d')
+    average_doc_length = sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0
+    
+    # Write files
+    try:
+        with open(f"{output_path}/offsets.bin", "wb") as offsetbin:
+            offsets.tofile(offsetbin)
+    except (OSError, IOError) as e:
+        print(f"Error writing to offsets.bin: {e}")
+        sys.exit(1)
+
+    impact_offsets = array.array('I')
+    position_offsets = array.array('I')
+    try:
+        offset = 0
+        impact_offset = 0
+        position_offset = 0
+        with (
+            open(f"{output_path}/inverted_index.bin", "wb") as invertedindexbin,
+            open(f"{output_path}/{IMPACTS_FILE}", "wb") if impacts else nullcontext() as impactsbin,
+            open(f"{output_path}/{POSITIONS_FILE}", "wb") if positions else nullcontext() as positionsbin,
+        ):
+            for posting, gaps in zip(postings, position_lists):
+                index_offsets.append(offset)
+                document_frequencies.append(len(posting) // 2)
+                collection_frequencies.append(sum(posting[1::2]))
+                term_bounds.append(bm25_term_bound(posting, doc_lengths, average_doc_length))
+                zipped_posting = encode_postings(posting)
+                invertedindexbin.write(zipped_posting)
+                offset += len(zipped_posting)
+                if impacts:
+                    impact_offsets.append(impact_offset)
+                    zipped_impacts = encode_impacts(posting, doc_lengths, average_doc_length)
+                    impactsbin.write(zipped_impacts)
+                    impact_offset += len(zipped_impacts)
+                if positions:
+                    position_offsets.append(position_offset)
+                    zipped_positions = encode_positions(gaps, posting[1::2])
+                    positionsbin.write(zipped_positions)
+                    position_offset += len(zipped_positions)
+        index_offsets.append(offset)
+        impact_offsets.append(impact_offset)
+        position_offsets.append(position_offset)
+    except (OSError, IOError) as e:
+        print(f"Error writing to inverted_index.bin: {e}")
+        sys.exit(1)
+
+    if block_paths:
+        # zip stops at the end of the postings, so the positions merge is closed to clean up after itself
+        if positions:
+            position_lists.close()
+        remove_blocks(position_blocks_path, position_block_paths)
+        remove_blocks(blocks_path, block_paths)
+
+    try:
+        with open(f"{output_path}/index_offsets.bin", "wb") as indexoffsetsbin:
+            index_offsets.tofile(indexoffsetsbin)
+    except (OSError, IOError) as e:
+        print(f"Error writing to index_offsets.bin: {e}")
+        sys.exit(1)
+
+    try:
+        write_docnos(output_path, docnos)
+    except (OSError, IOError) as e:
+        print(f"Error writing to docnos.bin: {e}")
+        sys.exit(1)
+
+    try:
+        write_column(f"{output_path}/{DATES_FILE}", 'I', dates)
+        write_strings(f"{output_path}/{HEADLINES_FILE}", f"{output_path}/{HEADLINE_OFFSETS_FILE}", headlines)
+    except (OSError, IOError) as e:
+        print(f"Error writing to {HEADLINES_FILE}: {e}")
+        sys.exit(1)
+
+    try:
+        write_column(f"{output_path}/{DOC_LENGTHS_FILE}", 'I', doc_lengths)
+    except (OSError, IOError) as e:
+        print(f"Error writing to {DOC_LENGTHS_FILE}: {e}")
+        sys.exit(1)
+
+    try:
+        write_column(f"{output_path}/{DOC_MAGNITUDES_FILE}", 'd', doc_magnitudes)
+    except (OSError, IOError) as e:
+        print(f"Error writing to {DOC_MAGNITUDES_FILE}: {e}")
+        sys.exit(1)
+
+    # The text files are only an export, the search engine reads the binary columns
+    if text_files:
+        for file_name, values in [("docnos.txt", docnos), ("doc_lengths.txt", doc_lengths), ("doc_magnitudes.txt", doc_magnitudes)]:
+            try:
+                write_text_column(f"{output_path}/{file_name}", values)
+            except (OSError, IOError) as e:
+                print(f"Error writing to {file_name}: {e}")
+                sys.exit(1)
+
+    try:
+        write_column(f"{output_path}/{TERM_BOUNDS_FILE}", 'd', term_bounds)
+    except (OSError, IOError) as e:
+        print(f"Error writing to {TERM_BOUNDS_FILE}: {e}")
+        sys.exit(1)
+
+    try:
+        write_column(f"{output_path}/{COLLECTION_FREQUENCIES_FILE}", 'Q', collection_frequencies)
+    except (OSError, IOError) as e:
+        print(f"Error writing to {COLLECTION_FREQUENCIES_FILE}: {e}")
+        sys.exit(1)
+
+    try:
+        write_collection_stats(f"{output_path}/{COLLECTION_STATS_FILE}", doc_lengths, document_frequencies)
+    except (OSError, IOError) as e:
+        print(f"Error writing to {COLLECTION_STATS_FILE}: {e}")
+        sys.exit(1)
+
+    if impacts:
+        try:
+            write_column(f"{output_path}/{IMPACT_OFFSETS_FILE}", 'I', impact_offsets)
+        except (OSError, IOError) as e:
+            print(f"Error writing to {IMPACT_OFFSETS_FILE}: {e}")
+            sys.exit(1)
+
+    if snippets:
+        snippet_offsets.append(snippet_offset)
+        try:
+            write_column(f"{output_path}/{SNIPPET_OFFSETS_FILE}", 'I', snippet_offsets)
+        except (OSError, IOError) as e:
+            print(f"Error writing to {SNIPPET_OFFSETS_FILE}: {e}")
+            sys.exit(1)
+
+    if positions:
+        try:
+            write_column(f"{output_path}/{POSITION_OFFSETS_FILE}", 'I', position_offsets)
+        except (OSError, IOError) as e:
+            print(f"Error writing to {POSITION_OFFSETS_FILE}: {e}")
+            sys.exit(1)
+
+    try:
+        write_lexicon(f"{output_path}/lexicon.bin", lexicon, document_frequencies, index_offsets)
+    except (OSError, IOError) as e:
+        print(f"Error writing to lexicon.bin: {e}")
+        sys.exit(1)
+
+    try:
+        with open(f"{output_path}/{TOKENIZER_FILE}", "w") as tokenizertxt:
+            tokenizertxt.write(f"{tokenize_function.__name__}\n")
+    except (OSError, IOError) as e:
+        print(f"Error writing to {TOKENIZER_FILE}: {e}")
+        sys.exit(1)
+
+    try:
+        with open(f"{output_path}/{SCHEMA_FILE}", "w") as schematxt:
+            schematxt.write(f"{schema['name']}\n")
+    except (OSError, IOError) as e:
+        print(f"Error writing to {SCHEMA_FILE}: {e}")
+        sys.exit(1)
+
+    print(f"Output files created: docs.bin, {DOCS_DICTIONARY_FILE}, offsets.bin, docnos.bin, docno_offsets.bin, {DOC_LENGTHS_FILE}, {DOC_MAGNITUDES_FILE}, {DATES_FILE}, {HEADLINES_FILE}, {HEADLINE_OFFSETS_FILE}, lexicon.bin, inverted_index.bin, index_offsets.bin, {TERM_BOUNDS_FILE}, {COLLECTION_FREQUENCIES_FILE}, {COLLECTION_STATS_FILE}, {TOKENIZER_FILE}, {SCHEMA_FILE}")
+    if text_files:
+        print(f"Text files exported: docnos.txt, doc_lengths.txt, doc_magnitudes.txt")
+    if impacts:
+        print(f"Impact files created: {IMPACTS_FILE}, {IMPACT_OFFSETS_FILE}")
+    if snippets:
+        print(f"Snippet files created: {SNIPPETS_FILE}, {SNIPPET_OFFSETS_FILE}")
+    if positions:
+        print(f"Position files created: {POSITIONS_FILE}, {POSITION_OFFSETS_FILE}")
+
+    return len(docnos)
+
+def append_segment(documents_file: str, index_path: str, schema: dict, tokenize_function=tokenize, memory_budget: int | None = None, workers: int | None = None, text_files: bool = False, impacts: bool = False, snippets: bool = False, positions: bool = False) -> None:
+    """
+    Indexes a corpus as a new immutable segment of an existing index.
+
+    The segment is a complete index in its own subdirectory, with doc ids that continue
+    from the existing documents. It only becomes visible to searchers once it is listed
+    in the segments manifest. A background merge is started if the merge policy finds
+    small segments to compact.
+    """
+    lock_path = os.path.join(index_path, INDEX_LOCK_FILE)
+    if not acquire_lock(lock_path):
+        print(f"Error: Timed out waiting for the lock on '{index_path}'.\nIf no other indexer is running, remove {lock_path}.")
+        sys.exit(1)
+
+    try:
+        manifest = read_manifest(index_path)
+        if manifest["schema"] != schema["name"] or manifest["tokenizer"] != tokenize_function.__name__:
+            print(f"Error: '{index_path}' holds {manifest['schema']} documents indexed with {manifest['tokenizer']}.\nPlease append with the matching index engine.")
+            sys.exit(1)
+
+        # Reserve the segment name first so a failed build never reuses a partial directory
+        segment_name = f"segment_{manifest['next_segment']}"
+        manifest["next_segment"] += 1
+        write_manifest(index_path, manifest)
+
+        doc_base = segment_doc_base(manifest, len(manifest["segments"]))
+        documents = build_index(documents_file, os.path.join(index_path, segment_name), schema, tokenize_function, memory_budget, workers, doc_base, text_files=text_files, impacts=impacts, snippets=snippets, positions=positions)
+
+        if not documents:
+            shutil.rmtree(os.path.join(index_path, segment_name), ignore_errors=True)
+            print(f"No documents found in {documents_file}, nothing was appended")
+            return
+
+        manifest["segments"].append({"name": segment_name, "documents": documents})
+        write_manifest(index_path, manifest)
+    finally:
+        release_lock(lock_path)
+
+    print(f"Appended segment {segment_name} with {documents} documents")
+
+    if select_merge(manifest):
+        merge_script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "MergeSegments.py")
+        subprocess.Popen([sys.executable, merge_script, index_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+        print(f"Started a background merge of small segments")
+
+def merge_segments(index_path: str, merge_factor: int = MERGE_FACTOR) -> None:
+    """
+    Compacts appended segments until the merge policy finds nothing left to merge.
+
+    Each selected run of segments is re-indexed from the raw documents in their doc stores
+    into one new segment with the same doc ids, which then replaces the run in the manifest.
+    Only one merge runs per index at a time, and appends are only blocked while the
+    manifest is updated.
+    """
+    merge_lock_path = os.path.join(index_path, MERGE_LOCK_FILE)
+    lock_path = os.path.join(index_path, INDEX_LOCK_FILE)
+    if not acquire_lock(merge_lock_path, wait=False):
+        print(f"A merge is already running on '{index_path}'")
+        return
+
+    try:
+        while True:
+            if not acquire_lock(lock_path):
+                print(f"Error: Timed out waiting for the lock on '{index_path}'.")
+                sys.exit(1)
+            try:
+                manifest = read_manifest(index_path)
+                positions = select_merge(manifest, merge_factor)
+                if not positions:
+                    break
+                merged_name = f"segment_{manifest['next_segment']}"
+                manifest["next_segment"] += 1
+                write_manifest(index_path, manifest)
+            finally:
+                release_lock(lock_path)
+
+            selected = [manifest["segments"][position]["name"] for position in positions]
+            print(f"Merging {', '.join(selected)} into {merged_name}")
+            lines = (line for name in selected for line in read_segment_lines(os.path.join(index_path, name)))
+            documents = build_index(
+                f"segments {', '.join(selected)}",
+                os.path.join(index_path, merged_name),
+                SCHEMAS[manifest["schema"]],
+                TOKENIZERS[manifest["tokenizer"]],
+                doc_base=segment_doc_base(manifest, positions[0]),
+                lines=lines,
+                # Merged segments keep impacts if the segments they replace had them
+                impacts=all(os.path.exists(os.path.join(index_path, name, IMPACTS_FILE)) for name in selected),
+                snippets=all(os.path.exists(os.path.join(index_path, name, SNIPPETS_FILE)) for name in selected),
+                positions=all(os.path.exists(os.path.join(index_path, name, POSITIONS_FILE)) for name in selected),
+            )
+
+            if not acquire_lock(lock_path):
+                print(f"Error: Timed out waiting for the lock on '{index_path}'.")
+                sys.exit(1)
+            try:
+                # Appends only add segments at the end, so the merged run is still in place
+                manifest = read_manifest(index_path)
+                names = [segment["name"] for segment in manifest["segments"]]
+                start = names.index(selected[0])
+                manifest["segments"][start:start + len(selected)] = [{"name": merged_name, "documents": documents}]
+                write_manifest(index_path, manifest)
+            finally:
+                release_lock(lock_path)
+
+            for name in selected:
+                shutil.rmtree(os.path.join(index_path, name), ignore_errors=True)
+    finally:
+        release_lock(merge_lock_path)
@@ -0,0 +1,62 @@
+import array
+import struct
+
+# lexicon.bin layout: header, block offsets, then blocks of front-coded terms in sorted
+# UTF-8 byte order. The search engine mmaps the file and binary searches the blocks
+# (see SearchEngine/RetrievalMethods/utils/lexicon_utils.py).
+LEXICON_MAGIC = b"CLEX"
+LEXICON_VERSION = 1
+# Terms per block. Each block starts with a full term and is scanned linearly.
+LEXICON_BLOCK_TERMS = 16
+# Magic, version, terms per block, term count, block count
+LEXICON_HEADER = struct.Struct("<4sBxxxIII")
+# Length of the prefix shared with the previous term in the block, length of the rest
+TERM_HEADER = struct.Struct("<HI")
+# Term id, document frequency, postings offset and postings length in inverted_index.bin
+TERM_ENTRY = struct.Struct("<IIII")
+
+
+def shared_prefix_length(previous: bytes, term: bytes) -> int:
+    """
+    Gets the length of the common prefix of two terms, capped to fit the term header.
+    """
+    limit = min(len(previous), len(term), 0xFFFF)
+    length = 0
+    while length < limit and previous[length] == term[length]:
+        length += 1
+
+    return length
+
+def write_lexicon(lexicon_path: str, lexicon: dict[str, int], document_frequencies: array.array, index_offsets: array.array) -> None:
+    """
+    Writes the lexicon as sorted, front-coded blocks of terms with their postings entries.
+
+    Args:
+        lexicon_path: The path of the lexicon.bin file to create.
+        lexicon: Maps each term to its term id.
+        document_frequencies: The number of documents containing each term, by term id.
+        index_offsets: The postings offsets in inverted_index.bin, by term id, followed by the end offset.
+    """
+    terms = sorted((term.encode('utf-8'), term_id) for term, term_id in lexicon.items())
+    block_count = (len(terms) + LEXICON_BLOCK_TERMS - 1) // LEXICON_BLOCK_TERMS
+    data_start = LEXICON_HEADER.size + (block_count + 1) * 4
+
+    blocks = bytearray()
+    block_offsets = array.array('I')
+    previous = b""
+    for i, (term, term_id) in enumerate(terms):
+        if i % LEXICON_BLOCK_TERMS == 0:
+            block_offsets.append(data_start + len(blocks))
+            previous = b""
+        prefix_length = shared_prefix_length(previous, term)
+        blocks += TERM_HEADER.pack(prefix_length, len(term) - prefix_length)
+        blocks += term[prefix_length:]
+        postings_offset = index_offsets[term_id]
+        blocks += TERM_ENTRY.pack(term_id, document_frequencies[term_id], postings_offset, index_offsets[term_id + 1] - postings_offset)
+        previous = term
+    block_offsets.append(data_start + len(blocks))
+
+    with open(lexicon_path, "wb") as lexiconbin:
+        lexiconbin.write(LEXICON_HEADER.pack(LEXICON_MAGIC, LEXICON_VERSION, LEXICON_BLOCK_TERMS, len(terms), block_count))
+        block_offsets.tofile(lexiconbin)
+        lexiconbin.write(blocks)
@@ -0,0 +1,43 @@
+def parse_options(args: list[str], options: dict[str, bool]) -> dict[str, str | bool]:
+    """
+    Parses the optional "--name value" and "--flag" arguments that follow the positional ones.
+
+    Args:
+        args: The arguments left after the positional arguments.
+        options: Maps each allowed option name to whether it takes a value.
+
+    Returns:
+        A dictionary of the options that were given. Flags map to True.
+    """
+    parsed = {}
+    i = 0
+    while i < len(args):
+        name = args[i]
+        if name not in options:
+            raise ValueError(f"Unknown option '{name}'")
+        if options[name]:
+            if i + 1 >= len(args):
+                raise ValueError(f"Option '{name}' requires a value")
+            parsed[name] = args[i + 1]
+            i += 2
+        else:
+            parsed[name] = True
+            i += 1
+
+    return parsed
+
+def parse_positive_int(options: dict[str, str | bool], name: str) -> int | None:
+    """
+    Gets a positive integer option, or None if the option was not given.
+    """
+    if name not in options:
+        return None
+
+    try:
+        value = int(options[name])
+    except ValueError:
+        raise ValueError(f"Option '{name}' must be an integer, got '{options[name]}'") from None
+    if value <= 0:
+        raise ValueError(f"Option '{name}' must be greater than 0, got {value}")
+
+    return value
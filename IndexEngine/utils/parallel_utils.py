@@ -0,0 +1,43 @@
+from collections import deque
+
+# Number of documents handed to a worker process at a time
+CHUNK_DOCUMENTS = 500
+
+
+def split_documents(lines, start_tag: str, chunk_documents: int = CHUNK_DOCUMENTS):
+    """
+    Splits an iterable of lines into chunks of whole documents.
+
+    A new chunk is started at the line containing start_tag once the current chunk
+    holds chunk_documents documents.
+    """
+    chunk = []
+    count = 0
+    for line in lines:
+        if start_tag in line:
+            if count == chunk_documents:
+                yield chunk
+                chunk = []
+                count = 0
+            count += 1
+        chunk.append(line)
+
+    if chunk:
+        yield chunk
+
+def parse_in_parallel(executor, parse_chunk, chunks, max_pending: int):
+    """
+    Parses chunks in an executor and yields the parsed documents in corpus order.
+
+    At most max_pending chunks are in flight so the corpus is never read into memory
+    ahead of the indexer. Keeping corpus order lets the caller assign doc ids and
+    term ids exactly as a single process build would.
+    """
+    pending = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(parse_chunk, chunk))
+        if len(pending) >= max_pending:
+            yield from pending.popleft().result()
+
+    while pending:
+        yield from pending.popleft().result()
@@ -0,0 +1,185 @@
+import re
+from collections import Counter
+try:
+    from utils.date_utils import convert_month_to_letter
+    from utils.tokenize_utils import tokenize, token_positions
+    from utils.snippet_utils import add_snippets
+except ImportError:
+    from .date_utils import convert_month_to_letter
+    from .tokenize_utils import tokenize, token_positions
+    from .snippet_utils import add_snippets
+
+
+def format_trec_date(docno: str) -> str:
+    """
+    Gets the display date of an LA Times (1989-1990) document from its DOCNO.
+    """
+    return f"{convert_month_to_letter(docno[2:4])} {docno[4:6]}, 19{docno[6:8]}"
+
+def format_xml_date(docno: str) -> str:
+    """
+    Gets the display date of an XML LA Times (covid era) document from its DOCNO.
+    """
+    return f"{convert_month_to_letter(docno[2:4])} {docno[4:6]}, {docno[6:10]}"
+
+def date_number(year: str, month: str, day: str) -> int:
+    """
+    Gets a date as a YYYYMMDD integer, or 0 if it is not all ASCII digits.
+    """
+    digits = f"{year}{month}{day}"
+    return int(digits) if digits.isascii() and digits.isdigit() else 0
+
+def trec_date_number(docno: str) -> int:
+    """
+    Gets the date of an LA Times (1989-1990) document from its DOCNO as a YYYYMMDD integer.
+    """
+    return date_number(f"19{docno[6:8]}", docno[2:4], docno[4:6])
+
+def xml_date_number(docno: str) -> int:
+    """
+    Gets the date of an XML LA Times (covid era) document from its DOCNO as a YYYYMMDD integer.
+    """
+    return date_number(docno[6:10], docno[2:4], docno[4:6])
+
+# Corpus schemas. The first field is the headline and fields are listed in the
+# order they take precedence when a line matches more than one of them. The snippet
+# fields are the lowercase headline, text and caption tags query-biased summaries
+# split into sentences.
+TREC_SCHEMA = {
+    "name": "trec",
+    "document": ("<DOC>", "</DOC>"),
+    "docno": ("<DOCNO>", "</DOCNO>"),
+    "fields": [("<HEADLINE>", "</HEADLINE>"), ("<TEXT>", "</TEXT>"), ("<GRAPHIC>", "</GRAPHIC>")],
+    "snippet_fields": [("headline", "/headline"), ("text", "/text"), ("graphic", "/graphic")],
+    "date": format_trec_date,
+    "date_number": trec_date_number,
+}
+
+XML_SCHEMA = {
+    "name": "xml",
+    "document": ("<document>", "</document>"),
+    "docno": ("<docno>", "</docno>"),
+    "fields": [("<title>", "</title>"), ("<content>", "</content>"), ('<item key="og_image:alt">', "</item>")],
+    "snippet_fields": [("title", "/title"), ("content", "/content"), ('item key="og_image:alt"', "/item")],
+    "date": format_xml_date,
+    "date_number": xml_date_number,
+}
+
+SCHEMAS = {schema["name"]: schema for schema in [TREC_SCHEMA, XML_SCHEMA]}
+# Names the schema of an index's documents, so segments appended to it are checked against it
+SCHEMA_FILE = "schema.txt"
+
+# Dispatch priorities, lower wins when a line matches several rules
+DOCUMENT_START_RULE, DOCUMENT_END_RULE, DOCNO_RULE = 0, 1, 2
+FIELD_OPEN, FIELD_CLOSE, FIELD_BODY = 0, 1, 2
+
+
+def compile_schema(schema: dict) -> tuple[re.Pattern, dict[str, int]]:
+    """
+    Builds the tag pattern and the tag to priority table for a schema.
+
+    A field's open tag, close tag and body rule come right after each other, so a
+    field's body outranks every tag of the fields after it.
+    """
+    priorities = {
+        schema["document"][0]: DOCUMENT_START_RULE,
+        schema["document"][1]: DOCUMENT_END_RULE,
+        schema["docno"][0]: DOCNO_RULE,
+    }
+    for i, (open_tag, close_tag) in enumerate(schema["fields"]):
+        priorities.setdefault(open_tag, 3 + 3 * i + FIELD_OPEN)
+        priorities.setdefault(close_tag, 3 + 3 * i + FIELD_CLOSE)
+
+    pattern = re.compile("|".join(re.escape(tag) for tag in priorities))
+    return pattern, priorities
+
+def parse_documents(lines, schema: dict = TREC_SCHEMA, tokenize_function=tokenize, positions: bool = False):
+    """
+    Parses documents from an iterable of lines using a corpus schema.
+
+    Each line is scanned once for the schema's tags and dispatched through a priority
+    table, matching the rules of the original per-tag if/elif cascade. Plain text lines
+    and lines with only unknown tags (such as <P>) never leave the fast path.
+
+    The text of the indexed fields is collected and tokenized once per document, which
+    gives the same tokens as tokenizing each line since lines are joined with spaces.
+
+    Yields (docno, date, headline, raw document, term counts, doc length) for each document,
+    where term counts is a Counter of the tokens in first-occurrence order. With positions,
+    the positions of each token in the indexed text are added to the end, in the same order.
+    """
+    pattern, priorities = compile_schema(schema)
+    find_tags = pattern.findall
+    fields = schema["fields"]
+    docno_open, docno_close = schema["docno"]
+    format_date = schema["date"]
+    no_field = 3 + 3 * len(fields)
+
+    document = []
+    active = [False] * len(fields)
+    field = None
+    body_rule = no_field
+    for line in lines:
+        if "<" not in line:
+            document.append(line)
+            if field is None or not line:
+                continue
+            text = line.strip()
+            if field == 0:
+                headline += f"{text} "
+        else:
+            tags = find_tags(line)
+            if not tags:
+                document.append(line)
+                continue
+            rule = priorities[tags[0]] if len(tags) == 1 else min([priorities[tag] for tag in tags])
+            if rule >= body_rule:
+                document.append(line)
+                continue
+
+            if rule == DOCUMENT_START_RULE:
+                document = [line]
+                headline = ""
+                texts = []
+                continue
+            elif rule == DOCUMENT_END_RULE:
+                document.append(line)
+                words = []
+                tokenize_function(" ".join(texts), words)
+                if positions:
+                    yield docno, date, headline, "".join(document), Counter(words), len(words), token_positions(words)
+                else:
+                    yield docno, date, headline, "".join(document), Counter(words), len(words)
+                continue
+            elif rule == DOCNO_RULE:
+                docno = line.replace(docno_open, '').replace(docno_close, '').strip()
+                date = format_date(docno)
+                document.append(line)
+                continue
+
+            document.append(line)
+            tag_field, action = divmod(rule - 3, 3)
+            open_tag, close_tag = fields[tag_field]
+            if action == FIELD_OPEN and close_tag in tags:
+                text = line.replace(open_tag, '').replace(close_tag, '').strip()
+                if tag_field == 0:
+                    headline = text
+            else:
+                # Opening or closing a field changes which field's body rule applies
+                active[tag_field] = action == FIELD_OPEN
+                field = active.index(True) if True in active else None
+                body_rule = 3 + 3 * field + FIELD_BODY if field is not None else no_field
+                continue
+
+        texts.append(text)
+
+def parse_chunk(lines: list[str], schema: dict = TREC_SCHEMA, tokenize_function=tokenize, snippets: bool = False, positions: bool = False) -> list[tuple]:
+    """
+    Parses a chunk of whole documents in a worker process, with the term positions and
+    then the snippet record of each document added to the end of its tuple if positions
+    and snippets are set.
+    """
+    parsed_documents = parse_documents(lines, schema, tokenize_function, positions)
+    if snippets:
+        parsed_documents = add_snippets(parsed_documents, schema, tokenize_function)
+    return list(parsed_documents)
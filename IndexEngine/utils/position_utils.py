@@ -0,0 +1,79 @@
+import array
+import zlib
+try:
+    from utils.postings_utils import smallest_typecode
+except ImportError:
+    from .postings_utils import smallest_typecode
+
+# Positions of each term in each document of its postings, by term id, and the offset of
+# each term's positions (see SearchEngine/RetrievalMethods/utils/position_utils.py)
+POSITIONS_FILE = "positions.bin"
+POSITION_OFFSETS_FILE = "position_offsets.bin"
+# First byte of a positions list
+POSITIONS_VERSION = 2
+# Postings whose positions are compressed together, so a phrase query only decompresses
+# the blocks of the documents it checks
+POSITION_BLOCK_POSTINGS = 128
+# Rough in-memory cost of one position held in a block's Python lists
+POSITION_BYTES = 36
+
+
+def delta_code(positions: list[int]) -> list[int]:
+    """
+    Gets the first position followed by the gap to each next position.
+    """
+    return [positions[0]] + [positions[i] - positions[i - 1] for i in range(1, len(positions))]
+
+def add_to_positions(term_positions: dict[str, list[int]], lexicon: dict[str, int], positions_index: list[list[int]]) -> None:
+    """
+    Adds the delta-coded positions of each term of a document to the positions index.
+    Terms are visited in first-occurrence order, so new term ids are added in order.
+    """
+    for token, positions in term_positions.items():
+        token_id = lexicon[token]
+        if token_id < len(positions_index):
+            positions_index[token_id].extend(delta_code(positions))
+        else:
+            positions_index.append(delta_code(positions))
+
+def add_to_position_block(term_positions: dict[str, list[int]], lexicon: dict[str, int], block: dict[int, list[int]]) -> int:
+    """
+    Adds the delta-coded positions of each term of a document to an in-memory SPIMI block.
+
+    Returns the number of positions added to the block.
+    """
+    added = 0
+    for token, positions in term_positions.items():
+        block.setdefault(lexicon[token], []).extend(delta_code(positions))
+        added += len(positions)
+
+    return added
+
+def encode_positions(gaps: list[int], counts: list[int]) -> bytes:
+    """
+    Encodes the delta-coded positions of a term, one run per document of its postings.
+
+    Each document's run holds as many gaps as the term's count in it, so the postings
+    tell where each run starts. The runs are compressed in blocks of
+    POSITION_BLOCK_POSTINGS postings.
+
+    Layout: version byte, gap typecode, then the postings per block, the number of blocks
+    and the end offset of each compressed block after the header (unsigned ints), then
+    each block as zlib of its gaps packed as fixed width native integers.
+
+    Args:
+        gaps: The delta-coded positions of every posting, in postings order.
+        counts: The term's count in each document of its postings.
+    """
+    gap_type = smallest_typecode(gaps)
+    blocks = []
+    block_ends = array.array('I')
+    start = 0
+    for first in range(0, len(counts), POSITION_BLOCK_POSTINGS):
+        end = start + sum(counts[first:first + POSITION_BLOCK_POSTINGS])
+        blocks.append(zlib.compress(array.array(gap_type, gaps[start:end]).tobytes()))
+        block_ends.append((block_ends[-1] if block_ends else 0) + len(blocks[-1]))
+        start = end
+
+    header = array.array('I', [POSITION_BLOCK_POSTINGS, len(blocks)]) + block_ends
+    return bytes([POSITIONS_VERSION, ord(gap_type)]) + header.tobytes() + b"".join(blocks)
@@ -0,0 +1,37 @@
+import array
+import zlib
+
+# First byte of a v2 postings list. Version 1 lists are zlib streams of JSON, which
+# always start with 0x78, so readers can tell the two formats apart per list.
+POSTINGS_VERSION = 2
+
+
+def smallest_typecode(values: array.array) -> str:
+    """
+    Gets the narrowest unsigned array typecode that can hold every value.
+    """
+    largest = max(values) if values else 0
+    if largest < 1 << 8:
+        return 'B'
+    if largest < 1 << 16:
+        return 'H'
+    return 'I'
+
+def encode_postings(posting: list[int]) -> bytes:
+    """
+    Encodes a [doc id, count, doc id, count, ...] postings list in the v2 format.
+
+    Layout: version byte, gap typecode, count typecode, then zlib of the doc id gaps
+    followed by the counts, each packed as fixed width native integers.
+    """
+    doc_ids = posting[0::2]
+    gaps = array.array('I', [doc_ids[0]] if doc_ids else [])
+    for i in range(1, len(doc_ids)):
+        gaps.append(doc_ids[i] - doc_ids[i - 1])
+    counts = array.array('I', posting[1::2])
+
+    gap_type = smallest_typecode(gaps)
+    count_type = smallest_typecode(counts)
+    packed = array.array(gap_type, gaps).tobytes() + array.array(count_type, counts).tobytes()
+
+    return bytes([POSTINGS_VERSION, ord(gap_type), ord(count_type)]) + zlib.compress(packed)
@@ -0,0 +1,164 @@
+import io
+import json
+import os
+import time
+try:
+    from utils.docs_utils import read_documents
+    from utils.parse_utils import SCHEMA_FILE, SCHEMAS
+    from utils.tokenize_utils import TOKENIZER_FILE
+except ImportError:
+    from .docs_utils import read_documents
+    from .parse_utils import SCHEMA_FILE, SCHEMAS
+    from .tokenize_utils import TOKENIZER_FILE
+
+# Manifest listing the segments appended to an index, in doc id order
+SEGMENTS_FILE = "segments.json"
+# Held while the manifest is read and updated, and for the whole of an append
+INDEX_LOCK_FILE = "index.lock"
+# Held by the single merge process allowed to run against an index
+MERGE_LOCK_FILE = "merge.lock"
+# Number of same-sized adjacent segments that get merged into one
+MERGE_FACTOR = 4
+
+
+def acquire_lock(lock_path: str, timeout: float = 600, wait: bool = True) -> bool:
+    """
+    Acquires a lock file by creating it exclusively.
+
+    Args:
+        lock_path: The path of the lock file.
+        timeout: Seconds to wait for the lock before giving up.
+        wait: Whether to wait for the lock if it is already held.
+
+    Returns:
+        True if the lock was acquired.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, str(os.getpid()).encode('utf-8'))
+            os.close(fd)
+            return True
+        except FileExistsError:
+            if not wait or time.monotonic() > deadline:
+                return False
+            time.sleep(0.1)
+
+def release_lock(lock_path: str) -> None:
+    """
+    Releases a lock file acquired with acquire_lock.
+    """
+    if os.path.exists(lock_path):
+        os.remove(lock_path)
+
+def count_base_documents(index_path: str) -> int:
+    """
+    Counts the documents in the base index stored at the root of the index directory.
+    """
+    # offsets.bin holds one offset per document plus the end of docs.bin
+    return os.path.getsize(os.path.join(index_path, "offsets.bin")) // 4 - 1
+
+def read_base_schema(index_path: str) -> str | None:
+    """
+    Gets the schema name of the base index's documents from schema.txt, or for indexes
+    built before it was written, from the opening tag of the first stored document.
+    """
+    schema_file = os.path.join(index_path, SCHEMA_FILE)
+    if os.path.exists(schema_file):
+        with open(schema_file, "r") as f:
+            return f.read().strip()
+
+    for document in read_documents(index_path):
+        # The metadata header is five lines: docno, internal id, date, headline, raw document:
+        raw_document = document.split("\n", 5)[5].lstrip()
+        for schema in SCHEMAS.values():
+            if raw_document.startswith(schema["document"][0]):
+                return schema["name"]
+        break
+
+    return None
+
+def read_manifest(index_path: str) -> dict:
+    """
+    Reads the segments manifest of an index, creating an empty one in memory if the
+    index has never had a segment appended. A new manifest takes its schema and
+    tokenizer from the base index, so the first append is checked against them too.
+    """
+    manifest_path = os.path.join(index_path, SEGMENTS_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            return json.load(f)
+
+    # Indexes built before tokenizer.txt was written were all tokenized without stemming
+    tokenizer_name = "tokenize"
+    tokenizer_file = os.path.join(index_path, TOKENIZER_FILE)
+    if os.path.exists(tokenizer_file):
+        with open(tokenizer_file, "r") as f:
+            tokenizer_name = f.read().strip()
+
+    return {
+        "schema": read_base_schema(index_path),
+        "tokenizer": tokenizer_name,
+        "base_documents": count_base_documents(index_path),
+        "next_segment": 1,
+        "segments": [],
+    }
+
+def write_manifest(index_path: str, manifest: dict) -> None:
+    """
+    Replaces the segments manifest atomically so searchers never see a partial file.
+    """
+    manifest_path = os.path.join(index_path, SEGMENTS_FILE)
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, manifest_path)
+
+def segment_doc_base(manifest: dict, position: int) -> int:
+    """
+    Gets the first global doc id of the segment at a position in the manifest.
+    """
+    return manifest["base_documents"] + sum(segment["documents"] for segment in manifest["segments"][:position])
+
+def select_merge(manifest: dict, merge_factor: int = MERGE_FACTOR) -> list[int] | None:
+    """
+    Picks adjacent segments to merge using a tiered (log-structured) policy.
+
+    Segments are bucketed into tiers of log base merge_factor of their size. The newest
+    run of merge_factor adjacent segments in the same tier is merged into one segment of
+    the next tier, so small daily segments are compacted while large ones are left alone.
+    The base index is never merged.
+
+    Returns:
+        The positions of the segments to merge, or None if nothing needs merging.
+    """
+    tiers = []
+    for segment in manifest["segments"]:
+        size = segment["documents"]
+        tier = 0
+        while size >= merge_factor:
+            size //= merge_factor
+            tier += 1
+        tiers.append(tier)
+
+    run_length = 0
+    for i in range(len(tiers) - 1, -1, -1):
+        if i == len(tiers) - 1 or tiers[i] != tiers[i + 1]:
+            run_length = 1
+        else:
+            run_length += 1
+        if run_length == merge_factor:
+            return list(range(i, i + merge_factor))
+
+    return None
+
+def read_segment_lines(segment_path: str):
+    """
+    Yields the lines of the raw documents stored in a segment's docs.bin, so they can be
+    parsed again exactly as they were read from the original corpus.
+    """
+    for document in read_documents(segment_path):
+        # The metadata header is five lines: docno, internal id, date, headline, raw document:
+        raw_document = document.split("\n", 5)[5]
+        yield from io.StringIO(raw_document, newline="\n")
@@ -0,0 +1,150 @@
+import array
+import zlib
+try:
+    from utils.postings_utils import smallest_typecode
+except ImportError:
+    from .postings_utils import smallest_typecode
+
+# Sentences of each document, split and tokenized at index time so query-biased summaries
+# only need to score them (see SearchEngine/RetrievalMethods/utils/snippet_utils.py).
+# snippets.bin starts with the schema name on its own line, followed by one compressed
+# record per document.
+SNIPPETS_FILE = "snippets.bin"
+SNIPPET_OFFSETS_FILE = "snippet_offsets.bin"
+# Words kept from a sentence in a summary, longer sentences end with "..."
+SUMMARY_SENTENCE_WORDS = 50
+# Weight added to the first sentence of a document's main text
+TEXT_START_WEIGHT = 2
+
+
+def split_sentences(doc_content: str, schema: dict, tokenize_function) -> list[tuple[int, list[str], list[str]]]:
+    """
+    Splits a raw document into the sentences get_query_biased_summary scores.
+
+    This is the summary's character loop without the scoring, so the sentences, their
+    words and their tokens are exactly the ones it builds on every query: headline and
+    caption fields are a sentence each, the main text is split on ".", "?" and "!", and
+    nothing after the end of the main text is read.
+
+    Args:
+        doc_content: The raw document.
+        schema: The corpus schema, whose snippet fields name the headline, text and caption tags.
+        tokenize_function: The function used to turn each word into tokens.
+
+    Returns:
+        The (weight, words, tokens) of each sentence, in document order.
+    """
+    (headline_tag, headline_end), (text_tag, text_end), (caption_tag, caption_end) = schema["snippet_fields"]
+    is_tag = False
+    is_start = False
+    is_headline = False
+    is_caption = False
+    sentences = []
+    sentence = []
+    tokenized_sentence = []
+    weight = 0
+    word = ""
+
+    for char in doc_content:
+
+        if char == ">":
+            is_tag = False
+
+        elif is_tag:
+            tag_name += char
+            tag = tag_name.lower()
+            if tag == headline_tag:
+                is_headline = True
+            elif tag == text_tag:
+                weight = TEXT_START_WEIGHT
+                is_start = True
+            elif tag == caption_tag:
+                is_caption = True
+
+            # The end of a field closes the sentence in progress
+            elif tag == headline_end or tag == text_end or tag == caption_end:
+                if tag == headline_end:
+                    is_headline = False
+                elif tag == caption_end:
+                    is_caption = False
+                if word:
+                    sentence.append(word)
+                    tokenize_function(word, tokenized_sentence)
+                sentences.append((weight, sentence, tokenized_sentence))
+                word = ""
+                sentence = []
+                tokenized_sentence = []
+                weight = 0
+                if tag == text_end:
+                    break
+
+        elif char == "<":
+            is_tag = True
+            tag_name = ""
+
+        elif not is_start and not is_headline and not is_caption:
+            continue
+
+        elif char == " ":
+            sentence.append(word)
+            tokenize_function(word, tokenized_sentence)
+            word = ""
+
+        elif char == "." or char == "?" or char == "!":
+            word += char
+            sentence.append(word)
+            tokenize_function(word, tokenized_sentence)
+            sentences.append((weight, sentence, tokenized_sentence))
+            word = ""
+            sentence = []
+            tokenized_sentence = []
+            weight = 0
+        else:
+            word += char
+
+    return sentences
+
+def encode_snippets(sentences: list[tuple[int, list[str], list[str]]]) -> bytes:
+    """
+    Encodes the sentences of a document as a compressed snippet record.
+
+    Tokens are numbered in the order they first appear in the document, and each sentence
+    keeps its weight, its token ids and the text a summary shows for it.
+
+    Layout: integer typecode, then zlib of the number of integers that follow (as an
+    unsigned int), the number of distinct tokens, the number of sentences and for each
+    sentence its weight, whether it was cut short, its token count and token ids, all in
+    the narrowest typecode that holds them. The distinct tokens and then the text of
+    each sentence follow as UTF-8, one per line.
+    """
+    term_ids = {}
+    numbers = array.array('I', [0, len(sentences)])
+    texts = []
+    for weight, words, tokens in sentences:
+        numbers.append(weight)
+        numbers.append(len(words) > SUMMARY_SENTENCE_WORDS)
+        numbers.append(len(tokens))
+        for token in tokens:
+            numbers.append(term_ids.setdefault(token, len(term_ids)))
+        texts.append(" ".join(words[:SUMMARY_SENTENCE_WORDS]).strip().replace("\n", ""))
+    numbers[0] = len(term_ids)
+
+    number_type = smallest_typecode(numbers)
+    text = "\n".join(list(term_ids) + texts).encode('utf-8')
+    return number_type.encode('ascii') + zlib.compress(array.array('I', [len(numbers)]).tobytes() + array.array(number_type, numbers).tobytes() + text)
+
+def summary_text(docno: str, date: str, headline: str, raw_document: str) -> str:
+    """
+    Gets the text summaries are built from, which the search engine takes from after the
+    "raw document:" line of the document stored in docs.bin.
+    """
+    # The internal id line is left out, it can never contain "raw document:"
+    return f"docno: {docno}\ndate: {date}\nheadline: {headline}\nraw document:\n{raw_document}".split("raw document:")[1].strip()
+
+def add_snippets(parsed_documents, schema: dict, tokenize_function):
+    """
+    Yields each parsed document with its compressed snippet record added to the end.
+    """
+    for document in parsed_documents:
+        sentences = split_sentences(summary_text(*document[:4]), schema, tokenize_function)
+        yield document + (encode_snippets(sentences),)
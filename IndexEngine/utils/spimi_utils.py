@@ -0,0 +1,132 @@
+import array
+import heapq
+import os
+
+# Rough in-memory cost of one (doc id, count) pair held in a block's Python lists
+POSTING_PAIR_BYTES = 72
+# Most blocks merged at once, so a large build never holds a file open per block
+MERGE_FAN_IN = 64
+
+
+def add_to_block(word_counts: dict[int, int], doc_id: int, block: dict[int, list[int]]) -> int:
+    """
+    Adds the word counts and doc id to an in-memory SPIMI block.
+
+    Returns the number of (doc id, count) pairs added to the block.
+    """
+    for token_id in word_counts:
+        if token_id in block:
+            block[token_id].append(doc_id)
+            block[token_id].append(word_counts[token_id])
+        else:
+            block[token_id] = [doc_id, word_counts[token_id]]
+
+    return len(word_counts)
+
+def flush_block(block: dict[int, list[int]], blocks_path: str, block_paths: list[str]) -> None:
+    """
+    Writes a block to a new file in blocks_path sorted by term id and records its path.
+
+    Each record is a (term id, postings length) header followed by the postings.
+    """
+    os.makedirs(blocks_path, exist_ok=True)
+    block_path = os.path.join(blocks_path, f"block_{len(block_paths)}.bin")
+    block_paths.append(block_path)
+
+    with open(block_path, "wb") as blockbin:
+        for token_id in sorted(block):
+            write_record(blockbin, token_id, block[token_id])
+
+def write_record(blockbin, token_id: int, posting) -> None:
+    """
+    Writes one (term id, postings length) header and its postings to a block file.
+    """
+    array.array('I', [token_id, len(posting)]).tofile(blockbin)
+    array.array('I', posting).tofile(blockbin)
+
+def read_block(block_path: str):
+    """
+    Yields (term id, postings) records from a block written by flush_block.
+    """
+    header_size = array.array('I').itemsize * 2
+    with open(block_path, "rb") as blockbin:
+        while True:
+            header_bytes = blockbin.read(header_size)
+            if not header_bytes:
+                break
+            header = array.array('I')
+            header.frombytes(header_bytes)
+            posting = array.array('I')
+            posting.fromfile(blockbin, header[1])
+            yield header[0], posting
+
+def merge_records(block_paths: list[str]):
+    """
+    K-way merges sorted blocks into one (term id, postings) record per term id.
+
+    Blocks are flushed in doc id order and heapq.merge keeps equal term ids in block
+    order, so concatenating them gives the same postings as an in-memory build.
+    """
+    records = heapq.merge(*[read_block(block_path) for block_path in block_paths], key=lambda record: record[0])
+
+    current_id = None
+    current_posting = None
+    for token_id, posting in records:
+        if token_id == current_id:
+            current_posting.extend(posting)
+            continue
+        if current_posting is not None:
+            yield current_id, current_posting
+        current_id = token_id
+        current_posting = posting
+
+    if current_posting is not None:
+        yield current_id, current_posting
+
+def merge_blocks(block_paths: list[str], fan_in: int = MERGE_FAN_IN):
+    """
+    Merges sorted blocks into one postings list per term id.
+
+    At most fan_in blocks are open at once: while there are more, each run of fan_in
+    adjacent blocks is merged into an intermediate block, which replaces them. Runs keep
+    the blocks in doc id order, so the postings are the same as from a single merge.
+    Intermediate blocks are removed once the merge is exhausted or closed.
+    """
+    block_paths = list(block_paths)
+    merge_pass = 0
+    while len(block_paths) > fan_in:
+        merged_paths = []
+        for first in range(0, len(block_paths), fan_in):
+            run = block_paths[first:first + fan_in]
+            if len(run) == 1:
+                merged_paths.append(run[0])
+                continue
+            merged_path = os.path.join(os.path.dirname(run[0]), f"merge_{merge_pass}_{len(merged_paths)}.bin")
+            with open(merged_path, "wb") as blockbin:
+                for token_id, posting in merge_records(run):
+                    write_record(blockbin, token_id, posting)
+            for block_path in run:
+                os.remove(block_path)
+            merged_paths.append(merged_path)
+        block_paths = merged_paths
+        merge_pass += 1
+
+    try:
+        for _, posting in merge_records(block_paths):
+            yield posting.tolist()
+    finally:
+        # The blocks left are intermediate blocks, which the caller does not know to remove
+        if merge_pass:
+            for block_path in block_paths:
+                if os.path.exists(block_path):
+                    os.remove(block_path)
+
+def remove_blocks(blocks_path: str, block_paths: list[str]) -> None:
+    """
+    Removes the temporary block files and their directory once they have been merged.
+    """
+    for block_path in block_paths:
+        if os.path.exists(block_path):
+            os.remove(block_path)
+    if os.path.isdir(blocks_path) and not os.listdir(blocks_path):
+        os.rmdir(blocks_path)
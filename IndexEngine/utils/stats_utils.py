@@ -0,0 +1,31 @@
+import json
+
+# Collection statistics of an index, so the search engine never needs a pass over every
+# document to get them (see SearchEngine/SearchEngine.py)
+COLLECTION_STATS_FILE = "collection_stats.json"
+# Number of occurrences of each term in the collection, by term id. Document frequencies
+# are stored with each term in lexicon.bin.
+COLLECTION_FREQUENCIES_FILE = "collection_frequencies.bin"
+
+
+def write_collection_stats(stats_path: str, doc_lengths, document_frequencies) -> None:
+    """
+    Writes the number of documents, their total and average length and the number of
+    terms and postings of an index.
+
+    Args:
+        stats_path: The path of the collection_stats.json file to create.
+        doc_lengths: The length of each document, by doc id.
+        document_frequencies: The number of documents containing each term, by term id.
+    """
+    total_length = sum(doc_lengths)
+    stats = {
+        "documents": len(doc_lengths),
+        "total_length": total_length,
+        "average_doc_length": total_length / len(doc_lengths) if doc_lengths else 0,
+        "terms": len(document_frequencies),
+        "postings": sum(document_frequencies),
+    }
+
+    with open(stats_path, "w") as f:
+        json.dump(stats, f, indent=2)
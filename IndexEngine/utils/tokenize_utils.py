@@ -1,4 +1,7 @@
 import math
+import re
+import sys
+from functools import lru_cache
 
 def convert_tokens_to_ids(text: list[str], lexicon: dict[str, int], word_counts: dict[int, int]) -> None:
     """
@@ -22,6 +25,42 @@ def convert_tokens_to_ids(text: list[str], lexicon: dict[str, int], word_counts:
         else:
             word_counts[token_id] = 1
 
+def token_positions(text: list[str]) -> dict[str, list[int]]:
+    """
+    Gets the positions of each token in a list of tokens, keeping the order each token first appears in.
+    """
+    positions = {}
+    for position, token in enumerate(text):
+        if token in positions:
+            positions[token].append(position)
+        else:
+            positions[token] = [position]
+
+    return positions
+
+def count_tokens(text: list[str], term_counts: dict[str, int]) -> None:
+    """
+    Adds a list of tokens to the term counts, keeping the order each token first appears in.
+    """
+    for token in text:
+        if token in term_counts:
+            term_counts[token] += 1
+        else:
+            term_counts[token] = 1
+
+def convert_counts_to_ids(term_counts: dict[str, int], lexicon: dict[str, int], word_counts: dict[int, int]) -> None:
+    """
+    Converts the term counts of a document to word counts keyed by id and adds new terms to the lexicon.
+    Terms are visited in first-occurrence order, so ids match convert_tokens_to_ids.
+    """
+    for token in term_counts:
+        if token in lexicon:
+            token_id = lexicon[token]
+        else:
+            token_id = len(lexicon)
+            lexicon[token] = token_id
+        word_counts[token_id] = term_counts[token]
+
 def add_to_postings(word_counts: dict[int, int], doc_id: int, inverted_index: list[list[int]]) -> None:
     """
     Adds the word counts and doc id to the inverted index.
@@ -36,22 +75,62 @@ def add_to_postings(word_counts: dict[int, int], doc_id: int, inverted_index: li
         else:
             inverted_index.append([doc_id, count])
 
+# After lower(), ASCII text only has a-z and 0-9 as letters and digits, so every other
+# ASCII character is turned into a space and the text is split on whitespace
+ASCII_SEPARATORS = str.maketrans({chr(i): " " for i in range(128) if not chr(i).isalnum()})
+
+# Distinct surface forms whose stems are kept. A few hundred thousand forms cover
+# nearly every word in news text, so almost all stemmer calls become cache hits.
+STEM_CACHE_SIZE = 1 << 19
+
+
+@lru_cache(maxsize=None)
+def unicode_token_pattern() -> re.Pattern:
+    """
+    Builds the pattern for runs of letters and digits in any script.
+
+    A regex word character is any str.isalnum() character or an underscore, so the
+    underscore and the numeric characters that are neither letters nor digits (such as
+    "½" and roman numerals) are removed from it. Built on first use since it scans
+    every code point.
+    """
+    excluded = [c for c in map(chr, range(sys.maxunicode + 1)) if c.isalnum() and not (c.isalpha() or c.isdigit())]
+    return re.compile(f"[^\\W_{re.escape(''.join(excluded))}]+")
+
 def tokenize(text: str, tokens: list[str]) -> None:
-    text = text.lower() 
-
-    start = 0 
-    i = 0
-
-    for currChar in text:
-        if not currChar.isdigit() and not currChar.isalpha() :
-            if start != i :
-                token = text[start:i]
-                tokens.append( token )
-                
-            start = i + 1
-        i += 1
-    if start != i :
-        tokens.append(text[start:i])
+    """
+    Lowercases text and appends its tokens, the maximal runs of characters that are
+    letters (str.isalpha) or digits (str.isdigit), to the list of tokens.
+    """
+    text = text.lower()
+    if text.isascii():
+        tokens.extend(text.translate(ASCII_SEPARATORS).split())
+    else:
+        tokens.extend(unicode_token_pattern().findall(text))
+
+@lru_cache(maxsize=1)
+def porter_stemmer():
+    """
+    Gets the shared Porter stemmer, importing nltk on first use so unstemmed indexing
+    and search never pay for it.
+    """
+    from nltk.stem import PorterStemmer
+    return PorterStemmer()
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(token: str) -> str:
+    """
+    Gets the Porter stem of a token, memoised on its surface form.
+    """
+    return porter_stemmer().stem(token)
+
+def tokenize_and_stem(text: str, tokens: list[str]) -> None:
+    """
+    Tokenizes text like tokenize and appends the Porter stem of each token to the list of tokens.
+    """
+    words = []
+    tokenize(text, words)
+    tokens.extend(map(stem, words))
 
 def calculate_magnitude(word_counts: dict[int, int]) -> float:
     """
@@ -63,3 +142,8 @@ def calculate_magnitude(word_counts: dict[int, int]) -> float:
         magnitude += (1 + math.log(count))**2
 
     return math.sqrt(magnitude)
+
+# Names the tokenizer an index was built with, so queries are tokenized the same way
+TOKENIZER_FILE = "tokenizer.txt"
+# Tokenizers by name, as recorded in tokenizer.txt and the segments manifest
+TOKENIZERS = {"tokenize": tokenize, "tokenize_and_stem": tokenize_and_stem}
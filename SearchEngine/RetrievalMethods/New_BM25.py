@@ -1,115 +1,76 @@
 import os
 import sys
-import json
-import zlib
 import time
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from RetrievalMethods.utils.tokenize_utils import tokenize
-from RetrievalMethods.utils.score_utils import bm25_score
-from RetrievalMethods.utils.GetDoc import get_doc
-from RetrievalMethods.utils.new_query_utils import get_query_biased_summary
+from RetrievalMethods.utils.score_utils import rank_bm25
+from RetrievalMethods.utils.maxscore_utils import bm25_top_k
+from RetrievalMethods.utils.impact_utils import impact_top_k
+from RetrievalMethods.utils.summary_utils import SUMMARY_RESULTS, summarize_results
+from RetrievalMethods.utils.position_utils import parse_query
 
-def search(query: str, store_path: str, lexicon: dict, index_offsets, docnos: list, doc_lengths: list, offsets):
+def search(query: str, engine, k: int = 1000, pruning: bool = False, impacts: bool = False, impact_budget: int | None = None, summaries: int = SUMMARY_RESULTS):
     """
     Searches the store for the given query using the BM25 retrieval method.
     
     Args:
         query: The query to search for.
-        store_path: The path to the store directory.
-        lexicon: Pre-loaded lexicon dictionary.
-        index_offsets: Pre-loaded index offsets array.
-        docnos: Pre-loaded list of document numbers.
-        doc_lengths: Pre-loaded list of document lengths.
-        offsets: Pre-loaded document offsets array.
+        engine: The SearchEngine holding the loaded index and its segments.
+        k: The number of results to return.
+        pruning: Whether to score document-at-a-time with MaxScore, skipping documents that cannot make the top k.
+        impacts: Whether to rank score-at-a-time by the quantised impacts of an index built with --impacts.
+        impact_budget: The number of impact postings after which impact ranking stops early, or None to process them all.
+        summaries: The number of top results given a date, headline and query-biased summary, 0 for docnos and ranks only.
 
     Returns:
         A list of results.
     """
-    inverted_index_file = os.path.join(store_path, "inverted_index.bin")
+    docnos = engine.docnos
+    doc_lengths = engine.doc_lengths
 
-    # Tokenize query
+    # Tokenize query, without its phrase and proximity operators
     all_results = []
+    query_text, phrases = parse_query(query)
     tokens = []
-    tokenize(query, tokens)
+    engine.tokenize_function(query_text, tokens)
 
     query_postings = []
+    query_tokens = []
     
-    # Get postings for each token in the query
+    # Get postings (or impacts) for each token in the query
     for token in tokens:
-        token_id = None
-        if token in lexicon:
-            token_id = lexicon[token]
-        if token_id is not None:
-            with open(inverted_index_file, 'rb') as index_file:
-                index_file.seek(index_offsets[token_id])
-                data_size = index_offsets[token_id + 1] - index_offsets[token_id]
-                compressed_data = index_file.read(data_size)
-                postings = zlib.decompress(compressed_data).decode('utf-8')
-                postings = json.loads(postings)
-                query_postings.append(postings)
+        postings = engine.get_impacts(token) if impacts else engine.get_postings(token)
+        if postings is not None:
+            query_postings.append(postings)
+            query_tokens.append(token)
 
     if not query_postings:
         print(f"Warning: No results found for {query}")
         return []
 
-    result_set = {}
-
-    # Get BM25 Scores for each document
-    average_doc_length = sum(doc_lengths) / len(doc_lengths)
-    for i, query_posting in enumerate(query_postings):
+    # Operators restrict the ranking to their matching documents, scored as usual
+    matches = engine.match_phrases(phrases)
+    if matches is not None and not matches:
+        print(f"Warning: No results found for {query}")
+        return []
 
-        for j in range(0, len(query_posting), 2):
-            doc_id = query_posting[j]
-            term_frequency = query_posting[j+1]
-            doc_length = doc_lengths[doc_id]
-            score = bm25_score(term_frequency, doc_length, average_doc_length, len(doc_lengths), len(query_posting)/2)
-            if doc_id not in result_set:
-                result_set[doc_id] = score
-            else:
-                result_set[doc_id] += score
+    if impacts:
+        sorted_result_set = impact_top_k(query_postings, k, impact_budget, matches)
+    elif pruning:
+        term_bounds = [engine.get_term_bound(token) for token in query_tokens]
+        sorted_result_set = bm25_top_k(query_postings, term_bounds, doc_lengths, engine.average_doc_length, k, matches)
+    elif engine.scorer is not None:
+        sorted_result_set = engine.scorer.bm25_top_k(query_postings, k, matches)
+    else:
+        sorted_result_set = rank_bm25(query_postings, doc_lengths, engine.average_doc_length, k, matches)
 
-    sorted_result_set = sorted(result_set.items(), key=lambda x: x[1], reverse=True)[:1000]
+    # Summarise the top results, later results are summarised on demand with engine.summarize
+    page_summaries = summarize_results(engine, [doc_id for doc_id, _ in sorted_result_set[:summaries]], tokens, "New_BM25")
 
-    # Get biased query for each document
     for i, (doc_id, score) in enumerate(sorted_result_set):
-        if i < 10:
-            docno = docnos[doc_id]
-
-            # Get document content to extract headline, date, and biased query
-            doc_content = get_doc(store_path, docno, docnos, offsets)
-            lines = doc_content.split("\n")
-            date = ""
-            headline = ""
-            raw_document = ""
-
-            for line in lines:
-                if "date:" in line:
-                    date = line.split("date:")[1].strip()
-                elif "headline:" in line:
-                    headline = line.split("headline:")[1].strip()
-                    
-            raw_document = doc_content.split("raw document:")[1].strip()
-
-            # Get biased query from document content and query tokens
-
-            
-            biased_query = get_query_biased_summary(tokens, raw_document)
-
-            if not headline:
-                headline = biased_query[:50].strip() + "..."
-
-            all_results.append({
-                "docno": docno,
-                "date": date,
-                "headline": headline,
-                "biased_query": biased_query,
-                "rank": i + 1
-            })
+        docno = docnos[doc_id]
+        if i < summaries:
+            all_results.append({"docno": docno, **page_summaries[i], "rank": i + 1})
         else:
-            docno = docnos[doc_id]
-            all_results.append({
-                "docno": docno,
-                "rank": i + 1
-            })
+            all_results.append({"docno": docno, "rank": i + 1})
     return all_results
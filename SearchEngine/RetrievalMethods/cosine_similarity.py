@@ -1,12 +1,52 @@
 import os
 import sys
-import json
-import array
-import zlib
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from utils.tokenize_utils import tokenize
-from utils.score_utils import cosine_similarity_score
+from RetrievalMethods.utils.score_utils import rank_cosine
+from RetrievalMethods.utils.position_utils import parse_query
+
+def search(query: str, engine, k: int = 1000):
+    """
+    Searches the store for the given query using cosine similarity.
+
+    Args:
+        query: The query to search for.
+        engine: The SearchEngine holding the loaded index, its segments and doc magnitudes.
+        k: The number of results to return.
+
+    Returns:
+        A list of the top k results with their docno, rank and score.
+    """
+    doc_magnitudes = engine.doc_magnitudes
+    query_text, phrases = parse_query(query)
+    tokens = []
+    engine.tokenize_function(query_text, tokens)
+
+    query_postings = []
+    
+    # Get postings for each token in the query
+    for token in tokens:
+        postings = engine.get_postings(token)
+        if postings is not None:
+            query_postings.append(postings)
+
+    if not query_postings:
+        return []
+
+    # Operators restrict the ranking to their matching documents, scored as usual
+    matches = engine.match_phrases(phrases)
+    if matches is not None and not matches:
+        return []
+
+    if engine.scorer is not None:
+        sorted_result_set = engine.scorer.cosine_top_k(query_postings, k, matches)
+    else:
+        sorted_result_set = rank_cosine(query_postings, doc_magnitudes, k, matches)
+
+    return [
+        {"docno": engine.docnos[doc_id], "rank": i + 1, "score": score}
+        for i, (doc_id, score) in enumerate(sorted_result_set)
+    ]
 
 def main():
     if len(sys.argv) != 4:
@@ -74,145 +114,18 @@ def main():
         ''')
         sys.exit(1)
 
-    docs_file = os.path.join(store_path, "docs.bin")
-    offsets_file = os.path.join(store_path, "offsets.bin")
-    docnos_text = os.path.join(store_path, "docnos.txt")
-    inverted_index_file = os.path.join(store_path, "inverted_index.bin")
-    index_offsets_file = os.path.join(store_path, "index_offsets.bin")
-    lexicon_file = os.path.join(store_path, "lexicon.json")
-    doc_magnitudes_file = os.path.join(store_path, "doc_magnitudes.txt")
-
-    missing_files = []
-    for file_path, file_name in [(docs_file, "docs.bin"), (offsets_file, "offsets.bin"), (docnos_text, "docnos.txt"), (inverted_index_file, "inverted_index.bin"), (index_offsets_file, "index_offsets.bin"), (lexicon_file, "lexicon.json"), (doc_magnitudes_file, "doc_magnitudes.txt")]:
-        if not os.path.exists(file_path):
-            missing_files.append(file_name)
-    
-    if missing_files:
-        print(f"Error: The following files are missing: {', '.join(missing_files)}")
-        sys.exit(1)
-
-    try:
-        with open(lexicon_file, "r") as f:
-            lexicon = json.load(f)
-    except Exception as e:
-        print(f"Error: {e}\nTry Re-creating the store directory or check the lexicon file.")
-        sys.exit(1)
-
-    try:
-        with open(index_offsets_file, 'rb') as f:
-                index_offsets = array.array('I')
-                index_offsets.frombytes(f.read())
-    except Exception as e:
-        print(f"Error: {e}\nTry Re-creating the store directory or check the index offsets file.")
-        sys.exit(1)
-
-    try:
-        with open(docnos_text, "r") as f:
-            docnos_content = f.read()
-            docnos = docnos_content.strip().split('\n')
-    except Exception as e:
-        print(f"Error: {e}\nTry Re-creating the store directory or check the docnos file.")
-        sys.exit(1)
-
-    try:
-        with open(doc_magnitudes_file, "r") as f:
-            doc_magnitudes_content = f.read()
-            doc_magnitudes = [float(magnitude) for magnitude in doc_magnitudes_content.strip().split('\n')]
-    except Exception as e:
-        print(f"Error: {e}\nTry Re-creating the store directory or check the doc magnitudes file.")
-        sys.exit(1)
-
-    if not doc_magnitudes:
-        print(f'''
-        Error: No doc magnitudes found in {doc_magnitudes_file}.
-        
-        Try Re-creating the store directory.
-        ''')
-        sys.exit(1)
-
-    if not index_offsets:
-        print(f'''
-        Error: No index offsets found in {index_offsets_file}.
-        
-        Try Re-creating the store directory.
-        ''')
-        sys.exit(1)
+    # Imported here because SearchEngine imports this module's search function
+    from SearchEngine import SearchEngine
+    engine = SearchEngine(store_path)
 
-    if not docnos:
-        print(f'''
-        Error: No docnos found in {docnos_text}.
-        
-        Try Re-creating the store directory.
-        ''')
-        sys.exit(1)
-
-    if not lexicon:
-        print(f'''
-        Error: Empty lexicon found in {lexicon_file}.
-        
-        Try Re-creating the store directory.
-        ''')
+    if engine.doc_magnitudes is None:
+        print(f"Error: The following files are missing: doc_magnitudes.bin")
         sys.exit(1)
 
     try:
 
-        # Search each topic
-        all_results = []
-        for topic in topics:
-            topic_results = []
-            topic_id = topic[0]
-            tokens = []
-            tokenize(topic[1], tokens)
-
-            query_postings = []
-            
-            # Get postings for each token in the topic
-            for token in tokens:
-                token_id = None
-                if token in lexicon:
-                    token_id = lexicon[token]
-                if token_id is not None:
-                    with open(inverted_index_file, 'rb') as index_file:
-                        index_file.seek(index_offsets[token_id])
-                        data_size = index_offsets[token_id + 1] - index_offsets[token_id]
-                        compressed_data = index_file.read(data_size)
-                        postings = zlib.decompress(compressed_data).decode('utf-8')
-                        postings = json.loads(postings)
-                        query_postings.append(postings)
-
-            if not query_postings:
-                print(f"Warning: No postings found for topic {topic_id}")
-                continue
-
-            result_set = {}
-
-            # Get BM25 Scores for each document
-            for i, query_posting in enumerate(query_postings):
-
-                for j in range(0, len(query_posting), 2):
-                    doc_id = query_posting[j]
-                    term_frequency = query_posting[j+1]
-                    score = cosine_similarity_score(term_frequency, len(doc_magnitudes), len(query_posting)/2)
-                    if doc_id not in result_set:
-                        result_set[doc_id] = score
-                    else:
-                        result_set[doc_id] += score
-
-            for doc_id in result_set:
-                result_set[doc_id] /= doc_magnitudes[doc_id]
-
-            sorted_result_set = sorted(result_set.items(), key=lambda x: x[1], reverse=True)[:1000]
-            for i, (doc_id, score) in enumerate(sorted_result_set):
-                docno = docnos[doc_id]
-                topic_results.append({
-                    "topicID": topic_id,
-                    "Q0": "Q0",
-                    "docno": docno,
-                    "rank": i+1,
-                    "score": score,
-                    "runTag": "cadumansCosineSimilarity"
-                })
-            all_results.extend(topic_results)
+        # Search every topic as one batch, reading each term's postings once
+        topic_results = engine.search_batch(topics, "cosine", run_file=results_path)
     
     except IndexError as e:
         print(f"Error: {e}\nTry Re-creating the store directory or check the topic file.")
@@ -221,16 +134,9 @@ def main():
         print(f"Error: {e}\nTry Re-creating the store directory or check the topic file.")
         sys.exit(1)
 
-    try:
-        with open(results_path, "w") as f:
-            for result in all_results:
-                    f.write(f"{result['topicID']} {result['Q0']} {result['docno']} {result['rank']} {result['score']} {result['runTag']}\n")
-    except Exception as e:
-        print(f"Error: {e}\nresults path is invalid.")
-        sys.exit(1)
-        
-
-       
+    for (topic_id, _), results in zip(topics, topic_results):
+        if not results:
+            print(f"Warning: No postings found for topic {topic_id}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,5 +1,10 @@
 import os
-import zlib
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from RetrievalMethods.utils.docstore_utils import DocStore
+
+# Doc stores opened by get_doc, by store path, so each docs.bin is mapped and its docnos hashed once
+doc_stores = {}
 
 
 def get_doc(store_path: str, docno: str, docnos: list, offsets):
@@ -15,20 +20,14 @@ def get_doc(store_path: str, docno: str, docnos: list, offsets):
     Returns:
         The document content.
     """
-    
-    docs_file = os.path.join(store_path, "docs.bin")
-    
-    try:
-        doc_index = docnos.index(docno)
-    except ValueError:
+    doc_store = doc_stores.get(store_path)
+    if doc_store is None:
+        doc_store = DocStore([os.path.join(store_path, "docs.bin")], [offsets], docnos)
+        doc_stores[store_path] = doc_store
+
+    document_content = doc_store.get_by_docno(docno)
+    if document_content is None:
         print(f"Error: DOCNO '{docno}' does not exist.")
         return ""
-    
-    # Read only needed document
-    with open(docs_file, 'rb') as f:
-        f.seek(offsets[doc_index])
-        data_size = offsets[doc_index + 1] - offsets[doc_index]
-        compressed_data = f.read(data_size)
-        document_content = zlib.decompress(compressed_data).decode('utf-8')
-        
-        return document_content
+
+    return document_content
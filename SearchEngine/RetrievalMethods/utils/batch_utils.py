@@ -0,0 +1,76 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from RetrievalMethods.utils.score_utils import rank_bm25, rank_cosine
+
+# Retrieval methods a batch can rank with, and the run tag written for each. Both BM25
+# methods only differ in their summaries, which batches do not build.
+RUN_TAGS = {
+    "BM25": "cadumansBM25",
+    "New_BM25": "cadumansNewBM25",
+    "cosine": "cadumansCosineSimilarity",
+}
+
+# The batch a worker process ranks queries of, set once when the worker starts
+worker_batch = None
+
+
+def rank_batch_query(query_tokens: list[str], batch: dict, matches: set[int] | None = None) -> list[tuple[int, float]]:
+    """
+    Ranks one query of a batch from the postings fetched for the whole batch.
+
+    Args:
+        query_tokens: The query's tokens.
+        batch: The batch's method, k, postings by token, document columns, average document length and vectorised scorer.
+        matches: The documents matching the query's phrase and proximity operators, or None if any document can match.
+
+    Returns:
+        The (doc id, score) pairs of the top k documents, best first.
+    """
+    query_postings = [batch["postings"][token] for token in query_tokens if token in batch["postings"]]
+    if not query_postings or (matches is not None and not matches):
+        return []
+
+    scorer = batch["scorer"]
+    if batch["method"] == "cosine":
+        if scorer is not None:
+            return scorer.cosine_top_k(query_postings, batch["k"], matches)
+        return rank_cosine(query_postings, batch["doc_magnitudes"], batch["k"], matches)
+
+    if scorer is not None:
+        return scorer.bm25_top_k(query_postings, batch["k"], matches)
+    return rank_bm25(query_postings, batch["doc_lengths"], batch["average_doc_length"], batch["k"], matches)
+
+def init_batch_worker(batch: dict) -> None:
+    """
+    Keeps the batch in a worker process, so its postings are sent to each worker once
+    rather than with every query.
+    """
+    global worker_batch
+    worker_batch = batch
+
+def rank_in_worker(query_tokens: list[str], matches: set[int] | None = None) -> list[tuple[int, float]]:
+    """
+    Ranks one query of the batch held by this worker process.
+    """
+    return rank_batch_query(query_tokens, worker_batch, matches)
+
+def write_run(run_file: str, topic_ids: list[str], topic_results: list[list[dict]], run_tag: str) -> None:
+    """
+    Writes ranked results as a TREC run file, one "topic Q0 docno rank score tag" line per result.
+
+    Args:
+        run_file: The path of the run file.
+        topic_ids: The topic id of each query.
+        topic_results: The results of each query, with their docno, rank and score.
+        run_tag: The name of the run.
+    """
+    try:
+        with open(run_file, "w") as f:
+            for topic_id, results in zip(topic_ids, topic_results):
+                for result in results:
+                    f.write(f"{topic_id} Q0 {result['docno']} {result['rank']} {result['score']} {run_tag}\n")
+    except (OSError, IOError) as e:
+        print(f"Error writing to {run_file}: {e}")
+        sys.exit(1)
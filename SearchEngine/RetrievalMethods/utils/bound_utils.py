@@ -0,0 +1,21 @@
+import array
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from RetrievalMethods.utils.column_utils import read_array
+
+# Per-term BM25 upper bounds written by the IndexEngine (see IndexEngine/utils/bound_utils.py)
+TERM_BOUNDS_FILE = "term_bounds.bin"
+
+
+def read_term_bounds(store_path: str) -> array.array | None:
+    """
+    Reads the bound on the BM25 tf / (k + tf) component of each term, by term id, or None
+    for indexes from before the term bounds.
+    """
+    term_bounds_file = os.path.join(store_path, TERM_BOUNDS_FILE)
+    if not os.path.exists(term_bounds_file):
+        return None
+
+    return read_array(term_bounds_file, 'd')
@@ -0,0 +1,174 @@
+import os
+import sys
+from collections import OrderedDict
+
+# Default byte budget of the decoded postings cache
+POSTINGS_CACHE_BYTES = 64 * 1024 * 1024
+# Default entry and byte bounds of the query result cache
+RESULT_CACHE_ENTRIES = 1024
+RESULT_CACHE_BYTES = 16 * 1024 * 1024
+# Default entry and byte bounds of the decompressed document cache
+DOC_CACHE_ENTRIES = 64
+DOC_CACHE_BYTES = 8 * 1024 * 1024
+
+
+def postings_size(postings: tuple) -> int:
+    """
+    Gets the memory held by a decoded (doc ids, term frequencies) tuple of arrays.
+    """
+    return sys.getsizeof(postings[0]) + sys.getsizeof(postings[1])
+
+def results_size(results: list[dict]) -> int:
+    """
+    Gets the memory held by a list of search results and their values.
+    """
+    size = sys.getsizeof(results)
+    for result in results:
+        size += sys.getsizeof(result) + sum(sys.getsizeof(value) for value in result.values())
+
+    return size
+
+def index_fingerprint(path: str, file_names: list[str]) -> tuple:
+    """
+    Gets the size and modification time of a few files of an index directory, None for
+    a missing file. The segments manifest is rewritten by every append and merge and the
+    base files by every rebuild, so a handful of stats per query notice any change
+    without listing the directory.
+    """
+    fingerprint = []
+    for file_name in file_names:
+        try:
+            stat = os.stat(os.path.join(path, file_name))
+            fingerprint.append((stat.st_size, stat.st_mtime_ns))
+        except FileNotFoundError:
+            fingerprint.append(None)
+
+    return tuple(fingerprint)
+
+class LRUCache:
+    """
+    Least recently used cache bounded by the size of its values in bytes and optionally
+    by its number of entries, counting hits, misses and evictions.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int | None = None):
+        """
+        Args:
+            max_bytes: The most bytes of values to keep.
+            max_entries: The most entries to keep, or None for no limit.
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def size(self, value) -> int:
+        """
+        Gets the memory held by a value.
+        """
+        return sys.getsizeof(value)
+
+    def get(self, key):
+        """
+        Gets a cached value and marks it as recently used.
+
+        Returns:
+            The value, or None if the key is not cached.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value) -> None:
+        """
+        Caches a value, evicting the least recently used values over the bounds.
+        Values larger than the whole byte budget are not cached.
+        """
+        size = self.size(value)
+        if size > self.max_bytes:
+            return
+
+        if key in self.entries:
+            self.current_bytes -= self.entries.pop(key)[1]
+        self.entries[key] = (value, size)
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes or (self.max_entries is not None and len(self.entries) > self.max_entries):
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Empties the cache, keeping its counters.
+        """
+        self.entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Gets the size and hit, miss and eviction counts of the cache.
+        """
+        return {
+            "entries": len(self.entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+class PostingsCache(LRUCache):
+    """
+    Cache of decoded postings lists by token, bounded by their size in bytes.
+
+    Popular terms are decoded once and shared by every query containing them until
+    rarely used terms push them out. Cached arrays are shared, so they must not be modified.
+    """
+
+    def __init__(self, max_bytes: int = POSTINGS_CACHE_BYTES):
+        super().__init__(max_bytes)
+
+    def size(self, value: tuple) -> int:
+        return postings_size(value)
+
+class ResultCache(LRUCache):
+    """
+    Cache of ranked search results, keyed by retrieval method, sorted query tokens and
+    number of results, so repeated queries skip scoring and snippet generation.
+
+    Entries are only valid for the index contents they were computed from, so the cache
+    empties itself when the fingerprint of the index changes.
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_ENTRIES, max_bytes: int = RESULT_CACHE_BYTES):
+        super().__init__(max_bytes, max_entries)
+        self.fingerprint = None
+        self.invalidations = 0
+
+    def size(self, value: list[dict]) -> int:
+        return results_size(value)
+
+    def validate(self, fingerprint: tuple) -> None:
+        """
+        Empties the cache if the index changed since the last query.
+        """
+        if fingerprint != self.fingerprint:
+            if self.entries:
+                self.invalidations += 1
+            self.clear()
+            self.fingerprint = fingerprint
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats["max_entries"] = self.max_entries
+        stats["invalidations"] = self.invalidations
+        return stats
@@ -0,0 +1,150 @@
+import array
+import os
+from bisect import bisect_left
+
+# Per-document columns written by the IndexEngine (see IndexEngine/utils/column_utils.py)
+DOCNOS_FILE = "docnos.bin"
+DOCNO_OFFSETS_FILE = "docno_offsets.bin"
+DOC_LENGTHS_FILE = "doc_lengths.bin"
+DOC_MAGNITUDES_FILE = "doc_magnitudes.bin"
+DATES_FILE = "dates.bin"
+HEADLINES_FILE = "headlines.bin"
+HEADLINE_OFFSETS_FILE = "headline_offsets.bin"
+
+
+class StringColumn:
+    """
+    A column of strings, such as the docnos or the headlines of an index, kept as one
+    UTF-8 blob and the offset of each string in it.
+
+    A string is only decoded when it is looked up, so loading the column creates no
+    Python object per document. Supports the list operations used on docnos.
+    """
+
+    def __init__(self, blob: bytes, offsets: array.array):
+        """
+        Args:
+            blob: The concatenated UTF-8 strings.
+            offsets: The offset of each string in the blob, followed by the end offset.
+        """
+        self.blob = blob
+        self.offsets = offsets
+
+    def __getitem__(self, doc_id: int) -> str:
+        if doc_id < 0:
+            doc_id += len(self)
+        if not 0 <= doc_id < len(self):
+            raise IndexError("column index out of range")
+        return self.blob[self.offsets[doc_id]:self.offsets[doc_id + 1]].decode('utf-8')
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        for doc_id in range(len(self)):
+            yield self[doc_id]
+
+    def index(self, value: str) -> int:
+        """
+        Gets the doc id of a string, such as a docno, by scanning the blob.
+
+        Raises:
+            ValueError: If the string is not in the column.
+        """
+        key = value.encode('utf-8')
+        position = self.blob.find(key)
+        while position != -1:
+            doc_id = bisect_left(self.offsets, position)
+            if doc_id < len(self) and self.offsets[doc_id] == position and self.offsets[doc_id + 1] == position + len(key):
+                return doc_id
+            position = self.blob.find(key, position + 1)
+
+        raise ValueError(f"'{value}' is not in the column")
+
+    @classmethod
+    def concatenate(cls, columns: list["StringColumn"]) -> "StringColumn":
+        """
+        Joins the columns of several segments, in doc id order.
+        """
+        if len(columns) == 1:
+            return columns[0]
+
+        offsets = array.array('I', [0])
+        for column in columns:
+            base = offsets[-1] - column.offsets[0]
+            offsets.extend(array.array('I', [offset + base for offset in column.offsets[1:]]))
+
+        return cls(b"".join(column.blob for column in columns), offsets)
+
+def read_array(column_path: str, typecode: str) -> array.array:
+    """
+    Reads a binary column of fixed width values.
+    """
+    column = array.array(typecode)
+    with open(column_path, "rb") as f:
+        column.frombytes(f.read())
+
+    return column
+
+def read_text_lines(text_path: str) -> list[str]:
+    """
+    Reads the lines of a text column written by indexes from before the binary columns.
+    """
+    with open(text_path, "r") as f:
+        return f.read().strip().split('\n')
+
+def read_docnos(store_path: str) -> StringColumn:
+    """
+    Reads the docnos of an index from docnos.bin, or from docnos.txt for older indexes.
+    """
+    docnos_file = os.path.join(store_path, DOCNOS_FILE)
+    if not os.path.exists(docnos_file):
+        docnos = [docno.encode('utf-8') for docno in read_text_lines(os.path.join(store_path, "docnos.txt"))]
+        docno_offsets = array.array('I', [0])
+        for docno in docnos:
+            docno_offsets.append(docno_offsets[-1] + len(docno))
+        return StringColumn(b"".join(docnos), docno_offsets)
+
+    with open(docnos_file, "rb") as f:
+        blob = f.read()
+
+    return StringColumn(blob, read_array(os.path.join(store_path, DOCNO_OFFSETS_FILE), 'I'))
+
+def read_metadata(store_path: str) -> tuple[array.array, StringColumn] | None:
+    """
+    Reads the date numbers and headlines of an index, or None for indexes from before the
+    metadata columns. Headlines are a string column laid out like the docnos.
+    """
+    dates_file = os.path.join(store_path, DATES_FILE)
+    if not os.path.exists(dates_file):
+        return None
+
+    with open(os.path.join(store_path, HEADLINES_FILE), "rb") as f:
+        blob = f.read()
+
+    return read_array(dates_file, 'I'), StringColumn(blob, read_array(os.path.join(store_path, HEADLINE_OFFSETS_FILE), 'I'))
+
+def read_doc_lengths(store_path: str) -> array.array:
+    """
+    Reads the document lengths of an index from doc_lengths.bin, or from doc_lengths.txt for older indexes.
+    """
+    doc_lengths_file = os.path.join(store_path, DOC_LENGTHS_FILE)
+    if not os.path.exists(doc_lengths_file):
+        return array.array('I', [int(length) for length in read_text_lines(os.path.join(store_path, "doc_lengths.txt"))])
+
+    return read_array(doc_lengths_file, 'I')
+
+def read_doc_magnitudes(store_path: str) -> array.array | None:
+    """
+    Reads the document magnitudes of an index from doc_magnitudes.bin, or from
+    doc_magnitudes.txt for older indexes, or None if the index has neither.
+    """
+    doc_magnitudes_file = os.path.join(store_path, DOC_MAGNITUDES_FILE)
+    if os.path.exists(doc_magnitudes_file):
+        return read_array(doc_magnitudes_file, 'd')
+
+    doc_magnitudes_text = os.path.join(store_path, "doc_magnitudes.txt")
+    if os.path.exists(doc_magnitudes_text):
+        return array.array('d', [float(magnitude) for magnitude in read_text_lines(doc_magnitudes_text)])
+
+    return None
@@ -24,4 +24,13 @@ def convert_month_to_letter(month: str) -> str:
     elif month == "12":
         return "December"
     else:
-        return month
\ No newline at end of file
+        return month
+
+def format_date_number(date_number: int) -> str:
+    """
+    Gets the display date of a document from its YYYYMMDD date number, as the IndexEngine
+    formats it from the DOCNO.
+    """
+    year, month_day = divmod(date_number, 10000)
+    month, day = divmod(month_day, 100)
+    return f"{convert_month_to_letter(f'{month:02d}')} {day:02d}, {year:04d}"
@@ -0,0 +1,181 @@
+import array
+import mmap
+import os
+import sys
+import zlib
+from bisect import bisect_right
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from RetrievalMethods.utils.cache_utils import DOC_CACHE_ENTRIES, DOC_CACHE_BYTES, LRUCache
+from RetrievalMethods.utils.column_utils import StringColumn, read_docnos
+from RetrievalMethods.utils.segment_utils import read_segment_paths
+
+# Preset dictionary of a docs.bin v2 (see IndexEngine/utils/docs_utils.py)
+DOCS_DICTIONARY_FILE = "docs_dictionary.bin"
+
+
+def decompress_document(data, dictionary: bytes | None = None) -> str:
+    """
+    Decompresses a single document read from docs.bin, with the preset dictionary of a docs.bin v2.
+    """
+    if dictionary is None:
+        return zlib.decompress(data).decode('utf-8')
+
+    return zlib.decompressobj(zdict=dictionary).decompress(data).decode('utf-8')
+
+def read_dictionary(store_path: str) -> bytes | None:
+    """
+    Reads the preset dictionary of a store's docs.bin, or None for docs.bin v1.
+    """
+    dictionary_path = os.path.join(store_path, DOCS_DICTIONARY_FILE)
+    if not os.path.exists(dictionary_path):
+        return None
+
+    with open(dictionary_path, "rb") as f:
+        return f.read()
+
+
+class DocStore:
+    """
+    The documents of an index, from the docs.bin of the base index and of each segment.
+
+    Each docs.bin is memory-mapped once and documents are decompressed straight from the
+    mapping, with the preset dictionary next to it for docs.bin v2, so reading a document
+    needs no file handle or seek. Docnos are resolved with
+    a hash built on the first docno lookup, and recently read documents are kept in a
+    small least recently used cache, so the results a user opens after a search are not
+    decompressed again.
+    """
+
+    def __init__(self, docs_paths: list[str], offsets: list[array.array], docnos, cache_entries: int = DOC_CACHE_ENTRIES, cache_bytes: int = DOC_CACHE_BYTES):
+        """
+        Args:
+            docs_paths: The docs.bin of the base index and of each segment, in doc id order.
+            offsets: The document offsets in each docs.bin, followed by the end offset.
+            docnos: The docno of each document, by global doc id.
+            cache_entries: The most decompressed documents kept, 0 to disable the cache.
+            cache_bytes: The byte budget for decompressed documents kept.
+        """
+        self.maps = []
+        self.dictionaries = []
+        for docs_path in docs_paths:
+            with open(docs_path, "rb") as f:
+                self.maps.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            self.dictionaries.append(read_dictionary(os.path.dirname(docs_path)))
+        self.offsets = offsets
+        self.doc_bases = [0]
+        for segment_offsets in offsets[:-1]:
+            self.doc_bases.append(self.doc_bases[-1] + len(segment_offsets) - 1)
+        self.docnos = docnos
+        self.num_docs = len(docnos)
+        self.doc_ids = None
+        self.cache = LRUCache(cache_bytes, cache_entries) if cache_entries > 0 else None
+
+    @classmethod
+    def open(cls, store_path: str, cache_entries: int = DOC_CACHE_ENTRIES) -> "DocStore":
+        """
+        Opens the doc store of an index directory and of every segment listed in its
+        manifest, with the same global doc ids as the SearchEngine.
+        """
+        segment_paths = read_segment_paths(store_path)
+        offsets = []
+        for segment_path in segment_paths:
+            segment_offsets = array.array('I')
+            with open(os.path.join(segment_path, "offsets.bin"), "rb") as f:
+                segment_offsets.frombytes(f.read())
+            offsets.append(segment_offsets)
+        docnos = StringColumn.concatenate([read_docnos(segment_path) for segment_path in segment_paths])
+
+        return cls([os.path.join(segment_path, "docs.bin") for segment_path in segment_paths], offsets, docnos, cache_entries)
+
+    def __len__(self) -> int:
+        return self.num_docs
+
+    def doc_id(self, docno: str) -> int | None:
+        """
+        Gets the doc id of a docno, or None if no document has it.
+        """
+        if self.doc_ids is None:
+            self.doc_ids = {}
+            for doc_id, existing_docno in enumerate(self.docnos):
+                self.doc_ids.setdefault(existing_docno, doc_id)
+
+        return self.doc_ids.get(docno)
+
+    def get(self, doc_id: int) -> str:
+        """
+        Gets the document with a doc id.
+
+        Raises:
+            IndexError: If no document has the doc id.
+        """
+        # A single document skips the batching of get_many, which costs as much as a cache hit saves
+        if not 0 <= doc_id < self.num_docs:
+            raise IndexError(f"doc id {doc_id} out of range")
+        if self.cache is None:
+            return self._read(doc_id)
+
+        document = self.cache.get(doc_id)
+        if document is None:
+            document = self._read(doc_id)
+            self.cache.put(doc_id, document)
+        return document
+
+    def get_by_docno(self, docno: str) -> str | None:
+        """
+        Gets the document with a docno, or None if no document has it.
+        """
+        doc_id = self.doc_id(docno)
+        return self.get(doc_id) if doc_id is not None else None
+
+    def get_many(self, doc_ids: list[int]) -> list[str]:
+        """
+        Gets several documents at once, such as the top results of a search.
+
+        Documents that are not cached are decompressed in doc id order, so each mapping is
+        read front to back.
+
+        Args:
+            doc_ids: The doc ids of the documents.
+
+        Returns:
+            The documents, in the order of doc_ids.
+
+        Raises:
+            IndexError: If no document has one of the doc ids.
+        """
+        documents = {}
+        for doc_id in doc_ids:
+            if not 0 <= doc_id < self.num_docs:
+                raise IndexError(f"doc id {doc_id} out of range")
+            if self.cache is not None and doc_id not in documents:
+                document = self.cache.get(doc_id)
+                if document is not None:
+                    documents[doc_id] = document
+
+        for doc_id in sorted(set(doc_ids) - documents.keys()):
+            document = self._read(doc_id)
+            documents[doc_id] = document
+            if self.cache is not None:
+                self.cache.put(doc_id, document)
+
+        return [documents[doc_id] for doc_id in doc_ids]
+
+    def _read(self, doc_id: int) -> str:
+        """
+        Decompresses a document from the mapping of the docs.bin holding it.
+        """
+        segment = bisect_right(self.doc_bases, doc_id) - 1
+        local_id = doc_id - self.doc_bases[segment]
+        offsets = self.offsets[segment]
+        return decompress_document(self.maps[segment][offsets[local_id]:offsets[local_id + 1]], self.dictionaries[segment])
+
+    def close(self) -> None:
+        """
+        Unmaps every docs.bin and empties the cache.
+        """
+        for docs_map in self.maps:
+            docs_map.close()
+        self.maps = []
+        if self.cache is not None:
+            self.cache.clear()
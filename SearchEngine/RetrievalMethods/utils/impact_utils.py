@@ -0,0 +1,74 @@
+import array
+import heapq
+import zlib
+from collections import defaultdict
+from itertools import accumulate
+from operator import itemgetter
+
+# Impact-ordered postings (see IndexEngine/utils/impact_utils.py)
+IMPACTS_FILE = "impacts.bin"
+IMPACT_OFFSETS_FILE = "impact_offsets.bin"
+# Impacts are BM25 contributions times this scale, rounded
+IMPACT_SCALE = 255 / 16.0
+
+
+def decode_impacts(data) -> list[tuple[int, array.array]]:
+    """
+    Decodes an impact list read from impacts.bin.
+
+    Args:
+        data: The bytes (or memoryview) of one impact list.
+
+    Returns:
+        A list of (impact, doc ids) groups, from the largest impact down. The impacts of
+        terms with a negative idf are negative.
+    """
+    gaps = array.array(chr(data[1]))
+    sign = -1 if data[2] else 1
+    packed = zlib.decompress(data[3:])
+    group_count = array.array('I', packed[:4])[0]
+    impacts = packed[4:4 + group_count]
+    counts = array.array('I')
+    counts.frombytes(packed[4 + group_count:4 + 5 * group_count])
+    gaps.frombytes(packed[4 + 5 * group_count:])
+
+    groups = []
+    position = 0
+    for impact, count in zip(impacts, counts):
+        groups.append((sign * impact, array.array('I', accumulate(gaps[position:position + count]))))
+        position += count
+
+    return groups
+
+def impact_top_k(query_impacts: list[list[tuple[int, array.array]]], k: int, postings_budget: int | None = None, matches: set[int] | None = None) -> list[tuple[int, float]]:
+    """
+    Gets the top k documents by quantised BM25 impacts, scoring at a time.
+
+    The impact groups of every query term are processed from the highest impact down, so
+    the documents most likely to rank are scored first and scoring can stop early. Negative
+    impacts, of terms in over half of the documents, only lower scores, so they are applied
+    last, from the largest down. A document's score is the sum of its integer impacts.
+
+    Args:
+        query_impacts: The (impact, doc ids) groups of each query term.
+        k: The number of documents to return.
+        postings_budget: Stop after the group that reaches this many postings, or None to process every group.
+        matches: The only doc ids that may be ranked, or None to rank every document. Postings of other documents still count toward the budget.
+
+    Returns:
+        The (doc id, approximate BM25 score) pairs of the top k documents, best first.
+    """
+    groups = sorted((group for term_impacts in query_impacts for group in term_impacts), key=lambda group: (group[0] < 0, -abs(group[0])))
+
+    accumulators = defaultdict(int)
+    processed = 0
+    for impact, doc_ids in groups:
+        if postings_budget is not None and processed >= postings_budget:
+            break
+        processed += len(doc_ids)
+        if matches is not None:
+            doc_ids = [doc_id for doc_id in doc_ids if doc_id in matches]
+        for doc_id in doc_ids:
+            accumulators[doc_id] += impact
+
+    return [(doc_id, total / IMPACT_SCALE) for doc_id, total in heapq.nlargest(k, accumulators.items(), key=itemgetter(1))]
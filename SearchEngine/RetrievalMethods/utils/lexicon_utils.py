@@ -0,0 +1,114 @@
+import array
+import mmap
+import struct
+
+# lexicon.bin layout (see IndexEngine/utils/lexicon_utils.py)
+LEXICON_MAGIC = b"CLEX"
+LEXICON_VERSION = 1
+LEXICON_HEADER = struct.Struct("<4sBxxxIII")
+TERM_HEADER = struct.Struct("<HI")
+TERM_ENTRY = struct.Struct("<IIII")
+
+
+class Lexicon:
+    """
+    Read-only view of a lexicon.bin file that is memory-mapped and searched lazily.
+
+    Only the block offsets are read on open. Lookups binary search the first term of
+    each block and scan one block, so startup does not depend on the vocabulary size
+    and the pages are shared through the page cache by every process searching the index.
+    Supports the dictionary operations the search engine uses on lexicon.json.
+    """
+
+    def __init__(self, lexicon_path: str):
+        """
+        Maps a lexicon.bin file.
+
+        Args:
+            lexicon_path: The path of the lexicon.bin file.
+        """
+        with open(lexicon_path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, self.term_count, block_count = LEXICON_HEADER.unpack_from(self.data, 0)
+        if magic != LEXICON_MAGIC or version != LEXICON_VERSION:
+            self.data.close()
+            raise ValueError(f"'{lexicon_path}' is not a version {LEXICON_VERSION} lexicon file")
+
+        self.block_offsets = array.array('I')
+        self.block_offsets.frombytes(self.data[LEXICON_HEADER.size:LEXICON_HEADER.size + (block_count + 1) * 4])
+
+    def _first_term(self, block: int) -> bytes:
+        """
+        Gets the first term of a block, which is always stored in full.
+        """
+        position = self.block_offsets[block]
+        _, length = TERM_HEADER.unpack_from(self.data, position)
+        position += TERM_HEADER.size
+        return self.data[position:position + length]
+
+    def lookup(self, token: str) -> tuple[int, int, int, int] | None:
+        """
+        Gets the entry of a term.
+
+        Args:
+            token: The term to look up.
+
+        Returns:
+            A tuple of (term id, document frequency, postings offset, postings length), or None if the term is not in the lexicon.
+        """
+        key = token.encode('utf-8')
+
+        # Find the last block starting at or before the term
+        low = 0
+        high = len(self.block_offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self._first_term(middle) <= key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == 0:
+            return None
+
+        data = self.data
+        position = self.block_offsets[low - 1]
+        end = self.block_offsets[low]
+        term = b""
+        while position < end:
+            prefix_length, suffix_length = TERM_HEADER.unpack_from(data, position)
+            position += TERM_HEADER.size
+            term = term[:prefix_length] + data[position:position + suffix_length]
+            position += suffix_length
+            if term == key:
+                return TERM_ENTRY.unpack_from(data, position)
+            if term > key:
+                return None
+            position += TERM_ENTRY.size
+
+        return None
+
+    def get(self, token: str, default=None):
+        """
+        Gets the term id of a term, or default if the term is not in the lexicon.
+        """
+        entry = self.lookup(token)
+        return entry[0] if entry is not None else default
+
+    def __getitem__(self, token: str) -> int:
+        entry = self.lookup(token)
+        if entry is None:
+            raise KeyError(token)
+        return entry[0]
+
+    def __contains__(self, token: str) -> bool:
+        return self.lookup(token) is not None
+
+    def __len__(self) -> int:
+        return self.term_count
+
+    def close(self) -> None:
+        """
+        Unmaps the lexicon file.
+        """
+        self.data.close()
@@ -0,0 +1,214 @@
+import heapq
+import math
+import os
+import sys
+from bisect import bisect_left
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from RetrievalMethods.utils.score_utils import restrict_postings
+
+# Relative slack added to the term upper bounds and to partial scores, so rounding in the
+# bounds and in the order partial scores are added up can never prune a document that
+# belongs in the top k
+BOUND_SLACK = 1e-9
+
+
+def maxscore_top_k(query_postings: list, upper_bounds: list[float], score_function, k: int) -> list[tuple[int, float]]:
+    """
+    Gets the top k documents by scoring document-at-a-time with MaxScore pruning.
+
+    Query terms are split into essential and non-essential terms: the non-essential
+    terms are the lowest-bound terms whose bounds add up to less than the score of the
+    current k-th document, so a document containing only those terms cannot make the
+    top k. Only postings of essential terms produce candidates, and non-essential
+    postings are skipped to each candidate with a binary search, stopping as soon as
+    the candidate can no longer reach the k-th score.
+
+    Scores are added up in query term order and ties are broken the way exhaustive
+    scoring ranks them (first query term containing the document, then doc id), so the
+    result is identical to sorting every document's score.
+
+    Args:
+        query_postings: A (doc ids, term frequencies) tuple for each query term, in query order.
+        upper_bounds: The largest score each query term can add to a document.
+        score_function: Gets the score a term adds to a document from the term's position in the query, the doc id and the term frequency.
+        k: The number of documents to return.
+
+    Returns:
+        The (doc id, score) pairs of the top k documents, best first.
+    """
+    num_terms = len(query_postings)
+    bounds = [bound * (1 + BOUND_SLACK) for bound in upper_bounds]
+    order = sorted(range(num_terms), key=lambda term: bounds[term])
+    doc_id_lists = [doc_ids.tolist() if hasattr(doc_ids, "tolist") else list(doc_ids) for doc_ids, _ in query_postings]
+    term_frequency_lists = [term_frequencies.tolist() if hasattr(term_frequencies, "tolist") else list(term_frequencies) for _, term_frequencies in query_postings]
+
+    # Terms that can only lower a score start out non-essential. Documents containing only
+    # those terms are never candidates, so they are scored afterwards if they could make the top k.
+    lowering_terms = sum(1 for bound in bounds if bound <= 0)
+    top_k = _maxscore_pass(doc_id_lists, term_frequency_lists, bounds, order, score_function, k, lowering_terms)
+    if lowering_terms and (len(top_k) < k or top_k[0][0] <= 0):
+        _add_lowering_documents(top_k, doc_id_lists, term_frequency_lists, bounds, score_function, k)
+
+    return [(-negative_doc_id, score) for score, _, negative_doc_id in sorted(top_k, reverse=True)]
+
+def _maxscore_pass(doc_id_lists: list[list[int]], term_frequency_lists: list[list[int]], bounds: list[float], order: list[int], score_function, k: int, essential_start: int) -> list[tuple[float, int, int]]:
+    """
+    Scores the postings of a query once with MaxScore (see maxscore_top_k).
+
+    Args:
+        essential_start: The number of lowest-bound terms that start out non-essential.
+
+    Returns:
+        The heap of (score, -first term, -doc id) entries of the top k documents.
+    """
+    num_terms = len(doc_id_lists)
+    cumulative_bounds = [0.0]
+    for term in order:
+        cumulative_bounds.append(cumulative_bounds[-1] + bounds[term])
+
+    lengths = [len(doc_ids) for doc_ids in doc_id_lists]
+    cursors = [0] * num_terms
+    # order[:essential_start] are the non-essential terms
+    essential = [True] * num_terms
+    for term in order[:essential_start]:
+        essential[term] = False
+    top_k = []
+    threshold = float("-inf")
+
+    # Essential postings are merged through a heap of doc_id * num_terms + term keys, and
+    # a term's keys are dropped as they come up once it turns non-essential
+    merge_heap = [doc_ids[0] * num_terms + term for term, doc_ids in enumerate(doc_id_lists) if doc_ids and essential[term]]
+    heapq.heapify(merge_heap)
+
+    while merge_heap:
+        doc_id = merge_heap[0] // num_terms
+        end_key = (doc_id + 1) * num_terms
+
+        found = []
+        partial = 0.0
+        magnitude = 0.0
+        while merge_heap and merge_heap[0] < end_key:
+            term = merge_heap[0] - doc_id * num_terms
+            if not essential[term]:
+                heapq.heappop(merge_heap)
+                continue
+            cursor = cursors[term]
+            contribution = score_function(term, doc_id, term_frequency_lists[term][cursor])
+            found.append((term, contribution))
+            partial += contribution
+            magnitude += abs(contribution)
+            cursor += 1
+            cursors[term] = cursor
+            if cursor < lengths[term]:
+                heapq.heapreplace(merge_heap, doc_id_lists[term][cursor] * num_terms + term)
+            else:
+                heapq.heappop(merge_heap)
+
+        if not found:
+            continue
+
+        # Visit the non-essential terms from the highest bound down while the document can still make it
+        remaining = cumulative_bounds[essential_start]
+        pruned = False
+        for position in range(essential_start - 1, -1, -1):
+            if partial + remaining + magnitude * BOUND_SLACK < threshold:
+                pruned = True
+                break
+            term = order[position]
+            remaining -= bounds[term]
+            doc_ids = doc_id_lists[term]
+            cursor = bisect_left(doc_ids, doc_id, cursors[term])
+            cursors[term] = cursor
+            if cursor < lengths[term] and doc_ids[cursor] == doc_id:
+                contribution = score_function(term, doc_id, term_frequency_lists[term][cursor])
+                found.append((term, contribution))
+                partial += contribution
+                magnitude += abs(contribution)
+        if pruned:
+            continue
+
+        found.sort()
+        score = 0.0
+        for _, contribution in found:
+            score += contribution
+
+        # The heap keeps the worst of the top k first, an earlier first term or doc id ranks higher
+        entry = (score, -found[0][0], -doc_id)
+        if len(top_k) < k:
+            heapq.heappush(top_k, entry)
+        elif entry > top_k[0]:
+            heapq.heapreplace(top_k, entry)
+        else:
+            continue
+
+        if len(top_k) == k and top_k[0][0] > threshold:
+            threshold = top_k[0][0]
+            while essential_start < num_terms and cumulative_bounds[essential_start + 1] < threshold:
+                essential[order[essential_start]] = False
+                essential_start += 1
+
+    return top_k
+
+def _add_lowering_documents(top_k: list[tuple[float, int, int]], doc_id_lists: list[list[int]], term_frequency_lists: list[list[int]], bounds: list[float], score_function, k: int) -> None:
+    """
+    Adds the documents that contain only terms with no positive bound to a top k heap.
+
+    Args:
+        top_k: The heap of (score, -first term, -doc id) entries from _maxscore_pass.
+    """
+    raising_doc_ids = set()
+    for term, doc_ids in enumerate(doc_id_lists):
+        if bounds[term] > 0:
+            raising_doc_ids.update(doc_ids)
+
+    result_set = {}
+    first_terms = {}
+    for term, doc_ids in enumerate(doc_id_lists):
+        if bounds[term] > 0:
+            continue
+        for doc_id, term_frequency in zip(doc_ids, term_frequency_lists[term]):
+            if doc_id in raising_doc_ids:
+                continue
+            score = score_function(term, doc_id, term_frequency)
+            if doc_id not in result_set:
+                result_set[doc_id] = score
+                first_terms[doc_id] = term
+            else:
+                result_set[doc_id] += score
+
+    for doc_id, score in result_set.items():
+        entry = (score, -first_terms[doc_id], -doc_id)
+        if len(top_k) < k:
+            heapq.heappush(top_k, entry)
+        elif entry > top_k[0]:
+            heapq.heapreplace(top_k, entry)
+
+def bm25_top_k(query_postings: list, term_bounds: list[float], doc_lengths, average_doc_length: float, k: int, matches: set[int] | None = None) -> list[tuple[int, float]]:
+    """
+    Gets the top k documents by BM25 score with MaxScore pruning.
+
+    Args:
+        query_postings: A (doc ids, term frequencies) tuple for each query term, in query order.
+        term_bounds: The bound on each query term's tf / (k + tf) component (see SearchEngine.get_term_bound).
+        doc_lengths: The length of each document, by doc id.
+        average_doc_length: The average document length of the collection (see SearchEngine.average_doc_length).
+        k: The number of documents to return.
+        matches: The only doc ids that may be ranked, or None to rank every document.
+
+    Returns:
+        The (doc id, score) pairs of the top k documents, the same as exhaustive BM25 scoring gives.
+    """
+    num_docs = len(doc_lengths)
+    document_frequencies = [len(doc_ids) for doc_ids, _ in query_postings]
+
+    idfs = [math.log((num_docs - document_frequency + 0.5) / (document_frequency + 0.5)) for document_frequency in document_frequencies]
+    # A term with a negative idf can only lower a document's score
+    upper_bounds = [max(0.0, idf) * term_bound for idf, term_bound in zip(idfs, term_bounds)]
+
+    def score_function(term: int, doc_id: int, term_frequency: int) -> float:
+        # The same arithmetic as bm25_score, with the idf computed once per term
+        k = 1.2 * ((1-0.75) + 0.75 * (doc_lengths[doc_id] / average_doc_length))
+        return (term_frequency / (k + term_frequency)) * idfs[term]
+
+    return maxscore_top_k(restrict_postings(query_postings, matches), upper_bounds, score_function, k)
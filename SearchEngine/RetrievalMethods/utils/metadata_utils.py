@@ -0,0 +1,50 @@
+import array
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from RetrievalMethods.utils.column_utils import StringColumn
+from RetrievalMethods.utils.date_utils import format_date_number
+
+
+class MetadataStore:
+    """
+    The date and headline of every document of an index, from the metadata columns of the
+    base index and of each segment.
+
+    A result is rendered from two small records, a date number and a headline, so a
+    results page never decompresses the documents it lists.
+    """
+
+    def __init__(self, dates: array.array, headlines: StringColumn):
+        """
+        Args:
+            dates: The YYYYMMDD date number of each document, by global doc id, 0 if its docno has no date.
+            headlines: The headline of each document, by global doc id.
+        """
+        self.dates = dates
+        self.headlines = headlines
+
+    @classmethod
+    def concatenate(cls, metadata: list[tuple[array.array, StringColumn]]) -> "MetadataStore":
+        """
+        Joins the metadata columns of several segments, in doc id order.
+        """
+        dates = array.array('I')
+        for segment_dates, _ in metadata:
+            dates.extend(segment_dates)
+
+        return cls(dates, StringColumn.concatenate([headlines for _, headlines in metadata]))
+
+    def get_many(self, doc_ids: list[int]) -> list[tuple[str, str] | None]:
+        """
+        Gets the display date and headline of several documents, in the order of doc_ids.
+
+        Documents whose docno has no date get None, their fields are read from the document.
+        """
+        fields = []
+        for doc_id in doc_ids:
+            date_number = self.dates[doc_id]
+            fields.append((format_date_number(date_number), self.headlines[doc_id]) if date_number else None)
+
+        return fields
@@ -0,0 +1,106 @@
+import array
+import re
+import zlib
+from itertools import accumulate
+
+# Term positions of an index built with --positions (see IndexEngine/utils/position_utils.py)
+POSITIONS_FILE = "positions.bin"
+POSITION_OFFSETS_FILE = "position_offsets.bin"
+# First byte of every positions list
+POSITIONS_VERSION = 2
+# A quoted phrase, optionally followed by ~N for the most words allowed between its terms
+PHRASE_PATTERN = re.compile(r'"([^"]*)"(?:~(\d+))?')
+
+
+def parse_query(query: str) -> tuple[str, list[tuple[str, int]]]:
+    """
+    Splits the phrase and proximity operators out of a query.
+
+    "soviet union" matches the words next to each other and in order, and
+    "gorbachev glasnost"~5 matches them in order with at most 5 words between them.
+
+    Args:
+        query: The query as typed.
+
+    Returns:
+        The query's words without the operators, which are ranked as usual, and the
+        (text, most words between terms) of each operator.
+    """
+    phrases = []
+
+    def replace(match: re.Match) -> str:
+        phrases.append((match.group(1), int(match.group(2)) if match.group(2) else 0))
+        return f" {match.group(1)} "
+
+    return PHRASE_PATTERN.sub(replace, query), phrases
+
+def decode_position_runs(data, term_frequencies, first: int, indexes: list[int]) -> list[list[int]]:
+    """
+    Decodes the positions of some postings of a term read from positions.bin.
+
+    Only the blocks holding the wanted postings are decompressed, and the start of a
+    posting's run in its block is found from the term frequencies of the postings before
+    it in the block.
+
+    Args:
+        data: The bytes (or memoryview) of the term's positions in one segment.
+        term_frequencies: The term frequencies of the postings holding the segment's postings.
+        first: The index of the segment's first posting in term_frequencies.
+        indexes: The indexes of the wanted postings in the segment's postings, sorted.
+
+    Returns:
+        The sorted positions of each wanted posting, in the order of indexes.
+
+    Raises:
+        ValueError: If the list is not a version 2 positions list.
+    """
+    if data[0] != POSITIONS_VERSION:
+        raise ValueError(f"Unsupported positions version {data[0]}, expected {POSITIONS_VERSION}")
+
+    gap_type = chr(data[1])
+    header = array.array('I')
+    header.frombytes(data[2:10])
+    block_postings, block_count = header
+    header_end = 10 + 4 * block_count
+    block_ends = array.array('I')
+    block_ends.frombytes(data[10:header_end])
+    block_starts = array.array('I', [0]) + block_ends[:-1]
+
+    blocks = {}
+    runs = []
+    for index in indexes:
+        block, offset = divmod(index, block_postings)
+        if block not in blocks:
+            blocks[block] = array.array(gap_type, zlib.decompress(data[header_end + block_starts[block]:header_end + block_ends[block]]))
+        block_first = first + block * block_postings
+        start = sum(term_frequencies[block_first:block_first + offset])
+        runs.append(list(accumulate(blocks[block][start:start + term_frequencies[block_first + offset]])))
+
+    return runs
+
+def match_window(position_lists: list[list[int]], gap: int) -> bool:
+    """
+    Checks whether a document has its terms in order with at most gap words between
+    each term and the next, a phrase with a gap of 0.
+
+    Each term keeps the positions reachable from a match of the terms before it, and a
+    position is reachable from the closest reachable position before it.
+
+    Args:
+        position_lists: The sorted positions of each term in the document, in query order.
+        gap: The most words allowed between a term and the next.
+    """
+    reachable = position_lists[0]
+    for positions in position_lists[1:]:
+        next_reachable = []
+        i = 0
+        for position in positions:
+            while i < len(reachable) and reachable[i] < position:
+                i += 1
+            if i and position - reachable[i - 1] <= gap + 1:
+                next_reachable.append(position)
+        if not next_reachable:
+            return False
+        reachable = next_reachable
+
+    return True
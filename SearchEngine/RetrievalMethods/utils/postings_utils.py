@@ -0,0 +1,86 @@
+import array
+import json
+import mmap
+import os
+import zlib
+from itertools import accumulate
+
+# First byte of a v2 postings list (see IndexEngine/utils/postings_utils.py)
+POSTINGS_VERSION = 2
+
+
+def decode_postings(data) -> tuple[array.array, array.array]:
+    """
+    Decodes a postings list read from inverted_index.bin.
+
+    Handles both the v2 binary format and the original zlib compressed JSON lists.
+
+    Args:
+        data: The bytes (or memoryview) of one postings list.
+
+    Returns:
+        A tuple of (doc ids, term frequencies) arrays.
+    """
+    if data[0] != POSTINGS_VERSION:
+        posting = json.loads(zlib.decompress(data).decode('utf-8'))
+        return array.array('I', posting[0::2]), array.array('I', posting[1::2])
+
+    gaps = array.array(chr(data[1]))
+    term_frequencies = array.array(chr(data[2]))
+    packed = zlib.decompress(data[3:])
+    split = len(packed) // (gaps.itemsize + term_frequencies.itemsize) * gaps.itemsize
+    gaps.frombytes(packed[:split])
+    term_frequencies.frombytes(packed[split:])
+
+    return array.array('I', accumulate(gaps)), term_frequencies
+
+class PostingsReader:
+    """
+    Read-only view of an inverted_index.bin file that is memory-mapped once.
+
+    Postings are handed out as memoryview slices of the mapping, so reading a term copies
+    nothing and needs no file handle, and every retrieval method shares the same pages
+    through the page cache. The mapping stays valid if the file is removed, so a merge
+    that deletes a segment's directory cannot break a running search engine.
+    """
+
+    def __init__(self, index_path: str, index_offsets: array.array):
+        """
+        Maps an inverted_index.bin file.
+
+        Args:
+            index_path: The path of the inverted_index.bin file.
+            index_offsets: The offset of each term's postings in the file, followed by the end offset.
+        """
+        self.index_offsets = index_offsets
+        self.data = None
+        if os.path.getsize(index_path):
+            with open(index_path, "rb") as f:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.data if self.data is not None else b"")
+
+    def get(self, term_id: int) -> memoryview:
+        """
+        Gets the encoded postings of a term without copying them.
+
+        Args:
+            term_id: The id of the term in the lexicon.
+
+        Returns:
+            A memoryview of the term's postings, which decode_postings accepts.
+        """
+        return self.view[self.index_offsets[term_id]:self.index_offsets[term_id + 1]]
+
+    def close(self) -> None:
+        """
+        Unmaps the index file. Postings handed out by get must be released first.
+        """
+        self.view.release()
+        if self.data is not None:
+            self.data.close()
+
+    def __enter__(self) -> "PostingsReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
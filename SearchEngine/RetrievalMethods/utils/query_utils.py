@@ -28,7 +28,7 @@ def get_scentence_score(tokenized_sentence: list[str], tokens: list[str]) -> flo
     return 5*k + 4*d + c
     
         
-def get_query_biased_summary(tokens: list[str], doc_content: str):
+def get_query_biased_summary(tokens: list[str], doc_content: str, tokenize_function=tokenize):
     """
     Gets a query biased summary from the given query and document content.
     """
@@ -65,7 +65,7 @@ def get_query_biased_summary(tokens: list[str], doc_content: str):
                 i += 1
                 if word:
                     scentence.append(word)
-                    tokenize(word, tokenized_sentence)
+                    tokenize_function(word, tokenized_sentence)
                 score = get_scentence_score(tokenized_sentence, tokens)
                 score += l + 1/i 
                 word = ""
@@ -85,7 +85,7 @@ def get_query_biased_summary(tokens: list[str], doc_content: str):
                 i += 1
                 if word:
                     scentence.append(word)
-                    tokenize(word, tokenized_sentence)
+                    tokenize_function(word, tokenized_sentence)
 
                 score = get_scentence_score(tokenized_sentence, tokens)
                 score += l + 1/i
@@ -109,7 +109,7 @@ def get_query_biased_summary(tokens: list[str], doc_content: str):
                 i += 1
                 if word:
                     scentence.append(word)
-                    tokenize(word, tokenized_sentence)
+                    tokenize_function(word, tokenized_sentence)
                 score = get_scentence_score(tokenized_sentence, tokens)
                 score += l + 1/i
                 word = ""
@@ -132,14 +132,14 @@ def get_query_biased_summary(tokens: list[str], doc_content: str):
 
         elif char == " ":
             scentence.append(word)
-            tokenize(word, tokenized_sentence)
+            tokenize_function(word, tokenized_sentence)
             word = ""
 
         # end of scentence so add it to the scentences dictionary
         elif char == "." or char == "?" or char == "!":
             word += char
             scentence.append(word)
-            tokenize(word, tokenized_sentence)
+            tokenize_function(word, tokenized_sentence)
             i += 1
             score = get_scentence_score(tokenized_sentence, tokens) 
             score += l + 1/i
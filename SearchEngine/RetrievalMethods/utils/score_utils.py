@@ -1,4 +1,8 @@
+import array
+import heapq
 import math
+from bisect import bisect_left
+from operator import itemgetter
 
 def bm25_score(term_frequency: int, doc_length: int, avg_doc_length: int, num_docs: int, num_docs_containing_term: int) -> float:
     """
@@ -11,4 +15,109 @@ def cosine_similarity_score(term_frequency: int, num_docs: int, num_docs_contain
     """
     Calculates the magnitude of a document.
     """
-    return (1 + math.log(term_frequency)) * math.log(1 + (num_docs / num_docs_containing_term))
\ No newline at end of file
+    return (1 + math.log(term_frequency)) * math.log(1 + (num_docs / num_docs_containing_term))
+
+def select_top_k(result_set: dict[int, float], k: int) -> list[tuple[int, float]]:
+    """
+    Gets the k highest scoring documents, best first.
+
+    Keeps a heap of k documents instead of sorting every scored document, and ranks ties
+    in the order the documents were first scored, the same as a stable sort.
+    """
+    return heapq.nlargest(k, result_set.items(), key=itemgetter(1))
+
+def restrict_postings(query_postings: list[tuple], matches: set[int] | None) -> list[tuple]:
+    """
+    Keeps only the postings of documents matching a query's phrase and proximity operators.
+
+    Each match is found with a binary search from the previous one, so the cost follows
+    the number of matches rather than the length of the postings. Document frequencies
+    must be taken from the full postings, so scores are the same as without operators.
+
+    Args:
+        query_postings: The (doc ids, term frequencies) postings of each query term.
+        matches: The doc ids matching the operators, or None to keep every posting.
+
+    Returns:
+        The (doc ids, term frequencies) postings of each query term, in doc id order.
+    """
+    if matches is None:
+        return query_postings
+
+    sorted_matches = sorted(matches)
+    restricted = []
+    for doc_ids, term_frequencies in query_postings:
+        kept_doc_ids = array.array('I')
+        kept_term_frequencies = array.array('I')
+        start = 0
+        for doc_id in sorted_matches:
+            start = bisect_left(doc_ids, doc_id, start)
+            if start == len(doc_ids):
+                break
+            if doc_ids[start] == doc_id:
+                kept_doc_ids.append(doc_id)
+                kept_term_frequencies.append(term_frequencies[start])
+        restricted.append((kept_doc_ids, kept_term_frequencies))
+
+    return restricted
+
+def rank_bm25(query_postings: list[tuple], doc_lengths, average_doc_length: float, k: int, matches: set[int] | None = None) -> list[tuple[int, float]]:
+    """
+    Gets the top k documents by BM25, scoring every posting of every query term.
+
+    Args:
+        query_postings: The (doc ids, term frequencies) postings of each query term.
+        doc_lengths: The length of each document, by doc id.
+        average_doc_length: The average document length of the collection (see SearchEngine.average_doc_length).
+        k: The number of documents to return.
+        matches: The only doc ids that may be ranked, or None to rank every document.
+
+    Returns:
+        The (doc id, score) pairs of the top k documents, best first.
+    """
+    result_set = {}
+    document_frequencies = [len(doc_ids) for doc_ids, _ in query_postings]
+
+    # Get BM25 Scores for each document
+    for (doc_ids, term_frequencies), document_frequency in zip(restrict_postings(query_postings, matches), document_frequencies):
+
+        for doc_id, term_frequency in zip(doc_ids, term_frequencies):
+            doc_length = doc_lengths[doc_id]
+            score = bm25_score(term_frequency, doc_length, average_doc_length, len(doc_lengths), document_frequency)
+            if doc_id not in result_set:
+                result_set[doc_id] = score
+            else:
+                result_set[doc_id] += score
+
+    return select_top_k(result_set, k)
+
+def rank_cosine(query_postings: list[tuple], doc_magnitudes, k: int, matches: set[int] | None = None) -> list[tuple[int, float]]:
+    """
+    Gets the top k documents by cosine similarity, scoring every posting of every query term.
+
+    Args:
+        query_postings: The (doc ids, term frequencies) postings of each query term.
+        doc_magnitudes: The magnitude of each document, by doc id.
+        k: The number of documents to return.
+        matches: The only doc ids that may be ranked, or None to rank every document.
+
+    Returns:
+        The (doc id, score) pairs of the top k documents, best first.
+    """
+    result_set = {}
+    document_frequencies = [len(doc_ids) for doc_ids, _ in query_postings]
+
+    # Get cosine similarity scores for each document
+    for (doc_ids, term_frequencies), document_frequency in zip(restrict_postings(query_postings, matches), document_frequencies):
+
+        for doc_id, term_frequency in zip(doc_ids, term_frequencies):
+            score = cosine_similarity_score(term_frequency, len(doc_magnitudes), document_frequency)
+            if doc_id not in result_set:
+                result_set[doc_id] = score
+            else:
+                result_set[doc_id] += score
+
+    for doc_id in result_set:
+        result_set[doc_id] /= doc_magnitudes[doc_id]
+
+    return select_top_k(result_set, k)
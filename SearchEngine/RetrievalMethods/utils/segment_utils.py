@@ -0,0 +1,23 @@
+import json
+import os
+
+# Manifest of the segments appended to an index (see IndexEngine/utils/segment_utils.py)
+SEGMENTS_FILE = "segments.json"
+
+
+def read_segment_paths(store_path: str) -> list[str]:
+    """
+    Gets the directories of the base index and of every segment listed in its manifest,
+    in doc id order.
+
+    Raises:
+        OSError, ValueError: If the manifest exists but cannot be read.
+    """
+    segment_paths = [store_path]
+    manifest_file = os.path.join(store_path, SEGMENTS_FILE)
+    if os.path.exists(manifest_file):
+        with open(manifest_file, "r") as f:
+            manifest = json.load(f)
+        segment_paths += [os.path.join(store_path, segment["name"]) for segment in manifest["segments"]]
+
+    return segment_paths
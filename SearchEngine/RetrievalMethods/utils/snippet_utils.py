@@ -0,0 +1,124 @@
+import array
+import mmap
+import os
+import sys
+import zlib
+from bisect import bisect_right
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from RetrievalMethods.utils.query_utils import get_scentence_score
+
+# Sentences of each document, split and tokenized at index time (see IndexEngine/utils/snippet_utils.py)
+SNIPPETS_FILE = "snippets.bin"
+SNIPPET_OFFSETS_FILE = "snippet_offsets.bin"
+
+
+def decode_snippets(data) -> tuple[list[str], list[tuple[int, bool, array.array, str]]]:
+    """
+    Decodes the snippet record of a document read from snippets.bin.
+
+    Args:
+        data: The bytes (or memoryview) of one snippet record.
+
+    Returns:
+        The document's distinct tokens, and the (weight, cut short, token ids, text) of each sentence.
+    """
+    numbers = array.array(chr(data[0]))
+    packed = zlib.decompress(data[1:])
+    count = array.array('I', packed[:4])[0]
+    end = 4 + numbers.itemsize * count
+    numbers.frombytes(packed[4:end])
+    lines = packed[end:].decode('utf-8').split("\n")
+
+    term_count = numbers[0]
+    sentences = []
+    position = 2
+    for text in lines[term_count:term_count + numbers[1]]:
+        weight, truncated, token_count = numbers[position:position + 3]
+        position += 3
+        sentences.append((weight, bool(truncated), numbers[position:position + token_count], text))
+        position += token_count
+
+    return lines[:term_count], sentences
+
+def get_snippet_summary(tokens: list[str], snippets: tuple[list[str], list[tuple[int, bool, array.array, str]]]) -> str:
+    """
+    Gets a query biased summary from the stored sentences of a document.
+
+    The sentences are scored and picked exactly as get_query_biased_summary does after
+    splitting the raw document, so the summary is the same.
+
+    Args:
+        tokens: The query's tokens.
+        snippets: The decoded snippet record of the document.
+
+    Returns:
+        The summary.
+    """
+    terms, sentences = snippets
+    # A document's terms are distinct, so each has one id
+    term_ids = {term: term_id for term_id, term in enumerate(terms)}
+    query_ids = {term_ids[token] for token in set(tokens) if token in term_ids}
+
+    scored = {}
+    for i, (weight, _, token_ids, _) in enumerate(sentences, start=1):
+        score = get_scentence_score(token_ids, query_ids)
+        score += weight + 1/i
+
+        # ensures no duplicate scores
+        while score in scored:
+            score -= 0.1
+        scored[score] = i - 1
+
+    biased_query = ""
+    for score, position in sorted(scored.items(), key=lambda x: x[0], reverse=True)[:2]:
+        _, truncated, _, text = sentences[position]
+        biased_query += text + " "
+        if truncated:
+            biased_query = biased_query.strip() + "..."
+
+    return biased_query
+
+class SnippetStore:
+    """
+    The snippet records of an index built with --snippets, from the snippets.bin of the
+    base index and of each segment.
+    """
+
+    def __init__(self, snippets_paths: list[str], snippet_offsets: list[array.array]):
+        """
+        Args:
+            snippets_paths: The snippets.bin of the base index and of each segment, in doc id order.
+            snippet_offsets: The record offsets in each snippets.bin, followed by the end offset.
+        """
+        self.maps = []
+        for snippets_path in snippets_paths:
+            with open(snippets_path, "rb") as f:
+                self.maps.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        self.offsets = snippet_offsets
+        self.doc_bases = [0]
+        for segment_offsets in snippet_offsets[:-1]:
+            self.doc_bases.append(self.doc_bases[-1] + len(segment_offsets) - 1)
+        # The name of the corpus schema whose fields the sentences were split on
+        self.schema = self.maps[0][:snippet_offsets[0][0]].decode('utf-8').strip()
+
+    def get_many(self, doc_ids: list[int]) -> list[tuple[list[str], list[tuple[int, bool, array.array, str]]]]:
+        """
+        Gets the decoded snippet records of several documents, in the order of doc_ids.
+        """
+        records = []
+        for doc_id in doc_ids:
+            segment = bisect_right(self.doc_bases, doc_id) - 1
+            local_id = doc_id - self.doc_bases[segment]
+            offsets = self.offsets[segment]
+            records.append(decode_snippets(self.maps[segment][offsets[local_id]:offsets[local_id + 1]]))
+
+        return records
+
+    def close(self) -> None:
+        """
+        Unmaps every snippets.bin.
+        """
+        for snippets_map in self.maps:
+            snippets_map.close()
+        self.maps = []
@@ -0,0 +1,18 @@
+import json
+import os
+
+# Collection statistics written by the IndexEngine (see IndexEngine/utils/stats_utils.py)
+COLLECTION_STATS_FILE = "collection_stats.json"
+
+
+def read_collection_stats(store_path: str) -> dict | None:
+    """
+    Reads the number of documents, their total and average length and the number of terms
+    and postings of an index, or None for indexes from before the collection statistics.
+    """
+    collection_stats_file = os.path.join(store_path, COLLECTION_STATS_FILE)
+    if not os.path.exists(collection_stats_file):
+        return None
+
+    with open(collection_stats_file, "r") as f:
+        return json.load(f)
@@ -0,0 +1,95 @@
+import os
+import sys
+from itertools import repeat
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from RetrievalMethods.utils.query_utils import get_query_biased_summary
+from RetrievalMethods.utils.new_query_utils import get_query_biased_summary as get_new_query_biased_summary
+from RetrievalMethods.utils.snippet_utils import get_snippet_summary
+
+# Results summarised by search, one page of Coogle. Later results are summarised on demand.
+SUMMARY_RESULTS = 10
+
+# The query-biased summary of each BM25 method, and the schema of the stored sentences it matches
+SUMMARIZERS = {
+    "BM25": (get_query_biased_summary, "trec"),
+    "New_BM25": (get_new_query_biased_summary, "xml"),
+}
+
+
+def summarize_document(tokens: list[str], doc_content: str | None, snippets, fields: tuple[str, str] | None, summarize, tokenize_function) -> dict:
+    """
+    Gets the date, headline and query-biased summary of one result.
+
+    Args:
+        tokens: The query's tokens.
+        doc_content: The document as stored in docs.bin, or None if snippets and fields are both given.
+        snippets: The document's decoded snippet record, or None to parse the raw document.
+        fields: The document's date and headline from the metadata columns, or None to parse the document.
+        summarize: The query-biased summary function of the retrieval method.
+        tokenize_function: The function used to turn text into index terms.
+
+    Returns:
+        The result's date, headline and biased query.
+    """
+    if fields is not None:
+        date, headline = fields
+    else:
+        lines = doc_content.split("\n")
+        date = ""
+        headline = ""
+
+        for line in lines:
+            if "date:" in line:
+                date = line.split("date:")[1].strip()
+            elif "headline:" in line:
+                headline = line.split("headline:")[1].strip()
+
+    # Get biased query from the stored sentences, or from document content and query tokens
+    if snippets is not None:
+        biased_query = get_snippet_summary(tokens, snippets)
+    else:
+        raw_document = doc_content.split("raw document:")[1].strip()
+        biased_query = summarize(tokens, raw_document, tokenize_function)
+
+    if not headline:
+        headline = biased_query[:50].strip() + "..."
+
+    return {"date": date, "headline": headline, "biased_query": biased_query}
+
+def summarize_results(engine, doc_ids: list[int], tokens: list[str], method: str, executor=None, chunksize: int = 1) -> list[dict]:
+    """
+    Gets the date, headline and query-biased summary of several results, such as a page.
+
+    Dates and headlines come from the metadata columns, and summaries use the stored
+    sentences of an index built with --snippets for the method's schema, so a document is
+    only decompressed when one of them is missing. Those documents are read at once.
+
+    Args:
+        engine: The SearchEngine holding the loaded index.
+        doc_ids: The doc ids of the results.
+        tokens: The query's tokens.
+        method: The BM25 retrieval method whose summaries to build.
+        executor: A pool to build the summaries in concurrently, or None to build them in order here.
+        chunksize: The number of summaries sent to a pool worker at a time.
+
+    Returns:
+        The date, headline and biased query of each result, in the order of doc_ids.
+    """
+    summarize, schema = SUMMARIZERS[method]
+    if engine.snippet_store is not None and engine.snippet_store.schema == schema:
+        snippets = engine.snippet_store.get_many(doc_ids)
+    else:
+        snippets = [None] * len(doc_ids)
+    if engine.metadata is not None:
+        fields = engine.metadata.get_many(doc_ids)
+    else:
+        fields = [None] * len(doc_ids)
+
+    needed = [doc_id for doc_id, snippet, field in zip(doc_ids, snippets, fields) if snippet is None or field is None]
+    documents = dict(zip(needed, engine.doc_store.get_many(needed)))
+
+    arguments = (repeat(tokens), [documents.get(doc_id) for doc_id in doc_ids], snippets, fields, repeat(summarize), repeat(engine.tokenize_function))
+    if executor is not None and len(doc_ids) > 1:
+        return list(executor.map(summarize_document, *arguments, chunksize=chunksize))
+    return list(map(summarize_document, *arguments))
@@ -1,3 +1,10 @@
+import os
+import sys
+
+# Queries and summaries are tokenized by the same implementation as documents
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from IndexEngine.utils.tokenize_utils import tokenize, tokenize_and_stem, TOKENIZER_FILE, TOKENIZERS
+
 def convert_tokens_to_ids(text: list[str], lexicon: dict[str, int], word_counts: dict[int, int]) -> None:
     """
     Converts a list of tokens to their corresponding ids and adds them to the lexicon if necessary.
@@ -33,20 +40,3 @@ def add_to_postings(word_counts: dict[int, int], doc_id: int, inverted_index: li
             inverted_index[token_id].append(count)
         else:
             inverted_index.append([doc_id, count])
-
-def tokenize(text: str, tokens: list[str]) -> None:
-    text = text.lower() 
-
-    start = 0 
-    i = 0
-
-    for currChar in text:
-        if not currChar.isdigit() and not currChar.isalpha() :
-            if start != i :
-                token = text[start:i]
-                tokens.append( token )
-                
-            start = i + 1
-        i += 1
-    if start != i :
-        tokens.append(text[start:i])
\ No newline at end of file
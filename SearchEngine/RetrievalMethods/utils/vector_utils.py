@@ -0,0 +1,122 @@
+import array
+import math
+import os
+import sys
+
+# NumPy is optional, only the numpy scoring backend needs it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from RetrievalMethods.utils.score_utils import restrict_postings
+
+# Scoring backends of the SearchEngine: per posting Python loops, or NumPy
+SCORING_BACKENDS = ("python", "numpy")
+
+
+class VectorScorer:
+    """
+    Scores whole postings lists at once with NumPy instead of one posting at a time.
+
+    The document columns are converted to NumPy arrays once and every query adds each
+    term's contributions into a dense accumulator, one array per collection. Scores are
+    computed with the same floating point operations, in the same order, as bm25_score and
+    cosine_similarity_score, and ties are ranked in the order documents were first scored,
+    so rankings are identical to the Python loops.
+    """
+
+    def __init__(self, doc_lengths: array.array, doc_magnitudes: array.array | None, average_doc_length: float):
+        """
+        Args:
+            doc_lengths: The length of each document, by global doc id.
+            doc_magnitudes: The magnitude of each document, or None if the index has none.
+            average_doc_length: The average document length of the index.
+        """
+        self.num_docs = len(doc_lengths)
+        # The BM25 length normalisation k of every document, as in bm25_score
+        self.length_norms = 1.2 * ((1-0.75) + 0.75 * (np.asarray(doc_lengths, dtype=np.float64) / average_doc_length))
+        self.doc_magnitudes = np.asarray(doc_magnitudes, dtype=np.float64) if doc_magnitudes is not None else None
+        # Natural logs of term frequencies, computed with math.log like the Python loops
+        self.log_table = np.zeros(1)
+
+    def bm25_top_k(self, query_postings: list[tuple[array.array, array.array]], k: int, matches: set[int] | None = None) -> list[tuple[int, float]]:
+        """
+        Gets the top k documents by BM25.
+
+        Args:
+            query_postings: The (doc ids, term frequencies) postings of each query term.
+            k: The number of documents to return.
+            matches: The only doc ids that may be ranked, or None to rank every document.
+
+        Returns:
+            The (doc id, score) pairs of the top k documents, best first.
+        """
+        accumulators = np.zeros(self.num_docs)
+        first_terms = np.full(self.num_docs, len(query_postings), dtype=np.int32)
+        document_frequencies = [len(doc_ids) for doc_ids, _ in query_postings]
+        for i, (doc_ids, term_frequencies) in enumerate(restrict_postings(query_postings, matches)):
+            doc_ids = np.asarray(doc_ids, dtype=np.intp)
+            term_frequencies = np.asarray(term_frequencies, dtype=np.float64)
+            idf = math.log((self.num_docs - document_frequencies[i] + 0.5) / (document_frequencies[i] + 0.5))
+            # Doc ids are unique within a postings list, so indexed addition is safe
+            accumulators[doc_ids] += (term_frequencies / (self.length_norms[doc_ids] + term_frequencies)) * idf
+            first_terms[doc_ids] = np.minimum(first_terms[doc_ids], i)
+
+        return self._select_top_k(accumulators, first_terms, len(query_postings), k)
+
+    def cosine_top_k(self, query_postings: list[tuple[array.array, array.array]], k: int, matches: set[int] | None = None) -> list[tuple[int, float]]:
+        """
+        Gets the top k documents by cosine similarity.
+
+        Args:
+            query_postings: The (doc ids, term frequencies) postings of each query term.
+            k: The number of documents to return.
+            matches: The only doc ids that may be ranked, or None to rank every document.
+
+        Returns:
+            The (doc id, score) pairs of the top k documents, best first.
+        """
+        accumulators = np.zeros(self.num_docs)
+        first_terms = np.full(self.num_docs, len(query_postings), dtype=np.int32)
+        document_frequencies = [len(doc_ids) for doc_ids, _ in query_postings]
+        for i, (doc_ids, term_frequencies) in enumerate(restrict_postings(query_postings, matches)):
+            doc_ids = np.asarray(doc_ids, dtype=np.intp)
+            term_frequencies = np.asarray(term_frequencies, dtype=np.intp)
+            idf = math.log(1 + (self.num_docs / document_frequencies[i]))
+            accumulators[doc_ids] += (1 + self._log_term_frequencies(term_frequencies)) * idf
+            first_terms[doc_ids] = np.minimum(first_terms[doc_ids], i)
+
+        scored = first_terms < len(query_postings)
+        accumulators[scored] /= self.doc_magnitudes[scored]
+
+        return self._select_top_k(accumulators, first_terms, len(query_postings), k)
+
+    def _log_term_frequencies(self, term_frequencies) -> "np.ndarray":
+        """
+        Gets the natural log of each term frequency from the table, growing it as needed.
+        """
+        max_term_frequency = int(term_frequencies.max(initial=0))
+        if max_term_frequency >= len(self.log_table):
+            size = max(max_term_frequency + 1, 2 * len(self.log_table))
+            self.log_table = np.array([0.0] + [math.log(term_frequency) for term_frequency in range(1, size)])
+
+        return self.log_table[term_frequencies]
+
+    def _select_top_k(self, accumulators, first_terms, num_terms: int, k: int) -> list[tuple[int, float]]:
+        """
+        Gets the k highest scoring documents that contain a query term, best first, ranking
+        ties by the first query term that scored them and then by doc id, like select_top_k.
+        """
+        doc_ids = np.flatnonzero(first_terms < num_terms)
+        scores = accumulators[doc_ids]
+        if len(doc_ids) > k:
+            # Keep every document tied with the k-th best score, so ties are ranked below
+            threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+            kept = scores >= threshold
+            doc_ids = doc_ids[kept]
+            scores = scores[kept]
+
+        order = np.lexsort((doc_ids, first_terms[doc_ids], -scores))[:k]
+        return list(zip(doc_ids[order].tolist(), scores[order].tolist()))
@@ -2,37 +2,138 @@ import os
 import sys
 import json
 import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
 from RetrievalMethods.BM25 import search as bm25_search
 from RetrievalMethods.New_BM25 import search as new_bm25_search
+from RetrievalMethods.cosine_similarity import search as cosine_search
+from RetrievalMethods.utils.postings_utils import PostingsReader, decode_postings
+from RetrievalMethods.utils.tokenize_utils import TOKENIZER_FILE, TOKENIZERS
+from RetrievalMethods.utils.lexicon_utils import Lexicon
+from RetrievalMethods.utils.impact_utils import IMPACTS_FILE, IMPACT_OFFSETS_FILE, decode_impacts
+from RetrievalMethods.utils.vector_utils import SCORING_BACKENDS, VectorScorer, np
+from RetrievalMethods.utils.batch_utils import RUN_TAGS, init_batch_worker, rank_batch_query, rank_in_worker, write_run
+from RetrievalMethods.utils.docstore_utils import DocStore
+from RetrievalMethods.utils.segment_utils import SEGMENTS_FILE, read_segment_paths
+from RetrievalMethods.utils.snippet_utils import SNIPPETS_FILE, SNIPPET_OFFSETS_FILE, SnippetStore
+from RetrievalMethods.utils.metadata_utils import MetadataStore
+from RetrievalMethods.utils.position_utils import POSITIONS_FILE, POSITION_OFFSETS_FILE, decode_position_runs, match_window, parse_query
+from RetrievalMethods.utils.summary_utils import SUMMARY_RESULTS, SUMMARIZERS, summarize_results
+from RetrievalMethods.utils.cache_utils import POSTINGS_CACHE_BYTES, RESULT_CACHE_ENTRIES, RESULT_CACHE_BYTES, DOC_CACHE_ENTRIES, PostingsCache, ResultCache, index_fingerprint, postings_size
+from RetrievalMethods.utils.column_utils import DOCNOS_FILE, DOC_LENGTHS_FILE, StringColumn, read_array, read_docnos, read_doc_lengths, read_doc_magnitudes, read_metadata
+from RetrievalMethods.utils.bound_utils import read_term_bounds
+from RetrievalMethods.utils.stats_utils import read_collection_stats
+
+# Files whose changes mean the index was rebuilt, appended to or merged since it was loaded
+FINGERPRINT_FILES = [SEGMENTS_FILE, "offsets.bin", "index_offsets.bin"]
 
 
 class SearchEngine:
     """
     Main search engine class that loads all index files and manages retrieval.
+
+    An index is the base index in the store directory plus any segments appended to it.
+    Each segment is searched alongside the base with its doc ids offset by its doc base,
+    so results are the same as for a single index built from all of the documents.
     """
     
-    def __init__(self, store_path: str):
+    def __init__(self, store_path: str, postings_cache_bytes: int = POSTINGS_CACHE_BYTES, warm_terms: list[str] | None = None, result_cache_entries: int = RESULT_CACHE_ENTRIES, result_cache_bytes: int = RESULT_CACHE_BYTES, backend: str = "python", doc_cache_entries: int = DOC_CACHE_ENTRIES):
         """
         Initialize the search engine with a store path.
         
         Args:
             store_path: The path to the store directory containing all index files.
+            postings_cache_bytes: The byte budget for decoded postings kept between queries, 0 to disable the cache.
+            warm_terms: Frequent terms whose postings are decoded into the cache at startup, most frequent first.
+            result_cache_entries: The most query results kept between queries, 0 to disable the result cache.
+            result_cache_bytes: The byte budget for query results kept between queries, 0 to disable the result cache.
+            backend: How BM25 and cosine similarity score every posting, "python" or "numpy" (vectorised, falls back to python without NumPy).
+            doc_cache_entries: The most decompressed documents kept between queries, 0 to disable the document cache.
         """
+        if backend not in SCORING_BACKENDS:
+            print(f"Error: Unknown scoring backend '{backend}'. Choose one of: {', '.join(SCORING_BACKENDS)}")
+            sys.exit(1)
+        if backend == "numpy" and np is None:
+            print("Warning: The numpy scoring backend needs NumPy, so scoring falls back to the python backend.\nInstall it with 'pip install numpy'.")
+            backend = "python"
+
         self.store_path = store_path
+        self.backend = backend
+        self.doc_cache_entries = doc_cache_entries
+        self.postings_cache = PostingsCache(postings_cache_bytes) if postings_cache_bytes > 0 else None
+        self.result_cache = ResultCache(result_cache_entries, result_cache_bytes) if result_cache_entries > 0 and result_cache_bytes > 0 else None
         self.lexicon = None
         self.index_offsets = None
         self.docnos = None
         self.doc_lengths = None
         self.offsets = None
+        self.doc_magnitudes = None
+        self.tokenize_function = None
+        self.segments = []
+        # Worker processes summarising results, started by the first summarize call that asks for workers
+        self.summary_executor = None
+        self.summary_workers = None
         
-        # Load all index files
+        self._load()
+
+        if warm_terms:
+            self.warm_postings_cache(warm_terms)
+
+    def _load(self) -> None:
+        """
+        Load the index files and the stores and scorer built from them.
+        """
+        # Taken before reading the files, so a change made while loading is picked up by the next query
+        self.fingerprint = index_fingerprint(self.store_path, FINGERPRINT_FILES)
         self._load_index_files()
+
+        # Documents of the base index and every segment, by global doc id or docno
+        try:
+            self.doc_store = DocStore([segment["docs_path"] for segment in self.segments], [segment["offsets"] for segment in self.segments], self.docnos, self.doc_cache_entries)
+        except Exception as e:
+            print(f"Error: {e}\nTry Re-creating the store directory or check the docs file.")
+            sys.exit(1)
+
+        # Sentences for summaries, when the base index and every segment were built with --snippets
+        self.snippet_store = None
+        if all(segment["snippet_offsets"] is not None for segment in self.segments):
+            try:
+                self.snippet_store = SnippetStore([segment["snippets_path"] for segment in self.segments], [segment["snippet_offsets"] for segment in self.segments])
+            except Exception as e:
+                print(f"Error: {e}\nTry Re-creating the store directory or check the snippets file.")
+                sys.exit(1)
+
+        # Dates and headlines of results, when the base index and every segment have the metadata columns
+        self.metadata = None
+        if all(segment["metadata"] is not None for segment in self.segments):
+            self.metadata = MetadataStore.concatenate([segment["metadata"] for segment in self.segments])
+
+        # The vectorised backend keeps NumPy copies of the document columns
+        self.scorer = VectorScorer(self.doc_lengths, self.doc_magnitudes, self.average_doc_length) if self.backend == "numpy" else None
+
+    def reload(self) -> None:
+        """
+        Reloads the base index and its segments, such as after the index was rebuilt,
+        appended to or merged, dropping the postings cached from the old files. Cached
+        results are dropped by the next search, which sees the new fingerprint.
+        """
+        self._close_index_files()
+        self._load()
+        if self.postings_cache is not None:
+            self.postings_cache.clear()
+
+    def _check_index(self) -> None:
+        """
+        Reloads the index if its files changed since it was loaded.
+        """
+        if index_fingerprint(self.store_path, FINGERPRINT_FILES) != self.fingerprint:
+            self.reload()
     
     def _load_index_files(self):
         """
-        Load all index files and handle errors.
+        Load the base index and every segment listed in the segments manifest.
         """
         # Check if store directory exists
         if not os.path.exists(self.store_path):
@@ -42,24 +143,85 @@ class SearchEngine:
         if not os.path.isdir(self.store_path):
             print(f"Error: '{self.store_path}' is not a directory.\nPlease provide a valid store directory.")
             sys.exit(1)
-        
+
+        # Queries are tokenized like the index, which older indexes do not record
+        tokenizer_name = "tokenize"
+        tokenizer_file = os.path.join(self.store_path, TOKENIZER_FILE)
+        if os.path.exists(tokenizer_file):
+            with open(tokenizer_file, "r") as f:
+                tokenizer_name = f.read().strip()
+        if tokenizer_name not in TOKENIZERS:
+            print(f"Error: Unknown tokenizer '{tokenizer_name}' in {tokenizer_file}.\nTry Re-creating the store directory.")
+            sys.exit(1)
+        self.tokenize_function = TOKENIZERS[tokenizer_name]
+
+        self.segments = []
+        try:
+            segment_paths = read_segment_paths(self.store_path)
+        except Exception as e:
+            print(f"Error: {e}\nTry Re-creating the store directory or check the segments file.")
+            sys.exit(1)
+
+        self.doc_lengths = array.array('I')
+        self.doc_magnitudes = array.array('d')
+        for segment_path in segment_paths:
+            segment = self._load_segment(segment_path)
+            segment["doc_base"] = len(self.doc_lengths)
+            self.segments.append(segment)
+            self.doc_lengths.extend(segment["doc_lengths"])
+            if self.doc_magnitudes is not None and segment["doc_magnitudes"] is not None:
+                self.doc_magnitudes.extend(segment["doc_magnitudes"])
+            else:
+                self.doc_magnitudes = None
+        self.docnos = StringColumn.concatenate([segment["docnos"] for segment in self.segments])
+        self.num_docs = len(self.doc_lengths)
+        self.total_doc_length = sum(segment["total_length"] for segment in self.segments)
+        self.average_doc_length = self.total_doc_length / self.num_docs
+
+        # The base index keeps its original attributes
+        base = self.segments[0]
+        self.lexicon = base["lexicon"]
+        self.index_offsets = base["index_offsets"]
+        self.offsets = base["offsets"]
+        self.doc_bases = [segment["doc_base"] for segment in self.segments]
+        self.has_impacts = all(segment["impacts"] is not None for segment in self.segments)
+        self.has_positions = all(segment["positions"] is not None for segment in self.segments)
+
+    def _load_segment(self, segment_path: str) -> dict:
+        """
+        Load the index files of the base index or of one segment and handle errors.
+
+        Args:
+            segment_path: The directory holding the index files.
+
+        Returns:
+            A dictionary of the loaded index files.
+        """
         # Define all required files
-        docnos_text = os.path.join(self.store_path, "docnos.txt")
-        inverted_index_file = os.path.join(self.store_path, "inverted_index.bin")
-        index_offsets_file = os.path.join(self.store_path, "index_offsets.bin")
-        lexicon_file = os.path.join(self.store_path, "lexicon.json")
-        doc_lengths_file = os.path.join(self.store_path, "doc_lengths.txt")
-        docs_file = os.path.join(self.store_path, "docs.bin")
-        offsets_file = os.path.join(self.store_path, "offsets.bin")
+        # Indexes built before the binary columns have text files instead
+        docnos_file = os.path.join(segment_path, DOCNOS_FILE)
+        if not os.path.exists(docnos_file) and os.path.exists(os.path.join(segment_path, "docnos.txt")):
+            docnos_file = os.path.join(segment_path, "docnos.txt")
+        inverted_index_file = os.path.join(segment_path, "inverted_index.bin")
+        index_offsets_file = os.path.join(segment_path, "index_offsets.bin")
+        lexicon_file = os.path.join(segment_path, "lexicon.bin")
+        # Indexes built before lexicon.bin have a lexicon.json instead
+        if not os.path.exists(lexicon_file) and os.path.exists(os.path.join(segment_path, "lexicon.json")):
+            lexicon_file = os.path.join(segment_path, "lexicon.json")
+        doc_lengths_file = os.path.join(segment_path, DOC_LENGTHS_FILE)
+        if not os.path.exists(doc_lengths_file) and os.path.exists(os.path.join(segment_path, "doc_lengths.txt")):
+            doc_lengths_file = os.path.join(segment_path, "doc_lengths.txt")
+        docs_file = os.path.join(segment_path, "docs.bin")
+        offsets_file = os.path.join(segment_path, "offsets.bin")
         
         # Check if all required files exist
         missing_files = []
         for file_path, file_name in [
-            (docnos_text, "docnos.txt"),
+            (docnos_file, DOCNOS_FILE),
             (inverted_index_file, "inverted_index.bin"),
             (index_offsets_file, "index_offsets.bin"),
-            (lexicon_file, "lexicon.json"),
-            (doc_lengths_file, "doc_lengths.txt"),
+            (lexicon_file, "lexicon.bin"),
+            (doc_lengths_file, DOC_LENGTHS_FILE),
             (docs_file, "docs.bin"),
             (offsets_file, "offsets.bin")
         ]:
@@ -72,8 +234,11 @@ class SearchEngine:
         
         # Load lexicon
         try:
-            with open(lexicon_file, "r") as f:
-                self.lexicon = json.load(f)
+            if lexicon_file.endswith(".bin"):
+                lexicon = Lexicon(lexicon_file)
+            else:
+                with open(lexicon_file, "r") as f:
+                    lexicon = json.load(f)
         except Exception as e:
             print(f"Error: {e}\nTry Re-creating the store directory or check the lexicon file.")
             sys.exit(1)
@@ -81,41 +246,102 @@ class SearchEngine:
         # Load index offsets
         try:
             with open(index_offsets_file, 'rb') as f:
-                self.index_offsets = array.array('I')
-                self.index_offsets.frombytes(f.read())
+                index_offsets = array.array('I')
+                index_offsets.frombytes(f.read())
         except Exception as e:
             print(f"Error: {e}\nTry Re-creating the store directory or check the index offsets file.")
             sys.exit(1)
         
         # Load docnos
         try:
-            with open(docnos_text, "r") as f:
-                docnos_content = f.read()
-                self.docnos = docnos_content.strip().split('\n')
+            docnos = read_docnos(segment_path)
         except Exception as e:
             print(f"Error: {e}\nTry Re-creating the store directory or check the docnos file.")
             sys.exit(1)
         
         # Load doc lengths
         try:
-            with open(doc_lengths_file, "r") as f:
-                doc_lengths_content = f.read()
-                self.doc_lengths = [int(length) for length in doc_lengths_content.strip().split('\n')]
+            doc_lengths = read_doc_lengths(segment_path)
         except Exception as e:
             print(f"Error: {e}\nTry Re-creating the store directory or check the doc lengths file.")
             sys.exit(1)
         
+        # Map the inverted index
+        try:
+            postings = PostingsReader(inverted_index_file, index_offsets)
+        except Exception as e:
+            print(f"Error: {e}\nTry Re-creating the store directory or check the inverted index file.")
+            sys.exit(1)
+        
+        # Map the impact-ordered postings, which are only written by indexes built with --impacts
+        impacts = None
+        impacts_file = os.path.join(segment_path, IMPACTS_FILE)
+        if os.path.exists(impacts_file):
+            try:
+                impacts = PostingsReader(impacts_file, read_array(os.path.join(segment_path, IMPACT_OFFSETS_FILE), 'I'))
+            except Exception as e:
+                print(f"Error: {e}\nTry Re-creating the store directory or check the impacts file.")
+                sys.exit(1)
+        
+        # Map the term positions, which are only written by indexes built with --positions
+        positions = None
+        positions_file = os.path.join(segment_path, POSITIONS_FILE)
+        if os.path.exists(positions_file):
+            try:
+                positions = PostingsReader(positions_file, read_array(os.path.join(segment_path, POSITION_OFFSETS_FILE), 'I'))
+            except Exception as e:
+                print(f"Error: {e}\nTry Re-creating the store directory or check the positions file.")
+                sys.exit(1)
+        
+        # Load the snippet offsets, which are only written by indexes built with --snippets
+        snippet_offsets = None
+        snippets_file = os.path.join(segment_path, SNIPPETS_FILE)
+        if os.path.exists(snippets_file):
+            try:
+                snippet_offsets = read_array(os.path.join(segment_path, SNIPPET_OFFSETS_FILE), 'I')
+            except Exception as e:
+                print(f"Error: {e}\nTry Re-creating the store directory or check the snippet offsets file.")
+                sys.exit(1)
+        
+        # Load the dates and headlines of results, which are missing from older indexes
+        try:
+            metadata = read_metadata(segment_path)
+        except Exception as e:
+            print(f"Error: {e}\nTry Re-creating the store directory or check the headlines file.")
+            sys.exit(1)
+        
         # Load document offsets
         try:
             with open(offsets_file, 'rb') as f:
-                self.offsets = array.array('I')
-                self.offsets.frombytes(f.read())
+                offsets = array.array('I')
+                offsets.frombytes(f.read())
         except Exception as e:
             print(f"Error: {e}\nTry Re-creating the store directory or check the offsets file.")
             sys.exit(1)
         
+        # Load doc magnitudes, which are only needed for cosine similarity
+        try:
+            doc_magnitudes = read_doc_magnitudes(segment_path)
+        except Exception as e:
+            print(f"Error: {e}\nTry Re-creating the store directory or check the doc magnitudes file.")
+            sys.exit(1)
+        
+        # Load term bounds, which are only needed for pruned BM25 and missing from older indexes
+        try:
+            term_bounds = read_term_bounds(segment_path)
+        except Exception as e:
+            print(f"Error: {e}\nTry Re-creating the store directory or check the term bounds file.")
+            sys.exit(1)
+        
+        # Load collection statistics, which are missing from older indexes
+        try:
+            collection_stats = read_collection_stats(segment_path)
+        except Exception as e:
+            print(f"Error: {e}\nTry Re-creating the store directory or check the collection stats file.")
+            sys.exit(1)
+        
         # Validate loaded data
-        if not self.doc_lengths:
+        if not doc_lengths:
             print(f'''
         Error: No doc lengths found in {doc_lengths_file}.
         
@@ -123,7 +349,7 @@ class SearchEngine:
         ''')
             sys.exit(1)
         
-        if not self.index_offsets:
+        if not index_offsets:
             print(f'''
         Error: No index offsets found in {index_offsets_file}.
         
@@ -131,15 +357,15 @@ class SearchEngine:
         ''')
             sys.exit(1)
         
-        if not self.docnos:
+        if not docnos:
             print(f'''
-        Error: No docnos found in {docnos_text}.
+        Error: No docnos found in {docnos_file}.
         
         Try Re-creating the store directory.
         ''')
             sys.exit(1)
         
-        if not self.lexicon:
+        if not lexicon:
             print(f'''
         Error: Empty lexicon found in {lexicon_file}.
         
@@ -147,49 +373,490 @@ class SearchEngine:
         ''')
             sys.exit(1)
         
-        if not self.offsets:
+        if not offsets:
             print(f'''
         Error: No offsets found in {offsets_file}.
         
         Try Re-creating the store directory.
         ''')
             sys.exit(1)
+
+        # Older indexes have no collection stats, so their lengths are added up once here
+        total_length = collection_stats["total_length"] if collection_stats is not None else sum(doc_lengths)
+
+        return {
+            "store_path": segment_path,
+            "lexicon": lexicon,
+            "index_offsets": index_offsets,
+            "docnos": docnos,
+            "doc_lengths": doc_lengths,
+            "doc_magnitudes": doc_magnitudes,
+            "term_bounds": term_bounds,
+            "total_length": total_length,
+            "average_doc_length": total_length / len(doc_lengths),
+            "offsets": offsets,
+            # Kept open so a merge that removes this segment's directory cannot break a running engine
+            "postings": postings,
+            "impacts": impacts,
+            "positions": positions,
+            "docs_path": docs_file,
+            "snippets_path": snippets_file,
+            "snippet_offsets": snippet_offsets,
+            "metadata": metadata,
+        }
+
+    def get_postings(self, token: str) -> tuple[array.array, array.array] | None:
+        """
+        Gets the postings of a token across the base index and every segment, from the
+        decoded postings cache when the token was read recently.
+
+        Args:
+            token: The token to get postings for.
+
+        Returns:
+            A tuple of (global doc ids, term frequencies) arrays, or None if no document contains the token.
+            The arrays may be shared with the cache, so they must not be modified.
+        """
+        if self.postings_cache is None:
+            return self._read_postings(token)
+
+        postings = self.postings_cache.get(token)
+        if postings is None:
+            postings = self._read_postings(token)
+            if postings is not None:
+                self.postings_cache.put(token, postings)
+
+        return postings
+
+    def warm_postings_cache(self, terms: list[str]) -> None:
+        """
+        Decodes the postings of frequent terms into the cache until its byte budget is full.
+
+        Args:
+            terms: The terms to load, most frequent first. Terms are tokenized like queries.
+        """
+        if self.postings_cache is None:
+            return
+
+        for term in terms:
+            tokens = []
+            self.tokenize_function(term, tokens)
+            for token in tokens:
+                if token in self.postings_cache.entries:
+                    continue
+                postings = self._read_postings(token)
+                if postings is None:
+                    continue
+                # Stop rather than evict the more frequent terms already loaded
+                if self.postings_cache.current_bytes + postings_size(postings) > self.postings_cache.max_bytes:
+                    return
+                self.postings_cache.put(token, postings)
+
+    def _read_postings(self, token: str) -> tuple[array.array, array.array] | None:
+        """
+        Decodes the postings of a token from the base index and every segment.
+        """
+        segment_postings = []
+        for segment in self.segments:
+            token_id = segment["lexicon"].get(token)
+            if token_id is None:
+                continue
+            doc_ids, term_frequencies = decode_postings(segment["postings"].get(token_id))
+            if segment["doc_base"]:
+                doc_ids = array.array('I', [doc_id + segment["doc_base"] for doc_id in doc_ids])
+            segment_postings.append((doc_ids, term_frequencies))
+
+        if len(segment_postings) <= 1:
+            return segment_postings[0] if segment_postings else None
+
+        # Segments hold increasing doc id ranges, so concatenating keeps the postings sorted
+        doc_ids = array.array('I')
+        term_frequencies = array.array('I')
+        for segment_doc_ids, segment_term_frequencies in segment_postings:
+            doc_ids.extend(segment_doc_ids)
+            term_frequencies.extend(array.array('I', segment_term_frequencies))
+
+        return doc_ids, term_frequencies
+
+    def get_impacts(self, token: str) -> list[tuple[int, array.array]] | None:
+        """
+        Gets the quantised BM25 impacts of a token across the base index and every segment.
+
+        Args:
+            token: The token to get impacts for.
+
+        Returns:
+            A list of (impact, global doc ids) groups, or None if no document contains the token.
+        """
+        groups = None
+        for segment in self.segments:
+            token_id = segment["lexicon"].get(token)
+            if token_id is None:
+                continue
+            if groups is None:
+                groups = []
+            for impact, doc_ids in decode_impacts(segment["impacts"].get(token_id)):
+                if segment["doc_base"]:
+                    doc_ids = array.array('I', [doc_id + segment["doc_base"] for doc_id in doc_ids])
+                groups.append((impact, doc_ids))
+
+        return groups
+
+    def get_positions(self, token: str, doc_ids: set[int]) -> dict[int, list[int]]:
+        """
+        Gets the positions of a token in some of the documents containing it, from an index
+        built with --positions.
+
+        Args:
+            token: The token to get positions for.
+            doc_ids: The global doc ids of the documents to get positions in.
+
+        Returns:
+            The sorted positions of the token in each of the documents that contain it.
+        """
+        postings = self.get_postings(token)
+        if postings is None:
+            return {}
+        postings_doc_ids, term_frequencies = postings
+
+        # Find each document's posting, grouped by the segment holding it
+        segment_indexes = {}
+        for doc_id in doc_ids:
+            index = bisect_left(postings_doc_ids, doc_id)
+            if index < len(postings_doc_ids) and postings_doc_ids[index] == doc_id:
+                segment_indexes.setdefault(bisect_right(self.doc_bases, doc_id) - 1, []).append(index)
+
+        # Each segment's positions follow its postings, which are a slice of the global postings
+        positions = {}
+        for segment_number, indexes in segment_indexes.items():
+            segment = self.segments[segment_number]
+            first = bisect_left(postings_doc_ids, segment["doc_base"])
+            indexes.sort()
+            runs = decode_position_runs(segment["positions"].get(segment["lexicon"].get(token)), term_frequencies, first, [index - first for index in indexes])
+            for index, run in zip(indexes, runs):
+                positions[postings_doc_ids[index]] = run
+
+        return positions
+
+    def match_phrases(self, phrases: list[tuple[str, int]]) -> set[int] | None:
+        """
+        Gets the documents matching every phrase and proximity operator of a query.
+
+        Only documents with every term of an operator are checked, and only the
+        position blocks holding them are decoded.
+
+        Args:
+            phrases: The (text, most words between terms) of each operator, from parse_query.
+
+        Returns:
+            The global doc ids of the matching documents, or None if every document can
+            match, because the query has no operators or the index has no positions.
+        """
+        if not phrases:
+            return None
+
+        if not self.has_positions:
+            print(f"Warning: {POSITIONS_FILE} is missing, so phrases are searched as plain words in '{self.store_path}'.\nRe-create the index with --positions.")
+            return None
+
+        matches = None
+        for phrase, gap in phrases:
+            tokens = []
+            self.tokenize_function(phrase, tokens)
+            if not tokens:
+                continue
+
+            postings = {}
+            for token in tokens:
+                if token not in postings:
+                    postings[token] = self.get_postings(token)
+                    if postings[token] is None:
+                        return set()
+
+            # Intersect from the rarest term, so the candidate set only shrinks
+            candidates = matches
+            for doc_ids, _ in sorted(postings.values(), key=lambda token_postings: len(token_postings[0])):
+                candidates = set(doc_ids) if candidates is None else candidates.intersection(doc_ids)
+
+            positions = {token: self.get_positions(token, candidates) for token in postings}
+            matches = {doc_id for doc_id in candidates if match_window([positions[token][doc_id] for token in tokens], gap)}
+            if not matches:
+                return matches
+
+        return matches
+
+    def get_term_bound(self, token: str) -> float:
+        """
+        Gets an upper bound on the BM25 term frequency component, tf / (k + tf), of a token
+        in any document, so the token's BM25 score in any document is at most its idf times this.
+
+        Each segment stores its bound for its own average document length. A larger average
+        can only shrink the component, and a smaller one can grow it by at most the ratio of
+        the averages, so the segment bounds are scaled to hold for the whole index.
+
+        Args:
+            token: The token to get the bound of.
+
+        Returns:
+            The bound, or 1.0 if a segment holding the token has no term bounds.
+        """
+        bound = 0.0
+        for segment in self.segments:
+            token_id = segment["lexicon"].get(token)
+            if token_id is None:
+                continue
+            if segment["term_bounds"] is None:
+                return 1.0
+            scale = max(1.0, self.average_doc_length / segment["average_doc_length"])
+            bound = max(bound, min(1.0, segment["term_bounds"][token_id] * scale))
+
+        return bound
+
+    def get_doc(self, docno: str) -> str:
+        """
+        Gets a document from the doc store of the base index or segment holding it.
+
+        Args:
+            docno: The DOCNO of the document to get.
+
+        Returns:
+            The document content.
+        """
+        document = self.doc_store.get_by_docno(docno)
+        if document is None:
+            print(f"Error: DOCNO '{docno}' does not exist.")
+            return ""
+
+        return document
     
-    def search(self, query: str, method: str = "BM25"):
+    def close(self) -> None:
+        """
+        Unmaps and closes the files of the base index and every segment.
+        """
+        self._close_index_files()
+        if self.postings_cache is not None:
+            self.postings_cache.clear()
+        if self.result_cache is not None:
+            self.result_cache.clear()
+        if self.summary_executor is not None:
+            self.summary_executor.shutdown()
+            self.summary_executor = None
+
+    def _close_index_files(self) -> None:
+        """
+        Unmaps and closes the index files and stores of the base index and every segment.
+        """
+        for segment in self.segments:
+            segment["postings"].close()
+            if segment["impacts"] is not None:
+                segment["impacts"].close()
+            if segment["positions"] is not None:
+                segment["positions"].close()
+            if isinstance(segment["lexicon"], Lexicon):
+                segment["lexicon"].close()
+        self.segments = []
+        self.doc_store.close()
+        if self.snippet_store is not None:
+            self.snippet_store.close()
+
+    def __enter__(self) -> "SearchEngine":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def search(self, query: str, method: str = "BM25", k: int = 1000, pruning: bool = False, impacts: bool = False, impact_budget: int | None = None, summaries: int = SUMMARY_RESULTS):
         """
         Search the index using the specified retrieval method.
         
         Args:
-            query: The query string to search for.
+            query: The query string to search for. On an index built with --positions, "quoted words" only match
+                documents with the words next to each other and "quoted words"~N with at most N words between them.
             method: The retrieval method to use (default: "BM25").
+            k: The number of results to return (default: 1000).
+            pruning: Whether BM25 skips documents that cannot reach the top k (default: False). The results are the same either way.
+            impacts: Whether BM25 ranks by the quantised impacts of an index built with --impacts (default: False).
+            impact_budget: The number of impact postings after which impact ranking stops early (default: None, to process them all).
+            summaries: The number of top BM25 results given a date, headline and summary (default: 10). With 0, results
+                are only docnos and ranks, and pages can be summarised later with summarize.
             
         Returns:
             A list of search results.
         """
+        if k < 1:
+            print(f"Error: The number of results must be a positive integer, got {k}")
+            sys.exit(1)
+
+        # Results are computed from the index as it is now, not as it was loaded
+        self._check_index()
+
+        if impacts and not self.has_impacts:
+            print(f"Error: {IMPACTS_FILE} is missing, so impact-ordered search is unavailable for '{self.store_path}'.\nRe-create the index with --impacts.")
+            sys.exit(1)
+
+        if self.result_cache is None:
+            return self._run_search(query, method, k, pruning, impacts, impact_budget, summaries)
+
+        # Queries with the same tokens in any order share results, which pruning does not change
+        query_text, phrases = parse_query(query)
+        tokens = []
+        self.tokenize_function(query_text, tokens)
+        key = (method, tuple(sorted(tokens)), tuple(phrases), k, impacts, impact_budget, summaries)
+        self.result_cache.validate(self.fingerprint)
+        results = self.result_cache.get(key)
+        if results is None:
+            results = self._run_search(query, method, k, pruning, impacts, impact_budget, summaries)
+            self.result_cache.put(key, [dict(result) for result in results])
+            return results
+
+        return [dict(result) for result in results]
+
+    def _run_search(self, query: str, method: str, k: int, pruning: bool, impacts: bool, impact_budget: int | None, summaries: int):
+        """
+        Runs a query with the specified retrieval method, without the result cache.
+        """
+        if pruning and impacts:
+            print("Error: Pruning and impact-ordered search cannot be combined")
+            sys.exit(1)
+
         if method == "BM25":
-            return bm25_search(
-                query=query,
-                store_path=self.store_path,
-                lexicon=self.lexicon,
-                index_offsets=self.index_offsets,
-                docnos=self.docnos,
-                doc_lengths=self.doc_lengths,
-                offsets=self.offsets
-            )
+            return bm25_search(query=query, engine=self, k=k, pruning=pruning, impacts=impacts, impact_budget=impact_budget, summaries=summaries)
         elif method == "New_BM25":
-            return new_bm25_search(
-                query=query,
-                store_path=self.store_path,
-                lexicon=self.lexicon,
-                index_offsets=self.index_offsets,
-                docnos=self.docnos,
-                doc_lengths=self.doc_lengths,
-                offsets=self.offsets
-            )
+            return new_bm25_search(query=query, engine=self, k=k, pruning=pruning, impacts=impacts, impact_budget=impact_budget, summaries=summaries)
+        elif pruning or impacts:
+            print(f"Error: Pruning and impact-ordered search are only supported for the BM25 retrieval methods, not '{method}'")
+            sys.exit(1)
+        elif method == "cosine":
+            if self.doc_magnitudes is None:
+                print(f"Error: doc_magnitudes.bin is missing, so cosine similarity is unavailable for '{self.store_path}'")
+                sys.exit(1)
+            return cosine_search(query=query, engine=self, k=k)
         else:
             print(f"Error: Unknown retrieval method '{method}'")
             sys.exit(1)
 
+    def summarize(self, query: str, results: list[dict], method: str = "BM25", workers: int | None = None) -> list[dict]:
+        """
+        Adds the date, headline and query-biased summary to search results, such as the
+        page about to be shown of results searched with summaries=0.
+
+        Args:
+            query: The query the results were searched for.
+            results: The results to summarise, which are updated in place.
+            method: The BM25 retrieval method whose summaries to build (default: "BM25").
+            workers: The number of processes building the summaries (default: None, to build them in this process).
+
+        Returns:
+            The results.
+        """
+        if method not in SUMMARIZERS:
+            print(f"Error: Summaries are only built for the BM25 retrieval methods, not '{method}'")
+            sys.exit(1)
+
+        tokens = []
+        self.tokenize_function(parse_query(query)[0], tokens)
+
+        doc_ids = []
+        for result in results:
+            doc_id = self.doc_store.doc_id(result["docno"])
+            if doc_id is None:
+                print(f"Error: DOCNO '{result['docno']}' does not exist.")
+                sys.exit(1)
+            doc_ids.append(doc_id)
+
+        # The pool is kept for the next page, unless a different number of workers is asked for
+        executor = None
+        if workers:
+            if self.summary_executor is None or self.summary_workers != workers:
+                if self.summary_executor is not None:
+                    self.summary_executor.shutdown()
+                self.summary_executor = ProcessPoolExecutor(max_workers=workers)
+                self.summary_workers = workers
+            executor = self.summary_executor
+
+        # Each worker is sent its share of the results at once
+        chunksize = -(-len(results) // workers) if workers else 1
+        for result, summary in zip(results, summarize_results(self, doc_ids, tokens, method, executor, chunksize)):
+            result.update(summary)
+
+        return results
+
+    def search_batch(self, queries: list[tuple[str, str]], method: str = "BM25", k: int = 1000, workers: int | None = None, run_file: str | None = None, run_tag: str | None = None) -> list[list[dict]]:
+        """
+        Search the index for a batch of queries, such as the topics of a TREC run.
+
+        The postings of each distinct query term are read once for the whole batch, then
+        the queries are ranked, in a pool of worker processes if workers is given. Results
+        are ranked the same as by search, without summaries, and phrase and proximity
+        operators restrict a query to their matching documents the same way.
+
+        Args:
+            queries: The (topic id, query) pairs to search for.
+            method: The retrieval method to use, "BM25", "New_BM25" or "cosine" (default: "BM25").
+            k: The number of results to return for each query (default: 1000).
+            workers: The number of processes ranking queries (default: None, to rank them in this process).
+            run_file: A path to write the results to as a TREC run file (default: None, to not write one).
+            run_tag: The run name written in the run file (default: a name for the retrieval method).
+
+        Returns:
+            The results of each query, in order, with the docno, rank and score of each document.
+        """
+        if k < 1:
+            print(f"Error: The number of results must be a positive integer, got {k}")
+            sys.exit(1)
+
+        if method not in RUN_TAGS:
+            print(f"Error: Unknown retrieval method '{method}'")
+            sys.exit(1)
+
+        self._check_index()
+
+        if method == "cosine" and self.doc_magnitudes is None:
+            print(f"Error: doc_magnitudes.bin is missing, so cosine similarity is unavailable for '{self.store_path}'")
+            sys.exit(1)
+
+        query_tokens = []
+        query_matches = []
+        for _, query in queries:
+            query_text, phrases = parse_query(query)
+            tokens = []
+            self.tokenize_function(query_text, tokens)
+            query_tokens.append(tokens)
+            query_matches.append(self.match_phrases(phrases))
+
+        # Read each distinct term's postings once for the whole batch
+        postings = {}
+        for tokens in query_tokens:
+            for token in tokens:
+                if token not in postings:
+                    postings[token] = self.get_postings(token)
+
+        batch = {
+            "method": method,
+            "k": k,
+            "postings": {token: token_postings for token, token_postings in postings.items() if token_postings is not None},
+            "doc_lengths": self.doc_lengths,
+            "doc_magnitudes": self.doc_magnitudes,
+            "average_doc_length": self.average_doc_length,
+            "scorer": self.scorer,
+        }
+
+        if workers:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_batch_worker, initargs=(batch,)) as executor:
+                rankings = list(executor.map(rank_in_worker, query_tokens, query_matches, chunksize=max(1, len(query_tokens) // (workers * 4))))
+        else:
+            rankings = [rank_batch_query(tokens, batch, matches) for tokens, matches in zip(query_tokens, query_matches)]
+
+        topic_results = [
+            [{"docno": self.docnos[doc_id], "rank": i + 1, "score": score} for i, (doc_id, score) in enumerate(ranking)]
+            for ranking in rankings
+        ]
+
+        if run_file is not None:
+            write_run(run_file, [topic_id for topic_id, _ in queries], topic_results, run_tag or RUN_TAGS[method])
+
+        return topic_results
+
 
 if __name__ == "__main__":
     engine = SearchEngine("/Users/coledumanski/Documents/Workspace/MSE 543/mse-541-f25-hw5-cole-zoom/index")
@@ -2,7 +2,20 @@ import sys
 import os
 import SearchEngine
 import time
-from RetrievalMethods.utils.GetDoc import get_doc
+
+# Results shown at a time, and the most results kept for a query
+RESULTS_PER_PAGE = 10
+MAX_RESULTS = 100
+
+
+def print_page(engine, query: str, results: list[dict], page_start: int, search_method: str) -> None:
+    """
+    Summarises and prints one page of results.
+    """
+    page = engine.summarize(query, results[page_start:page_start + RESULTS_PER_PAGE], search_method)
+    for result in page:
+        print(f"{result['rank']}. {result['headline']} ({result['date']})\n{result['biased_query']} ({result['docno']})")
+        print("\n")
 
 def main():
     if len(sys.argv) != 2:
@@ -58,8 +71,9 @@ def main():
     while True:
         query = input("\nEnter a query: ")
 
+        # Results are ranked without summaries, each page is summarised as it is shown
         start_time = time.perf_counter()
-        results = engine.search(query, search_method)
+        results = engine.search(query, search_method, k=MAX_RESULTS, summaries=0)
         end_time = time.perf_counter()
         
         # Check if there are any results
@@ -67,18 +81,23 @@ def main():
             print("No results found for your query.\n")
             continue
         
-        for result in results[:10]:
-            print(f"{result['rank']}. {result['headline']} ({result['date']})\n{result['biased_query']} ({result['docno']})")
-            print("\n")
+        page_start = 0
+        print_page(engine, query, results, page_start, search_method)
 
         print(f"\nFound results in: {end_time - start_time:.4f} seconds\n")
         # View Document Loop
         while True:
-            print("Type a valid rank to view the full document, type 'n' to continue searching, or type 'q' to quit.")
+            print("Type a valid rank to view the full document, type 'm' for more results, type 'n' to continue searching, or type 'q' to quit.")
             rank = input("Enter a rank: ")
             print("\n")
             if rank == "n":
                 break
+            elif rank == "m":
+                if page_start + RESULTS_PER_PAGE >= len(results):
+                    print("No more results.\n")
+                else:
+                    page_start += RESULTS_PER_PAGE
+                    print_page(engine, query, results, page_start, search_method)
             elif rank == "q":
                 sys.exit(0)
             elif rank.isdigit():
@@ -90,7 +109,7 @@ def main():
                     print(f"Invalid rank. Please enter a valid rank between 1 and {len(results)}.\n")
                 else:
                     try:
-                        doc_content = get_doc(engine.store_path, results[rank_num-1]['docno'], engine.docnos, engine.offsets)
+                        doc_content = engine.get_doc(results[rank_num-1]['docno'])
                         print(doc_content)
                     except Exception as e:
                         print(f"Error retrieving document: {e}\n")
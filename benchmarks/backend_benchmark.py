@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'SearchEngine')))
+from SearchEngine import SearchEngine
+from RetrievalMethods.utils.score_utils import rank_bm25, rank_cosine
+from RetrievalMethods.utils.vector_utils import np, VectorScorer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pruning_benchmark import sample_queries
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/backend_benchmark.py <index_path> [num_queries] [query_length]")
+        sys.exit(1)
+
+    if np is None:
+        print("Error: This benchmark needs NumPy.\nInstall it with 'pip install numpy'.")
+        sys.exit(1)
+
+    engine = SearchEngine(sys.argv[1])
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    query_length = int(sys.argv[3]) if len(sys.argv) > 3 else 15
+    print(f"Index: {len(engine.doc_lengths)} documents, {len(engine.segments)} segment(s)")
+    print(f"Queries: {num_queries} sampled queries of {query_length} terms")
+
+    # Postings are fetched up front so only scoring is timed
+    queries = []
+    for tokens in sample_queries(engine, num_queries, query_length):
+        queries.append([engine.get_postings(token) for token in tokens if engine.get_postings(token) is not None])
+
+    start = time.perf_counter()
+    scorer = VectorScorer(engine.doc_lengths, engine.doc_magnitudes, engine.average_doc_length)
+    print(f"NumPy columns loaded in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    rankings = [("BM25", lambda query_postings, k: rank_bm25(query_postings, engine.doc_lengths, engine.average_doc_length, k), scorer.bm25_top_k)]
+    if engine.doc_magnitudes is not None:
+        rankings.append(("cosine", lambda query_postings, k: rank_cosine(query_postings, engine.doc_magnitudes, k), scorer.cosine_top_k))
+
+    for name, python_top_k, numpy_top_k in rankings:
+        for k in (1000, 10):
+            python_time = 0.0
+            numpy_time = 0.0
+            mismatches = 0
+            for query_postings in queries:
+                start = time.perf_counter()
+                expected = python_top_k(query_postings, k)
+                python_time += time.perf_counter() - start
+
+                start = time.perf_counter()
+                actual = numpy_top_k(query_postings, k)
+                numpy_time += time.perf_counter() - start
+
+                if actual != expected:
+                    mismatches += 1
+
+            print(f"\n{name}, top {k}:")
+            print(f"  python {python_time / len(queries) * 1000:8.2f} ms/query")
+            print(f"  numpy  {numpy_time / len(queries) * 1000:8.2f} ms/query  {python_time / numpy_time:5.2f}x")
+            if mismatches:
+                print(f"  Error: {mismatches} queries ranked differently")
+                sys.exit(1)
+            print("  Rankings and scores are identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'SearchEngine')))
+from SearchEngine import SearchEngine
+from RetrievalMethods.utils.score_utils import rank_bm25, rank_cosine
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pruning_benchmark import sample_queries
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/batch_benchmark.py <index_path> [num_queries] [query_length] [workers] [backend]")
+        sys.exit(1)
+
+    backend = sys.argv[5] if len(sys.argv) > 5 else "python"
+    # Without a postings cache every query reads its postings again, as a loop over topics did
+    engine = SearchEngine(sys.argv[1], postings_cache_bytes=0, backend=backend)
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    query_length = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else os.cpu_count()
+    print(f"Index: {len(engine.doc_lengths)} documents, {len(engine.segments)} segment(s)")
+    print(f"Queries: {num_queries} sampled queries of {query_length} terms, {workers} workers, {backend} backend")
+
+    queries = [(str(i), " ".join(tokens)) for i, tokens in enumerate(sample_queries(engine, num_queries, query_length))]
+
+    if engine.scorer is not None:
+        methods = [("BM25", lambda query_postings: engine.scorer.bm25_top_k(query_postings, 1000))]
+        if engine.doc_magnitudes is not None:
+            methods.append(("cosine", lambda query_postings: engine.scorer.cosine_top_k(query_postings, 1000)))
+    else:
+        methods = [("BM25", lambda query_postings: rank_bm25(query_postings, engine.doc_lengths, engine.average_doc_length, 1000))]
+        if engine.doc_magnitudes is not None:
+            methods.append(("cosine", lambda query_postings: rank_cosine(query_postings, engine.doc_magnitudes, 1000)))
+
+    for method, rank in methods:
+        start = time.perf_counter()
+        expected = []
+        for _, query in queries:
+            tokens = []
+            engine.tokenize_function(query, tokens)
+            query_postings = [postings for postings in map(engine.get_postings, tokens) if postings is not None]
+            expected.append([engine.docnos[doc_id] for doc_id, _ in rank(query_postings)] if query_postings else [])
+        loop_time = time.perf_counter() - start
+
+        print(f"\n{method}, top 1000:")
+        print(f"  one query at a time  {loop_time:8.3f} s")
+        for label, batch_workers in [("batch", None), (f"batch, {workers} workers", workers)]:
+            start = time.perf_counter()
+            topic_results = engine.search_batch(queries, method, k=1000, workers=batch_workers)
+            batch_time = time.perf_counter() - start
+
+            print(f"  {label:<20} {batch_time:8.3f} s  {loop_time / batch_time:5.2f}x")
+            if [[result["docno"] for result in results] for results in topic_results] != expected:
+                print("  Error: The batch ranked queries differently")
+                sys.exit(1)
+        print("  Rankings are identical")
+
+if __name__ == "__main__":
+    main()
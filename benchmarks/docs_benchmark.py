@@ -0,0 +1,61 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'IndexEngine')))
+from utils.docs_utils import DOCS_DICTIONARY_FILE, DocsWriter, read_documents
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'SearchEngine')))
+from RetrievalMethods.utils.column_utils import read_docnos
+from RetrievalMethods.utils.docstore_utils import DocStore
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/docs_benchmark.py <index_path> [num_lookups]")
+        sys.exit(1)
+
+    store_path = sys.argv[1]
+    num_lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    documents = list(read_documents(store_path))
+    docnos = read_docnos(store_path)
+    raw_bytes = sum(len(document.encode('utf-8')) for document in documents)
+    print(f"Index: {len(documents)} documents, {raw_bytes / 1024 / 1024:.1f} MB uncompressed")
+
+    # Random documents, as opened from search results, read without the document cache
+    rng = random.Random(0)
+    lookups = [rng.randrange(len(documents)) for _ in range(num_lookups)]
+
+    print(f"\n{'docs.bin':<10} {'size':>10} {'ratio':>7} {'bytes/doc':>10} {'write':>9} {'get':>12}")
+    with tempfile.TemporaryDirectory() as temp_path:
+        timings = {}
+        for version, dictionary in [("v1", False), ("v2", True)]:
+            version_path = os.path.join(temp_path, version)
+            os.makedirs(version_path)
+            start = time.perf_counter()
+            docs_writer = DocsWriter(os.path.join(version_path, "docs.bin"), dictionary_path=os.path.join(version_path, DOCS_DICTIONARY_FILE) if dictionary else None)
+            for document in documents:
+                docs_writer.add(document)
+            offsets = docs_writer.close()
+            write_time = time.perf_counter() - start
+
+            doc_store = DocStore([os.path.join(version_path, "docs.bin")], [offsets], docnos, cache_entries=0)
+            start = time.perf_counter()
+            for doc_id in lookups:
+                doc_store.get(doc_id)
+            timings[version] = (time.perf_counter() - start) / num_lookups
+            if doc_store.get_many(list(range(len(documents)))) != documents:
+                print(f"Error: docs.bin {version} read different documents")
+                sys.exit(1)
+            doc_store.close()
+
+            size = sum(os.path.getsize(os.path.join(version_path, file_name)) for file_name in os.listdir(version_path))
+            print(f"{version:<10} {size / 1024 / 1024:7.2f} MB {raw_bytes / size:6.2f}x {size / len(documents):10.0f} {write_time:7.2f} s {timings[version] * 1e6:8.1f} us/doc")
+
+    print(f"\nSizes include docs_dictionary.bin. get is {timings['v2'] / timings['v1']:.2f}x the v1 time per document.")
+    print("Documents are identical")
+
+if __name__ == "__main__":
+    main()
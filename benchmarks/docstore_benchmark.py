@@ -0,0 +1,74 @@
+import array
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'SearchEngine')))
+from RetrievalMethods.utils.column_utils import read_docnos
+from RetrievalMethods.utils.docstore_utils import DocStore, decompress_document, read_dictionary
+
+
+def read_doc_by_scan(store_path: str, docno: str, docnos: list, offsets, dictionary: bytes | None) -> str:
+    """
+    Reads a document the way get_doc did before the doc store: a linear search of the
+    docnos, then a fresh open and seek of docs.bin.
+    """
+    doc_index = docnos.index(docno)
+    with open(os.path.join(store_path, "docs.bin"), "rb") as f:
+        f.seek(offsets[doc_index])
+        return decompress_document(f.read(offsets[doc_index + 1] - offsets[doc_index]), dictionary)
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/docstore_benchmark.py <index_path> [num_pages]")
+        sys.exit(1)
+
+    store_path = sys.argv[1]
+    num_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    docnos = list(read_docnos(store_path))
+    offsets = array.array('I')
+    with open(os.path.join(store_path, "offsets.bin"), "rb") as f:
+        offsets.frombytes(f.read())
+    dictionary = read_dictionary(store_path)
+    print(f"Index: {len(docnos)} documents")
+
+    # Pages of 10 results, as a search shows, drawn from a small pool so pages share documents
+    rng = random.Random(0)
+    pool = rng.sample(range(len(docnos)), min(len(docnos), num_pages * 3))
+    pages = [rng.sample(pool, min(len(pool), 10)) for _ in range(num_pages)]
+
+    start = time.perf_counter()
+    expected = [[read_doc_by_scan(store_path, docnos[doc_id], docnos, offsets, dictionary) for doc_id in page] for page in pages]
+    scan_time = time.perf_counter() - start
+
+    for label, cache_entries in [("DocStore, no cache", 0), ("DocStore, cached", 64)]:
+        doc_store = DocStore([os.path.join(store_path, "docs.bin")], [offsets], docnos, cache_entries)
+        start = time.perf_counter()
+        documents = [[doc_store.get_by_docno(docnos[doc_id]) for doc_id in page] for page in pages]
+        docno_time = time.perf_counter() - start
+        start = time.perf_counter()
+        batches = [doc_store.get_many(page) for page in pages]
+        batch_time = time.perf_counter() - start
+        # A results page is read for its summaries, then the user opens a few of its results
+        start = time.perf_counter()
+        opened = []
+        for page in pages:
+            doc_store.get_many(page)
+            opened.append([doc_store.get_by_docno(docnos[doc_id]) for doc_id in page[:3]])
+        open_time = time.perf_counter() - start
+        doc_store.close()
+
+        if documents != expected or batches != expected or opened != [page[:3] for page in expected]:
+            print(f"Error: {label} read different documents")
+            sys.exit(1)
+        print(f"\n{label}:")
+        print(f"  by docno  {docno_time * 1000 / num_pages:8.3f} ms/page  {scan_time / docno_time:7.1f}x")
+        print(f"  get_many  {batch_time * 1000 / num_pages:8.3f} ms/page  {scan_time / batch_time:7.1f}x")
+        print(f"  get_many, then open 3 by docno  {open_time * 1000 / num_pages:8.3f} ms/page")
+
+    print(f"\nLinear docno search and reopen: {scan_time * 1000 / num_pages:8.3f} ms/page")
+    print("Documents are identical")
+
+if __name__ == "__main__":
+    main()
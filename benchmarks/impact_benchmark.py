@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'SearchEngine')))
+from SearchEngine import SearchEngine
+from RetrievalMethods.utils.impact_utils import impact_top_k
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pruning_benchmark import exhaustive_top_k, sample_queries
+
+
+def overlap(expected: list[tuple[int, float]], actual: list[tuple[int, float]], depth: int) -> float:
+    """
+    Gets the fraction of the exact top documents to a depth that a ranking also returns to that depth.
+    """
+    expected_doc_ids = {doc_id for doc_id, _ in expected[:depth]}
+    if not expected_doc_ids:
+        return 1.0
+
+    return len(expected_doc_ids & {doc_id for doc_id, _ in actual[:depth]}) / len(expected_doc_ids)
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/impact_benchmark.py <index_path> [num_queries] [query_length]")
+        sys.exit(1)
+
+    engine = SearchEngine(sys.argv[1])
+    if not engine.has_impacts:
+        print(f"Error: '{sys.argv[1]}' has no impacts. Re-create the index with --impacts.")
+        sys.exit(1)
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    query_length = int(sys.argv[3]) if len(sys.argv) > 3 else 15
+    num_docs = len(engine.doc_lengths)
+    k = 1000
+    print(f"Index: {num_docs} documents, {len(engine.segments)} segment(s)")
+    print(f"Queries: {num_queries} sampled queries of {query_length} terms")
+
+    # Postings and impacts are fetched up front so only ranking is timed
+    queries = []
+    for tokens in sample_queries(engine, num_queries, query_length):
+        query_tokens = [token for token in tokens if engine.get_postings(token) is not None]
+        queries.append((
+            [engine.get_postings(token) for token in query_tokens],
+            [engine.get_impacts(token) for token in query_tokens],
+        ))
+
+    exact_time = 0.0
+    exact_rankings = []
+    for query_postings, _ in queries:
+        start = time.perf_counter()
+        exact_rankings.append(exhaustive_top_k(query_postings, engine.doc_lengths, k))
+        exact_time += time.perf_counter() - start
+
+    print(f"\n  {'ranking':<24} {'ms/query':>9} {'overlap@10':>11} {'overlap@100':>12} {'overlap@1000':>13}")
+    print(f"  {'exact BM25':<24} {exact_time / len(queries) * 1000:9.2f} {1:11.3f} {1:12.3f} {1:13.3f}")
+    for label, budget in [("impacts", None), ("impacts, 10% budget", num_docs // 10), ("impacts, 1% budget", num_docs // 100)]:
+        impact_time = 0.0
+        overlaps = [0.0, 0.0, 0.0]
+        for (_, query_impacts), expected in zip(queries, exact_rankings):
+            start = time.perf_counter()
+            actual = impact_top_k(query_impacts, k, budget)
+            impact_time += time.perf_counter() - start
+            for i, depth in enumerate((10, 100, 1000)):
+                overlaps[i] += overlap(expected, actual, depth)
+
+        print(f"  {label:<24} {impact_time / len(queries) * 1000:9.2f} {overlaps[0] / len(queries):11.3f} {overlaps[1] / len(queries):12.3f} {overlaps[2] / len(queries):13.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'SearchEngine')))
+from SearchEngine import SearchEngine
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pruning_benchmark import sample_queries
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/metadata_benchmark.py <index_path> [BM25|New_BM25] [num_queries] [query_length] [results]")
+        sys.exit(1)
+
+    engine = SearchEngine(sys.argv[1], result_cache_entries=0, doc_cache_entries=0)
+    if engine.metadata is None:
+        print("Error: The index has no dates.bin and headlines.bin, re-create it to write them")
+        sys.exit(1)
+
+    method = sys.argv[2] if len(sys.argv) > 2 else "BM25"
+    num_queries = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    query_length = int(sys.argv[4]) if len(sys.argv) > 4 else 3
+    results = int(sys.argv[5]) if len(sys.argv) > 5 else 10
+    print(f"Index: {len(engine.doc_lengths)} documents, {len(engine.segments)} segment(s), {'stored' if engine.snippet_store is not None else 'parsed'} sentences")
+    print(f"Queries: {num_queries} sampled queries of {query_length} terms, {method}, pages of {results}")
+
+    queries = [" ".join(tokens) for tokens in sample_queries(engine, num_queries, query_length)]
+    hits = [engine.search(query, method, k=results, summaries=0) for query in queries]
+
+    # Count the documents each way decompresses
+    get_many = engine.doc_store.get_many
+    decompressed = []
+    def counted_get_many(doc_ids):
+        decompressed.append(len(doc_ids))
+        return get_many(doc_ids)
+    engine.doc_store.get_many = counted_get_many
+
+    metadata = engine.metadata
+    # Warm up the summary functions and tokenizer caches outside the timing
+    engine.summarize(queries[0], [dict(hit) for hit in hits[0]], method)
+    pages = {}
+    print(f"\nsummarize, per page:")
+    for label, store in [("metadata columns", metadata), ("parsing documents", None)]:
+        engine.metadata = store
+        decompressed.clear()
+        start = time.perf_counter()
+        pages[label] = [engine.summarize(query, [dict(hit) for hit in query_hits], method) for query, query_hits in zip(queries, hits)]
+        timing = time.perf_counter() - start
+        print(f"  {label:<20} {timing * 1000 / num_queries:8.3f} ms/page, {sum(decompressed) / num_queries:5.1f} documents decompressed/page")
+    engine.metadata = metadata
+
+    if pages["metadata columns"] != pages["parsing documents"]:
+        print("Error: The metadata columns gave different results")
+        sys.exit(1)
+    print("Results are identical")
+
+    # Dates and headlines alone, as a results page without summaries would show them
+    doc_ids = [[engine.doc_store.doc_id(hit["docno"]) for hit in query_hits] for query_hits in hits]
+    print(f"\ndate and headline, per page:")
+    start = time.perf_counter()
+    for page_ids in doc_ids:
+        metadata.get_many(page_ids)
+    print(f"  {'metadata columns':<20} {(time.perf_counter() - start) * 1000 / num_queries:8.3f} ms/page")
+    start = time.perf_counter()
+    for page_ids in doc_ids:
+        for document in get_many(page_ids):
+            for line in document.split("\n"):
+                if "date:" in line:
+                    line.split("date:")[1].strip()
+                elif "headline:" in line:
+                    line.split("headline:")[1].strip()
+    print(f"  {'parsing documents':<20} {(time.perf_counter() - start) * 1000 / num_queries:8.3f} ms/page")
+    engine.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'IndexEngine')))
+from utils.date_utils import convert_month_to_letter
+from utils.tokenize_utils import count_tokens, tokenize
+from utils.parse_utils import parse_documents, TREC_SCHEMA
+
+
+def legacy_parse_documents(lines, tokenize_function=tokenize):
+    """
+    The per-tag if/elif cascade the index engines used before the table-driven parser.
+    """
+    document = []
+    is_headline = False
+    is_text = False
+    is_graphic = False
+    for line in lines:
+        if "<DOC>" in line:
+            document = []
+            document.append(line)
+            headline = ""
+            term_counts = {}
+            doc_length = 0
+        elif "</DOC>" in line:
+            document.append(line)
+            yield DOCNO, date, headline, "".join(document), term_counts, doc_length
+        elif "<DOCNO>" in line:
+            DOCNO = line.replace('<DOCNO>', '').replace('</DOCNO>', '').strip()
+            date = f"{convert_month_to_letter(DOCNO[2:4])} {DOCNO[4:6]}, 19{DOCNO[6:8]}"
+            document.append(line)
+        elif "<HEADLINE>" in line:
+            if "</HEADLINE>" in line:
+                document.append(line)
+                headline = line.replace('<HEADLINE>', '').replace('</HEADLINE>', '').strip()
+                words = []
+                tokenize_function(headline, words)
+                doc_length += len(words)
+                count_tokens(words, term_counts)
+                continue
+            is_headline = True
+            document.append(line)
+        elif "</HEADLINE>" in line:
+            is_headline = False
+            document.append(line)
+        elif is_headline:
+            if line and not "<" in line:
+                headline += f"{line.strip()} "
+                text = line.strip()
+                words = []
+                tokenize_function(text, words)
+                doc_length += len(words)
+                count_tokens(words, term_counts)
+            document.append(line)
+        elif "<TEXT>" in line:
+            if "</TEXT>" in line:
+                document.append(line)
+                text = line.replace('<TEXT>', '').replace('</TEXT>', '').strip()
+                words = []
+                tokenize_function(text, words)
+                doc_length += len(words)
+                count_tokens(words, term_counts)
+                continue
+            is_text = True
+            document.append(line)
+        elif "</TEXT>" in line:
+            is_text = False
+            document.append(line)
+        elif is_text:
+            if line and not "<" in line:
+                text = line.strip()
+                words = []
+                tokenize_function(text, words)
+                doc_length += len(words)
+                count_tokens(words, term_counts)
+            document.append(line)
+        elif "<GRAPHIC>" in line:
+            if "</GRAPHIC>" in line:
+                document.append(line)
+                graphic = line.replace('<GRAPHIC>', '').replace('</GRAPHIC>', '').strip()
+                words = []
+                tokenize_function(graphic, words)
+                doc_length += len(words)
+                count_tokens(words, term_counts)
+                continue
+            is_graphic = True
+            document.append(line)
+        elif "</GRAPHIC>" in line:
+            is_graphic = False
+            document.append(line)
+        elif is_graphic:
+            if line and not "<" in line:
+                graphic = line.strip()
+                words = []
+                tokenize_function(graphic, words)
+                doc_length += len(words)
+                count_tokens(words, term_counts)
+            document.append(line)
+        else:
+            document.append(line)
+
+def generate_corpus(num_documents: int, seed: int = 543) -> list[str]:
+    """
+    Generates the lines of a synthetic LA Times style TREC corpus.
+    """
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 10))) for _ in range(20000)]
+
+    def sentence():
+        return " ".join(rng.choice(vocabulary) for _ in range(rng.randint(5, 25))).capitalize() + ". "
+
+    lines = []
+    for i in range(num_documents):
+        lines.append("<DOC>\n")
+        lines.append(f"<DOCNO> LA{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}89-{i:04d} </DOCNO>\n")
+        lines.append(f"<DOCID> {i} </DOCID>\n")
+        lines.append("<DATE>\n<P>\nJanuary 1, 1989, Sunday, Home Edition\n</P>\n</DATE>\n")
+        lines.append("<SECTION>\n<P>\nMetro; Part 2; Page 1; Column 1\n</P>\n</SECTION>\n")
+        lines.append("<HEADLINE>\n<P>\n" + sentence() + "\n</P>\n</HEADLINE>\n")
+        lines.append("<TEXT>\n")
+        for _ in range(rng.randint(3, 12)):
+            lines.append("<P>\n")
+            lines.append("".join(sentence() for _ in range(rng.randint(1, 4))) + "\n")
+            lines.append("</P>\n")
+        lines.append("</TEXT>\n")
+        if rng.random() < 0.3:
+            lines.append("<GRAPHIC>\n<P>\n" + sentence() + "\n</P>\n</GRAPHIC>\n")
+        lines.append("</DOC>\n")
+
+    # Lines produced by joining lists are split back into one string per line
+    return "".join(lines).splitlines(keepends=True)
+
+def no_tokenize(text: str, tokens: list[str]) -> None:
+    """
+    Skips tokenization so only tag dispatch is measured.
+    """
+
+def measure(parse, lines: list[str], tokenize_function, repeats: int) -> tuple[float, list]:
+    """
+    Gets the best wall time of a parser over the corpus lines and its output.
+    """
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        parsed = list(parse(lines, tokenize_function))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, parsed
+
+def main():
+    num_documents = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeats = 3
+
+    lines = generate_corpus(num_documents)
+    megabytes = sum(len(line.encode('utf-8')) for line in lines) / (1024 * 1024)
+    print(f"Synthetic corpus: {num_documents} documents, {len(lines)} lines, {megabytes:.1f} MB")
+
+    parsers = [
+        ("cascade", lambda lines, tokenize_function: legacy_parse_documents(lines, tokenize_function)),
+        ("table-driven", lambda lines, tokenize_function: parse_documents(lines, TREC_SCHEMA, tokenize_function)),
+    ]
+    for label, tokenize_function in [("tag dispatch only", no_tokenize), ("with tokenization", tokenize)]:
+        print(f"\n{label}:")
+        outputs = []
+        for name, parse in parsers:
+            elapsed, parsed = measure(parse, lines, tokenize_function, repeats)
+            outputs.append(parsed)
+            print(f"  {name:<13} {elapsed:8.3f} s  {megabytes / elapsed:8.1f} MB/s")
+        if outputs[0] != outputs[1]:
+            print("  Error: parsers produced different documents")
+            sys.exit(1)
+        print("  Parsed documents are identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'SearchEngine')))
+from SearchEngine import SearchEngine
+from RetrievalMethods.utils.position_utils import match_window
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from IndexEngine.utils.parse_utils import SCHEMAS, parse_documents
+
+
+def indexed_tokens(document: str, tokenize_function) -> list[str] | None:
+    """
+    Gets the tokens of a stored document's indexed fields in order, parsed as the
+    IndexEngine parsed it, or None if no schema matches it.
+    """
+    raw_document = document.split("raw document:\n", 1)[1]
+    for schema in SCHEMAS.values():
+        if schema["document"][0] in raw_document:
+            for *_, term_positions in parse_documents(raw_document.splitlines(keepends=True), schema, tokenize_function, positions=True):
+                tokens = {}
+                for token, positions in term_positions.items():
+                    for position in positions:
+                        tokens[position] = token
+                return [tokens[position] for position in range(len(tokens))]
+
+    return None
+
+def sample_phrases(engine: SearchEngine, num_queries: int, phrase_length: int, seed: int = 543) -> list[list[str]]:
+    """
+    Samples phrases of consecutive tokens from the indexed text of random documents.
+    """
+    rng = random.Random(seed)
+    phrases = []
+    while len(phrases) < num_queries:
+        tokens = indexed_tokens(engine.get_doc(engine.docnos[rng.randrange(len(engine.docnos))]), engine.tokenize_function)
+        if tokens and len(tokens) >= phrase_length:
+            start = rng.randrange(len(tokens) - phrase_length + 1)
+            phrases.append(tokens[start:start + phrase_length])
+
+    return phrases
+
+def scan_phrase(engine: SearchEngine, tokens: list[str], gap: int, k: int) -> list[dict]:
+    """
+    Answers a phrase query from the postings alone: ranks every document by its words,
+    then decompresses and parses the documents with every word, best first, to check
+    the phrase in their text.
+    """
+    candidates = None
+    for doc_ids, _ in map(engine.get_postings, tokens):
+        candidates = set(doc_ids) if candidates is None else candidates.intersection(doc_ids)
+
+    results = []
+    for result in engine.search(" ".join(tokens), "BM25", k=len(engine.doc_lengths), summaries=0):
+        doc_id = engine.doc_store.doc_id(result["docno"])
+        if doc_id not in candidates:
+            continue
+        positions = {}
+        for position, token in enumerate(indexed_tokens(engine.doc_store.get(doc_id), engine.tokenize_function)):
+            positions.setdefault(token, []).append(position)
+        if match_window([positions[token] for token in tokens], gap):
+            results.append({"docno": result["docno"], "rank": len(results) + 1})
+            if len(results) == k:
+                break
+
+    return results
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/phrase_benchmark.py <index_path> [num_queries] [phrase_length] [gap]")
+        sys.exit(1)
+
+    engine = SearchEngine(sys.argv[1], result_cache_entries=0, doc_cache_entries=0)
+    if not engine.has_positions:
+        print("Error: The index has no positions.\nBuild it with --positions.")
+        sys.exit(1)
+
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    phrase_length = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    gap = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    operator = f"~{gap}" if gap else ""
+    print(f"Index: {len(engine.doc_lengths)} documents, {len(engine.segments)} segment(s)")
+    print(f"Queries: {num_queries} sampled phrases of {phrase_length} terms{f', at most {gap} words apart' if gap else ''}, BM25, top 1000")
+
+    phrases = sample_phrases(engine, num_queries, phrase_length)
+
+    timings = {}
+    rankings = {}
+    for label, run in [
+        ("words only", lambda tokens: engine.search(" ".join(tokens), "BM25", k=1000, summaries=0)),
+        ("positions", lambda tokens: engine.search(f'"{" ".join(tokens)}"{operator}', "BM25", k=1000, summaries=0)),
+        ("postings and text scan", lambda tokens: scan_phrase(engine, tokens, gap, 1000)),
+    ]:
+        start = time.perf_counter()
+        rankings[label] = [run(tokens) for tokens in phrases]
+        timings[label] = time.perf_counter() - start
+
+    print(f"\nsearch:")
+    for label, timing in timings.items():
+        print(f"  {label:<24} {timing * 1000 / num_queries:8.3f} ms/query")
+
+    if rankings["positions"] != rankings["postings and text scan"]:
+        print("Error: Positions and scanning the text matched different documents")
+        sys.exit(1)
+    matched = sum(len(ranking) for ranking in rankings["positions"]) / num_queries
+    print(f"Both match the same documents, {matched:.1f} per query")
+
+    # A batch of the same phrase topics ranks the same documents as searching them one at a time
+    topics = [(str(i), f'"{" ".join(tokens)}"{operator}') for i, tokens in enumerate(phrases)]
+    batch_rankings = [[{"docno": result["docno"], "rank": result["rank"]} for result in results] for results in engine.search_batch(topics, "BM25", k=1000)]
+    if batch_rankings != rankings["positions"]:
+        print("Error: search_batch and search ranked phrase topics differently")
+        sys.exit(1)
+    print("search_batch ranks phrase topics the same as search")
+    engine.close()
+
+if __name__ == "__main__":
+    main()
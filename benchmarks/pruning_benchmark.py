@@ -0,0 +1,91 @@
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'SearchEngine')))
+from SearchEngine import SearchEngine
+from RetrievalMethods.utils.score_utils import bm25_score
+from RetrievalMethods.utils.maxscore_utils import bm25_top_k
+
+
+def exhaustive_top_k(query_postings: list, doc_lengths, k: int) -> list[tuple[int, float]]:
+    """
+    Ranks every document containing a query term, the way the BM25 retrieval methods do without pruning.
+    """
+    result_set = {}
+    average_doc_length = sum(doc_lengths) / len(doc_lengths)
+    for doc_ids, term_frequencies in query_postings:
+        for doc_id, term_frequency in zip(doc_ids, term_frequencies):
+            score = bm25_score(term_frequency, doc_lengths[doc_id], average_doc_length, len(doc_lengths), len(doc_ids))
+            if doc_id not in result_set:
+                result_set[doc_id] = score
+            else:
+                result_set[doc_id] += score
+
+    return sorted(result_set.items(), key=lambda x: x[1], reverse=True)[:k]
+
+def sample_queries(engine: SearchEngine, num_queries: int, query_length: int, seed: int = 543) -> list[list[str]]:
+    """
+    Samples long queries from the distinct words of random documents, leaving out the
+    markup, so the query terms follow the collection's own mix of rare and common terms.
+    """
+    rng = random.Random(seed)
+    queries = []
+    while len(queries) < num_queries:
+        document = engine.get_doc(engine.docnos[rng.randrange(len(engine.docnos))])
+        tokens = []
+        engine.tokenize_function(re.sub(r"<[^>]*>", " ", document.split("raw document:")[-1]), tokens)
+        tokens = [token for token in tokens if token.isalpha()]
+        if len(set(tokens)) >= query_length:
+            queries.append(rng.sample(sorted(set(tokens)), query_length))
+
+    return queries
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/pruning_benchmark.py <index_path> [num_queries] [query_length]")
+        sys.exit(1)
+
+    engine = SearchEngine(sys.argv[1])
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    query_length = int(sys.argv[3]) if len(sys.argv) > 3 else 15
+    print(f"Index: {len(engine.doc_lengths)} documents, {len(engine.segments)} segment(s)")
+    print(f"Queries: {num_queries} sampled queries of {query_length} terms")
+
+    # Postings and bounds are fetched up front so only ranking is timed
+    queries = []
+    for tokens in sample_queries(engine, num_queries, query_length):
+        query_tokens = [token for token in tokens if engine.get_postings(token) is not None]
+        queries.append((
+            [engine.get_postings(token) for token in query_tokens],
+            [engine.get_term_bound(token) for token in query_tokens],
+        ))
+
+    for k in (1000, 100, 10):
+        exhaustive_time = 0.0
+        pruned_time = 0.0
+        mismatches = 0
+        for query_postings, term_bounds in queries:
+            start = time.perf_counter()
+            expected = exhaustive_top_k(query_postings, engine.doc_lengths, k)
+            exhaustive_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            actual = bm25_top_k(query_postings, term_bounds, engine.doc_lengths, engine.average_doc_length, k)
+            pruned_time += time.perf_counter() - start
+
+            if actual != expected:
+                mismatches += 1
+
+        print(f"\nTop {k}:")
+        print(f"  exhaustive {exhaustive_time / len(queries) * 1000:8.2f} ms/query")
+        print(f"  MaxScore   {pruned_time / len(queries) * 1000:8.2f} ms/query  {exhaustive_time / pruned_time:5.2f}x")
+        if mismatches:
+            print(f"  Error: {mismatches} queries ranked differently")
+            sys.exit(1)
+        print("  Rankings are identical")
+
+if __name__ == "__main__":
+    main()
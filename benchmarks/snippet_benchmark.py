@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'SearchEngine')))
+from SearchEngine import SearchEngine
+from RetrievalMethods.utils.score_utils import rank_bm25
+from RetrievalMethods.utils.query_utils import get_query_biased_summary
+from RetrievalMethods.utils.new_query_utils import get_query_biased_summary as get_new_query_biased_summary
+from RetrievalMethods.utils.snippet_utils import get_snippet_summary
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pruning_benchmark import sample_queries
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/snippet_benchmark.py <index_path> [num_queries] [query_length] [results]")
+        sys.exit(1)
+
+    engine = SearchEngine(sys.argv[1], result_cache_entries=0, doc_cache_entries=0)
+    if engine.snippet_store is None:
+        print("Error: The index has no snippet store.\nBuild it with --snippets.")
+        sys.exit(1)
+
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    query_length = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    results = int(sys.argv[4]) if len(sys.argv) > 4 else 10
+    summarize = get_query_biased_summary if engine.snippet_store.schema == "trec" else get_new_query_biased_summary
+    print(f"Index: {len(engine.doc_lengths)} documents, {len(engine.segments)} segment(s), {engine.snippet_store.schema} snippets")
+    print(f"Queries: {num_queries} sampled queries of {query_length} terms, summaries of the top {results}")
+
+    # The top documents are ranked and read up front so only summaries are timed
+    pages = []
+    for tokens in sample_queries(engine, num_queries, query_length):
+        query_postings = [postings for postings in map(engine.get_postings, tokens) if postings is not None]
+        doc_ids = [doc_id for doc_id, _ in rank_bm25(query_postings, engine.doc_lengths, engine.average_doc_length, results)]
+        raw_documents = [document.split("raw document:")[1].strip() for document in engine.doc_store.get_many(doc_ids)]
+        pages.append((tokens, doc_ids, raw_documents))
+
+    start = time.perf_counter()
+    expected = [[summarize(tokens, raw_document, engine.tokenize_function) for raw_document in raw_documents] for tokens, _, raw_documents in pages]
+    parse_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    summaries = [[get_snippet_summary(tokens, snippets) for snippets in engine.snippet_store.get_many(doc_ids)] for tokens, doc_ids, _ in pages]
+    snippet_time = time.perf_counter() - start
+
+    print(f"\nParsing each raw document  {parse_time * 1000 / num_queries:8.3f} ms/query")
+    print(f"Scoring stored sentences   {snippet_time * 1000 / num_queries:8.3f} ms/query  {parse_time / snippet_time:5.1f}x")
+
+    if summaries != expected:
+        print("Error: The stored sentences gave different summaries")
+        sys.exit(1)
+    print(f"Summaries are identical ({sum(len(page) for page in summaries)} summaries)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'SearchEngine')))
+from SearchEngine import SearchEngine
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from pruning_benchmark import sample_queries
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/summary_benchmark.py <index_path> [method] [num_queries] [query_length] [results] [workers]")
+        sys.exit(1)
+
+    engine = SearchEngine(sys.argv[1], result_cache_entries=0, doc_cache_entries=0)
+    method = sys.argv[2] if len(sys.argv) > 2 else "BM25"
+    num_queries = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    query_length = int(sys.argv[4]) if len(sys.argv) > 4 else 3
+    results = int(sys.argv[5]) if len(sys.argv) > 5 else 100
+    workers = int(sys.argv[6]) if len(sys.argv) > 6 else os.cpu_count()
+    print(f"Index: {len(engine.doc_lengths)} documents, {len(engine.segments)} segment(s), {'stored' if engine.snippet_store is not None else 'parsed'} sentences")
+    print(f"Queries: {num_queries} sampled queries of {query_length} terms, {method}, top 1000")
+
+    queries = [" ".join(tokens) for tokens in sample_queries(engine, num_queries, query_length)]
+
+    timings = {}
+    expected = []
+    for label, summaries in [("summaries for the top 10", 10), ("docnos and ranks only", 0)]:
+        start = time.perf_counter()
+        for query in queries:
+            page = engine.search(query, method, k=1000, summaries=summaries)
+            if summaries:
+                expected.append(page[:summaries])
+        timings[label] = time.perf_counter() - start
+    print(f"\nsearch:")
+    for label, timing in timings.items():
+        print(f"  {label:<26} {timing * 1000 / num_queries:8.3f} ms/query")
+
+    # The first page summarised on demand must be what search returns
+    hits = [engine.search(query, method, k=1000, summaries=0) for query in queries]
+    for query, query_hits, page in zip(queries, hits, expected):
+        if engine.summarize(query, [dict(hit) for hit in query_hits[:10]], method) != page:
+            print("Error: Summarising a page on demand gave different results")
+            sys.exit(1)
+
+    print(f"\nsummarize, top {results}:")
+    pages = {}
+    for label, summary_workers in [("in this process", None), (f"{workers} workers", workers)]:
+        # The pool is started outside the timing, as it is kept between pages
+        engine.summarize(queries[0], [dict(hit) for hit in hits[0][:2]], method, summary_workers)
+        start = time.perf_counter()
+        pages[label] = [engine.summarize(query, [dict(hit) for hit in query_hits[:results]], method, summary_workers) for query, query_hits in zip(queries, hits)]
+        print(f"  {label:<26} {(time.perf_counter() - start) * 1000 / num_queries:8.3f} ms/query")
+
+    if pages["in this process"] != pages[f"{workers} workers"]:
+        print("Error: The workers gave different summaries")
+        sys.exit(1)
+    print("Summaries are identical")
+    engine.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'IndexEngine')))
+from utils.tokenize_utils import tokenize, tokenize_and_stem, porter_stemmer, stem
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from parser_benchmark import generate_corpus
+
+
+def legacy_tokenize(text: str, tokens: list[str]) -> None:
+    """
+    The character loop both engines used before the regex tokenizer.
+    """
+    text = text.lower()
+
+    start = 0
+    i = 0
+
+    for currChar in text:
+        if not currChar.isdigit() and not currChar.isalpha() :
+            if start != i :
+                token = text[start:i]
+                tokens.append( token )
+
+            start = i + 1
+        i += 1
+    if start != i :
+        tokens.append(text[start:i])
+
+def uncached_tokenize_and_stem(text: str, tokens: list[str]) -> None:
+    """
+    Tokenizes and stems every token with the Porter stemmer directly, without the memo cache.
+    """
+    words = []
+    tokenize(text, words)
+    stemmer = porter_stemmer()
+    tokens.extend(stemmer.stem(word) for word in words)
+
+def measure(tokenize_function, texts: list[str], repeats: int) -> float:
+    """
+    Gets the best wall time of a tokenizer over the texts.
+    """
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for text in texts:
+            tokens = []
+            tokenize_function(text, tokens)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+def main():
+    num_documents = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeats = 3
+
+    lines = [line.strip() for line in generate_corpus(num_documents) if "<" not in line]
+    megabytes = sum(len(line.encode('utf-8')) for line in lines) / (1024 * 1024)
+    print(f"Synthetic text: {len(lines)} lines, {megabytes:.1f} MB")
+
+    # One string per document, as the parser tokenizes them
+    documents = [" ".join(lines[i:i + 40]) for i in range(0, len(lines), 40)]
+    for label, texts in [("per line", lines), ("per document", documents)]:
+        print(f"\nTokenizing {label}:")
+        for name, tokenize_function in [("char loop", legacy_tokenize), ("vectorised", tokenize)]:
+            elapsed = measure(tokenize_function, texts, repeats)
+            print(f"  {name:<10} {elapsed:8.3f} s  {megabytes / elapsed:8.1f} MB/s")
+
+    print("\nStemming per document:")
+    stem.cache_clear()
+    for name, tokenize_function in [("uncached", uncached_tokenize_and_stem), ("memoised", tokenize_and_stem)]:
+        elapsed = measure(tokenize_function, documents, 1)
+        print(f"  {name:<10} {elapsed:8.3f} s  {megabytes / elapsed:8.1f} MB/s")
+    cache = stem.cache_info()
+    print(f"  Stem cache: {cache.currsize} forms, {cache.hits / (cache.hits + cache.misses):.1%} hits")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import gzip
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(REPO_PATH, 'SearchEngine'))
+from SearchEngine import SearchEngine
+
+# Documents where "soviet union" appears as a phrase in some and as separate words in others
+TEXTS = [
+    "The soviet union signed the treaty.",
+    "A union of workers met a soviet delegation.",
+    "Talks between the soviet and the union leaders stalled.",
+    "The former soviet union split into republics.",
+    "Union members praised the soviet union reforms of glasnost.",
+    "Glasnost changed the union.",
+]
+
+
+@pytest.fixture(scope="module")
+def index_path(tmp_path_factory):
+    """
+    Builds an index with positions from a small TREC collection.
+    """
+    path = tmp_path_factory.mktemp("phrase")
+    documents_file = path / "documents.gz"
+    with gzip.open(documents_file, "wt") as f:
+        for i, text in enumerate(TEXTS):
+            f.write(f"<DOC>\n<DOCNO> LA010189-{i:04d} </DOCNO>\n<HEADLINE>\n<P>\nStory {i}\n</P>\n</HEADLINE>\n<TEXT>\n<P>\n{text}\n</P>\n</TEXT>\n</DOC>\n")
+
+    index_path = path / "index"
+    subprocess.run([sys.executable, os.path.join(REPO_PATH, "IndexEngine", "IndexEngine.py"), str(documents_file), str(index_path), "--positions"], check=True, stdout=subprocess.DEVNULL)
+    return str(index_path)
+
+@pytest.mark.parametrize("method", ["BM25", "cosine"])
+@pytest.mark.parametrize("workers", [None, 2])
+def test_search_batch_matches_search_for_phrases(index_path, method, workers):
+    topics = [("1", '"soviet union"'), ("2", '"soviet union" glasnost'), ("3", '"union soviet"~3'), ("4", "soviet union")]
+    with SearchEngine(index_path, result_cache_entries=0) as engine:
+        batch_results = engine.search_batch(topics, method, k=10, workers=workers)
+        for (_, query), results in zip(topics, batch_results):
+            expected = [(result["docno"], result["rank"]) for result in engine.search(query, method, k=10, summaries=0)]
+            assert [(result["docno"], result["rank"]) for result in results] == expected
+
+    # Only the phrase restricts the first topic, the words alone match every document with either
+    assert sorted(result["docno"] for result in batch_results[0]) == ["LA010189-0000", "LA010189-0003", "LA010189-0004"]
+    assert len(batch_results[3]) == len(TEXTS)
@@ -0,0 +1,75 @@
+import os
+import sys
+
+import pytest
+
+REPO_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO_PATH)
+from IndexEngine.utils.tokenize_utils import tokenize, tokenize_and_stem, porter_stemmer
+
+sys.path.insert(0, os.path.join(REPO_PATH, 'SearchEngine'))
+from RetrievalMethods.utils import tokenize_utils as search_tokenize_utils
+
+# Texts whose tokens depend on how letters, digits, numerics and separators are classified
+TEXTS = [
+    "",
+    "   ",
+    "Gorbachev's policy of glasnost, 1989-1990.",
+    "U.S.-Soviet talks; \"peace\" (at last)!",
+    "snake_case and kebab-case and dot.case",
+    "e-mail: someone@example.com, http://x.y/z?q=1&r=2",
+    "3.14159 1,000,000 007 2nd 1990s",
+    "tab\tseparated\nnew line\r\nwindows",
+    "İstanbul ß Σίσυφος ς naïve café Ångström",
+    "½ ² Ⅻ ٣ 〇 ① ¼ three¾",
+    "é combining accents and zero​width space",
+    "日本語のテキスト 中文 한국어",
+    "emoji 😀 between👍words",
+    "–em—dash…ellipsis‘quotes’“double”",
+    "ALL CAPS and MiXeD cAsE",
+    " non breaking em space",
+]
+
+
+def legacy_tokenize(text: str, tokens: list[str]) -> None:
+    """
+    The character loop both engines used before the vectorised tokenizer.
+    """
+    text = text.lower()
+
+    start = 0
+    i = 0
+
+    for currChar in text:
+        if not currChar.isdigit() and not currChar.isalpha() :
+            if start != i :
+                token = text[start:i]
+                tokens.append( token )
+
+            start = i + 1
+        i += 1
+    if start != i :
+        tokens.append(text[start:i])
+
+def tokens_of(tokenize_function, text: str) -> list[str]:
+    tokens = []
+    tokenize_function(text, tokens)
+    return tokens
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_tokenize_matches_legacy(text):
+    assert tokens_of(tokenize, text) == tokens_of(legacy_tokenize, text)
+
+def test_tokenize_matches_legacy_on_every_code_point():
+    code_points = [chr(code_point) for code_point in range(sys.maxunicode + 1) if not 0xD800 <= code_point < 0xE000]
+    mismatches = [character for character in code_points if tokens_of(tokenize, f"a{character}1") != tokens_of(legacy_tokenize, f"a{character}1")]
+    assert mismatches == []
+
+def test_search_engine_shares_the_tokenizer():
+    assert search_tokenize_utils.tokenize is tokenize
+    assert search_tokenize_utils.tokenize_and_stem is tokenize_and_stem
+
+def test_memoised_stems_match_the_stemmer():
+    stemmer = porter_stemmer()
+    for text in TEXTS:
+        assert tokens_of(tokenize_and_stem, text) == [stemmer.stem(token) for token in tokens_of(tokenize, text)]